@@ -0,0 +1,233 @@
+"""
+End-to-end benchmarks of the scrape pipeline against replayed fixtures.
+
+Every engine (simple, optimized, turbo, api) runs at every target (100, 500,
+5000 tweets) in a fresh subprocess against a synthetic replay bundle, so
+numbers are repeatable and not skewed by earlier runs. Each run reports
+tweets/sec, p50/p95 per-scroll latency, CPU seconds (this process and the
+browser/driver processes), peak RSS and bytes served by the replayer.
+Results go to benchmarks/results/e2e_<commit>.json:
+
+    python -m benchmarks.e2e                              # full matrix
+    python -m benchmarks.e2e --engines simple,turbo --sizes 100
+    python -m benchmarks.e2e --compare benchmarks/results/e2e_abc1234.json benchmarks/results/e2e_def5678.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+
+ENGINES = ('simple', 'optimized', 'turbo', 'api')
+SIZES = (100, 500, 5000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+RESULT_MARKER = 'BENCHMARK_RESULT '
+
+def percentile(values, pct):
+    """Nearest-rank percentile (None for no values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return 'unknown'
+
+def _usage():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own, children
+
+def _keep_engines(scraper):
+    """Wrap _create_engine so the engines (and their scroll latencies) outlive the run"""
+    engines = []
+    create_engine = scraper._create_engine
+    def keep_engine(config):
+        engine = create_engine(config)
+        engines.append(engine)
+        return engine
+    scraper._create_engine = keep_engine
+    return engines
+
+def _replay_scraper(bundle, latency):
+    from scraper.playwright_scraper import TwitterScraper
+    from scraper.replay import FixtureReplayer
+    scraper = TwitterScraper(cookie_source=[], proxy_preflight=False)
+    scraper.replay = FixtureReplayer(bundle, latency=latency)
+    return scraper, _keep_engines(scraper)
+
+def run_engine(engine_name, num_tweets, bundle, latency=0.0):
+    """Run one engine in this process; returns (tweets, scroll latencies, replayer stats)"""
+    job_id = f'bench_{engine_name}_{num_tweets}'
+    url = 'https://x.com/search?q=AI&src=typed_query'
+    
+    if engine_name == 'simple':
+        scraper, engines = _replay_scraper(bundle, latency)
+        scraper.scrape(keyword='AI', num_tweets=num_tweets, job_id=job_id)
+    elif engine_name == 'optimized':
+        scraper, engines = _replay_scraper(bundle, latency)
+        from scraper.engine import EngineConfig
+        asyncio.run(scraper.scrape_url_async(url, num_tweets, job_id, EngineConfig.optimized()))
+    elif engine_name == 'turbo':
+        from scraper.turbo_scraper import AsyncTwitterScraper
+        from scraper.replay import FixtureReplayer
+        turbo = AsyncTwitterScraper(num_workers=8, cookie_source=[], replay=FixtureReplayer(bundle, latency=latency))
+        scraper = turbo.scraper
+        engines = _keep_engines(scraper)
+        asyncio.run(turbo.scrape_fast(url, num_tweets, job_id))
+    elif engine_name == 'api':
+        from scraper.api_scraper import TwitterAPIScraper
+        from scraper.replay import FixtureReplayer
+        api_scraper = TwitterAPIScraper(replay=FixtureReplayer(bundle, latency=latency))
+        tweets = api_scraper.scrape_with_api(url, num_tweets, cookies=[])
+        return len(tweets), api_scraper.scroll_latencies, api_scraper.replay.stats
+    else:
+        raise ValueError(f'Unknown engine: {engine_name}')
+    
+    latencies = [value for engine in engines for value in engine.scroll_latencies]
+    return scraper.csv_handler.get_tweet_count(), latencies, scraper.replay.stats
+
+def measure(engine_name, num_tweets, bundle, latency=0.0):
+    """One benchmark case in this process; returns its result dict"""
+    own_before, children_before = _usage()
+    start = time.perf_counter()
+    error = None
+    try:
+        tweets, latencies, stats = run_engine(engine_name, num_tweets, bundle, latency)
+    except Exception as e:
+        tweets, latencies, stats, error = 0, [], {}, f'{type(e).__name__}: {e}'
+    elapsed = time.perf_counter() - start
+    own_after, children_after = _usage()
+    
+    return {
+        'engine': engine_name,
+        'target': num_tweets,
+        'tweets': tweets,
+        'seconds': round(elapsed, 3),
+        'tweets_per_sec': round(tweets / elapsed, 2) if elapsed else 0,
+        'scrolls': len(latencies),
+        'scroll_p50': percentile(latencies, 50),
+        'scroll_p95': percentile(latencies, 95),
+        'cpu_seconds': round((own_after.ru_utime + own_after.ru_stime) - (own_before.ru_utime + own_before.ru_stime), 3),
+        'browser_cpu_seconds': round((children_after.ru_utime + children_after.ru_stime) -
+                                     (children_before.ru_utime + children_before.ru_stime), 3),
+        'peak_rss_mb': round(own_after.ru_maxrss / 1024, 1),  # ru_maxrss is in KB on Linux
+        'browser_peak_rss_mb': round(children_after.ru_maxrss / 1024, 1),
+        'bytes': stats.get('bytes', 0),
+        'rate_limited': stats.get('rate_limited', 0),
+        'error': error,
+    }
+
+def run_case(engine_name, num_tweets, bundle, latency=0.0, timeout=1800):
+    """One benchmark case in a fresh subprocess (clean RSS/CPU accounting)"""
+    command = [sys.executable, '-m', 'benchmarks.e2e', '--child', engine_name, str(num_tweets),
+               '--bundle', bundle, '--latency', str(latency)]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+        try:
+            output = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, text=True,
+                                    timeout=timeout).stdout
+        except subprocess.TimeoutExpired:
+            return {'engine': engine_name, 'target': num_tweets, 'tweets': 0, 'error': f'timed out after {timeout}s'}
+    
+    for line in reversed(output.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    return {'engine': engine_name, 'target': num_tweets, 'tweets': 0,
+            'error': 'no result: ' + ' | '.join(output.splitlines()[-3:])}
+
+def run_matrix(engines=ENGINES, sizes=SIZES, latency=0.0, page_size=20, output=None):
+    """Every engine at every size against one synthetic bundle; writes and returns the report"""
+    from scraper.replay import build_synthetic_bundle
+    bundle = tempfile.mkdtemp(prefix='replay_bundle_')
+    try:
+        build_synthetic_bundle(bundle, num_tweets=max(sizes) + page_size * 5, page_size=page_size,
+                               tweet_details=False)
+        runs = []
+        for engine_name in engines:
+            for num_tweets in sizes:
+                print(f"⏱️  {engine_name} @ {num_tweets} tweets...", flush=True)
+                result = run_case(engine_name, num_tweets, bundle, latency)
+                runs.append(result)
+                print(f"   {format_result(result)}", flush=True)
+    finally:
+        shutil.rmtree(bundle, ignore_errors=True)
+    
+    report = {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'replay_latency': latency,
+        'page_size': page_size,
+        'runs': runs,
+    }
+    output = output or os.path.join(RESULTS_DIR, f"e2e_{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results saved to {output}")
+    return report
+
+def format_result(result):
+    if result.get('error'):
+        return f"{result['engine']:9} {result['target']:>5}: ERROR {result['error']}"
+    p50 = result['scroll_p50']
+    p95 = result['scroll_p95']
+    return (f"{result['engine']:9} {result['target']:>5}: {result['tweets']:>5} tweets "
+            f"{result['tweets_per_sec']:>7.1f}/s  scroll p50 {p50 or 0:.2f}s p95 {p95 or 0:.2f}s  "
+            f"cpu {result['cpu_seconds']:.1f}s+{result['browser_cpu_seconds']:.1f}s  "
+            f"rss {result['peak_rss_mb']:.0f}MB  {result['bytes'] / 1e6:.1f}MB served")
+
+def compare(old_report, new_report):
+    """Lines comparing tweets/sec and CPU of matching runs (positive = faster / cheaper)"""
+    old_runs = {(r['engine'], r['target']): r for r in old_report['runs']}
+    lines = [f"{old_report['commit']} -> {new_report['commit']}"]
+    for run in new_report['runs']:
+        old = old_runs.get((run['engine'], run['target']))
+        if not old or old.get('error') or run.get('error'):
+            continue
+        speed = (run['tweets_per_sec'] / old['tweets_per_sec'] - 1) * 100 if old['tweets_per_sec'] else 0
+        cpu = (1 - run['cpu_seconds'] / old['cpu_seconds']) * 100 if old['cpu_seconds'] else 0
+        lines.append(f"{run['engine']:9} {run['target']:>5}: tweets/sec {old['tweets_per_sec']:.1f} -> "
+                     f"{run['tweets_per_sec']:.1f} ({speed:+.0f}%), cpu {old['cpu_seconds']:.1f}s -> "
+                     f"{run['cpu_seconds']:.1f}s ({cpu:+.0f}%)")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end scrape benchmarks against replayed fixtures')
+    parser.add_argument('--engines', default=','.join(ENGINES), help='comma-separated subset of ' + ','.join(ENGINES))
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated tweet targets')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every replayed response')
+    parser.add_argument('--page-size', type=int, default=20, help='tweets per replayed timeline page')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/e2e_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two results files')
+    parser.add_argument('--child', nargs=2, metavar=('ENGINE', 'TWEETS'), help=argparse.SUPPRESS)
+    parser.add_argument('--bundle', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        result = measure(args.child[0], int(args.child[1]), args.bundle, args.latency)
+        print(RESULT_MARKER + json.dumps(result), flush=True)
+    elif args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            print('\n'.join(compare(json.load(f_old), json.load(f_new))))
+    else:
+        engines = [e.strip() for e in args.engines.split(',') if e.strip()]
+        sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+        run_matrix(engines, sizes, args.latency, args.page_size, args.output)
+
+if __name__ == "__main__":
+    main()
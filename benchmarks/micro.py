@@ -0,0 +1,324 @@
+"""
+Micro-benchmarks of the parser, dedupe and sink hot paths.
+
+Each case times one function in isolation (best of --repeat runs) and then
+repeats it once under tracemalloc to report allocations. Nothing touches the
+network; the DOM cases read benchmarks/fixtures/search_timeline.html.
+
+    python -m benchmarks.micro                        # every case
+    python -m benchmarks.micro --only get_proxy,fast_csv_append --scale 0.2
+    python -m benchmarks.micro --compare benchmarks/results/micro_abc1234.json benchmarks/results/micro_def5678.json
+"""
+import os
+import re
+import json
+import time
+import random
+import shutil
+import argparse
+import itertools
+import platform
+import tempfile
+import logging
+import tracemalloc
+from html.parser import HTMLParser
+from contextlib import contextmanager
+
+from benchmarks.e2e import RESULTS_DIR, git_commit
+
+FIXTURE_HTML = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'search_timeline.html')
+_job_ids = itertools.count()
+
+class ArticleParser(HTMLParser):
+    """Reads the fixture into the same article dicts EXTRACT_TWEETS_JS returns in the browser"""
+    def __init__(self):
+        super().__init__()
+        self.articles = []
+        self._article = None
+        self._text_depth = 0  # Open tags inside the current tweetText element
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'article':
+            self._article = {'text': '', 'href': '', 'likes': '0', 'retweets': '0', 'replies': '0'}
+            return
+        if self._article is None:
+            return
+        if self._text_depth:
+            self._text_depth += 1
+        elif attrs.get('data-testid') == 'tweetText':
+            self._text_depth = 1
+        href = attrs.get('href') or ''
+        if tag == 'a' and not self._article['href'] and re.search(r'/status/\d+', href):
+            self._article['href'] = href
+        field = {'like': 'likes', 'retweet': 'retweets', 'reply': 'replies'}.get(attrs.get('data-testid'))
+        match = field and re.search(r'(\d+)', attrs.get('aria-label') or '')
+        if match:
+            self._article[field] = match.group(1)
+    
+    def handle_endtag(self, tag):
+        if tag == 'article' and self._article is not None:
+            self.articles.append(self._article)
+            self._article = None
+        elif self._text_depth:
+            self._text_depth -= 1
+    
+    def handle_data(self, data):
+        if self._text_depth:
+            self._article['text'] += data
+
+@contextmanager
+def _muted_logs():
+    """Drop package log output but keep its level, so disabled DEBUG calls cost what they do in a real run"""
+    from scraper.log import get_logger
+    package_logger = get_logger('scraper')
+    handlers = package_logger.handlers
+    package_logger.handlers = [logging.NullHandler()]
+    try:
+        yield
+    finally:
+        package_logger.handlers = handlers
+
+def fixture_articles(path=FIXTURE_HTML):
+    parser = ArticleParser()
+    with open(path, encoding='utf-8') as f:
+        parser.feed(f.read())
+    return parser.articles
+
+def _api_tweets(count):
+    from scraper.replay import _synthetic_tweet
+    rng = random.Random(0)
+    return [_synthetic_tweet(i, rng) for i in range(count)]
+
+def _scraper():
+    from scraper.playwright_scraper import TwitterScraper
+    return TwitterScraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+
+@contextmanager
+def process_api_tweet(ops):
+    """Parse + engagement filter + reservation + dedupe + sink write of one API tweet"""
+    scraper = _scraper()
+    scraper._start_job(f'micro_api_{next(_job_ids)}', ops)
+    tweets = _api_tweets(ops)
+    def run():
+        for tweet in tweets:
+            scraper._process_api_tweet(tweet, 0)
+    yield run
+
+@contextmanager
+def find_in_dict(ops, key='instructions'):
+    """Key lookup in a 20-tweet SearchTimeline response"""
+    from scraper.replay import _timeline_body, _tweet_entry
+    scraper = _scraper()
+    data = json.loads(_timeline_body('SearchTimeline', [_tweet_entry(t) for t in _api_tweets(20)]))
+    def run():
+        for _ in range(ops):
+            scraper._find_in_dict(data, key)
+    yield run
+
+@contextmanager
+def find_in_dict_miss(ops):
+    """A missing key walks the whole response (the 'users' lookup on every search page)"""
+    with find_in_dict(ops, key='users') as run:
+        yield run
+
+@contextmanager
+def dom_build_tweet(ops):
+    """Python side of the DOM fallback: filters and CSV row for one extracted article"""
+    scraper = _scraper()
+    articles = fixture_articles()
+    def run():
+        for i in range(ops):
+            scraper._build_dom_tweet(articles[i % len(articles)])
+    yield run
+
+@contextmanager
+def dom_extract_js(ops):
+    """Browser side of the DOM fallback: one EXTRACT_TWEETS_JS evaluate over the fixture page
+    
+    Needs Chromium; allocations only cover this process, not the browser.
+    """
+    from playwright.sync_api import sync_playwright
+    from scraper.engine import EXTRACT_TWEETS_JS
+    with open(FIXTURE_HTML, encoding='utf-8') as f:
+        html = f.read()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            page = browser.new_page()
+            page.set_content(html)
+            def run():
+                for _ in range(ops):
+                    page.evaluate(EXTRACT_TWEETS_JS)
+            yield run
+        finally:
+            browser.close()
+
+def _rows(count):
+    scraper = _scraper()
+    return [scraper._parse_api_tweet(tweet) for tweet in _api_tweets(count)]
+
+@contextmanager
+def csv_append(ops):
+    """CSVHandler.append_tweet: dedupe + one open/write per tweet"""
+    from scraper.csv_handler import CSVHandler
+    handler = CSVHandler(f'micro_csv_{next(_job_ids)}')
+    rows = _rows(ops)
+    def run():
+        for row in rows:
+            handler.append_tweet(row)
+    yield run
+
+@contextmanager
+def fast_csv_append(ops):
+    """FastCSVHandler.append_tweet: dedupe + buffered batch writes (final flush included)"""
+    from scraper.fast_csv_handler import FastCSVHandler
+    handler = FastCSVHandler(f'micro_fast_{next(_job_ids)}')
+    rows = _rows(ops)
+    def run():
+        for row in rows:
+            handler.append_tweet(row)
+        handler.force_flush()
+    try:
+        yield run
+    finally:
+        handler.close()  # Stop the background flusher between repeats
+
+@contextmanager
+def get_proxy(ops, num_proxies=10000):
+    """ProxyManager.get_proxy picking the least used of 10k proxies"""
+    from scraper.proxy_manager import ProxyManager
+    proxy_file = f'proxies_{num_proxies}.txt'
+    if not os.path.exists(proxy_file):
+        with open(proxy_file, 'w') as f:
+            for i in range(num_proxies):
+                f.write(f'10.{i // 65536}.{i // 256 % 256}.{i % 256}:8080:user{i}:pass{i}\n')
+    manager = ProxyManager(proxy_file=proxy_file)
+    def run():
+        for _ in range(ops):
+            manager.get_proxy()
+    yield run
+
+# name -> (case, operations per run at --scale 1)
+CASES = {
+    'process_api_tweet': (process_api_tweet, 2000),
+    'find_in_dict': (find_in_dict, 5000),
+    'find_in_dict_miss': (find_in_dict_miss, 2000),
+    'dom_build_tweet': (dom_build_tweet, 20000),
+    'dom_extract_js': (dom_extract_js, 200),
+    'csv_append': (csv_append, 2000),
+    'fast_csv_append': (fast_csv_append, 5000),
+    'get_proxy': (get_proxy, 200),
+}
+
+def measure(name, case, ops, repeat=3):
+    """Best-of-repeat ops/sec, then one traced run for allocations; returns the result dict"""
+    try:
+        timings = []
+        for _ in range(repeat):
+            with _muted_logs(), case(ops) as run:
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+        
+        with _muted_logs(), case(ops) as run:
+            tracemalloc.start()
+            try:
+                before = tracemalloc.take_snapshot()
+                base, _ = tracemalloc.get_traced_memory()
+                run()
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+            finally:
+                tracemalloc.stop()
+    except Exception as e:
+        return {'case': name, 'ops': ops, 'error': f'{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ""}'}
+    
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    best = min(timings)
+    return {
+        'case': name,
+        'ops': ops,
+        'seconds': round(best, 4),
+        'ops_per_sec': round(ops / best, 1) if best else 0,
+        'usec_per_op': round(best / ops * 1e6, 2),
+        'peak_kb': round((peak - base) / 1024, 1),  # High-water mark above the start of the run
+        'retained_bytes_per_op': round((current - base) / ops, 1),
+        'retained_blocks_per_op': round(retained_blocks / ops, 2),
+        'error': None,
+    }
+
+def format_result(result):
+    if result.get('error'):
+        return f"{result['case']:18} ERROR {result['error']}"
+    return (f"{result['case']:18} {result['ops_per_sec']:>12,.0f} ops/s {result['usec_per_op']:>10.1f} us/op  "
+            f"peak {result['peak_kb']:>8.1f} KB  retained {result['retained_bytes_per_op']:>7.1f} B/op "
+            f"{result['retained_blocks_per_op']:>5.2f} blocks/op")
+
+def run_cases(names=None, scale=1.0, repeat=3, output=None):
+    """Run the selected cases in a scratch directory; writes and returns the report"""
+    names = names or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases: {', '.join(unknown)}")
+    
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='micro_bench_')
+    results = []
+    try:
+        os.chdir(work_dir)  # CSVs and the proxy list land here
+        for name in names:
+            case, ops = CASES[name]
+            result = measure(name, case, max(1, int(ops * scale)), repeat)
+            results.append(result)
+            print(format_result(result), flush=True)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    report = {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    output = output or os.path.join(RESULTS_DIR, f"micro_{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results saved to {output}")
+    return report
+
+def compare(old_report, new_report):
+    """Lines comparing ops/sec and retained bytes of matching cases (positive = faster)"""
+    old_results = {r['case']: r for r in old_report['results']}
+    lines = [f"{old_report['commit']} -> {new_report['commit']}"]
+    for result in new_report['results']:
+        old = old_results.get(result['case'])
+        if not old or old.get('error') or result.get('error'):
+            continue
+        speed = (result['ops_per_sec'] / old['ops_per_sec'] - 1) * 100 if old['ops_per_sec'] else 0
+        lines.append(f"{result['case']:18} {old['ops_per_sec']:,.0f} -> {result['ops_per_sec']:,.0f} ops/s "
+                     f"({speed:+.0f}%), retained {old['retained_bytes_per_op']:.0f} -> "
+                     f"{result['retained_bytes_per_op']:.0f} B/op")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the parser, dedupe and sink hot paths')
+    parser.add_argument('--only', help='comma-separated subset of ' + ','.join(CASES))
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every case\'s operation count')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case (best is reported)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/micro_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two results files')
+    args = parser.parse_args()
+    
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            print('\n'.join(compare(json.load(f_old), json.load(f_new))))
+    else:
+        names = [name.strip() for name in args.only.split(',') if name.strip()] if args.only else None
+        run_cases(names, args.scale, args.repeat, args.output)
+
+if __name__ == "__main__":
+    main()
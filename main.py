@@ -5,9 +5,104 @@ Clean backend-only implementation
 """
 
 from scraper.playwright_scraper import TwitterScraper
+from scraper.watcher import QueryWatcher
+from scraper.replay import FixtureReplayer, FixtureRecorder
+from scraper import metrics, tracing
+from scraper.log import setup_logging, flush_logging
+from scraper.profiling import PROFILE_MODES
+from scraper.dashboard import Dashboard
 import os
+import argparse
 from datetime import datetime
 
+def parse_args():
+    """Command-line options (the interactive prompts cover everything else)"""
+    parser = argparse.ArgumentParser(description="Twitter/X Scraper - Terminal Edition")
+    parser.add_argument('--resume', metavar='JOB_ID',
+                        help='continue a crashed or interrupted job from its last checkpoint')
+    parser.add_argument('--watch', metavar='QUERIES',
+                        help="keep polling for new tweets, e.g. --watch 'AI,#crypto,@nasa'")
+    parser.add_argument('--interval', type=int, default=300,
+                        help='seconds between polls of each watched query (default: 300)')
+    parser.add_argument('--processes', type=int, metavar='N',
+                        help='scrape with N browser processes (parsing scales past one CPU core)')
+    parser.add_argument('--replay', metavar='BUNDLE',
+                        help='serve a recorded fixture bundle instead of X.com (no network needed)')
+    parser.add_argument('--replay-latency', type=float, default=0.0,
+                        help='seconds added to every replayed response')
+    parser.add_argument('--replay-429-every', type=int, default=0, metavar='N',
+                        help='answer every Nth replayed API call with a 429')
+    parser.add_argument('--record', metavar='BUNDLE',
+                        help='save timeline API responses and pages into a fixture bundle')
+    parser.add_argument('--tabs-per-account', type=int, metavar='N',
+                        help='strict mode: at most N tabs per cookie account (fewer tabs with few accounts)')
+    parser.add_argument('--allow-direct', action='store_true',
+                        help="scrape from this machine's IP when every proxy fails pre-flight (default: stop)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='serve Prometheus metrics at http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='write Prometheus metrics to PATH every 15s (node_exporter textfile format)')
+    parser.add_argument('--quiet', action='store_true',
+                        help='only log warnings and errors (near-zero logging overhead)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every tweet and scroll (DEBUG)')
+    parser.add_argument('--trace', nargs='?', const='', metavar='PATH',
+                        help='record per-stage timing spans as Chrome trace JSON '
+                             '(default: scraped_data/trace_<job_id>.json)')
+    parser.add_argument('--dashboard', action='store_true',
+                        help='live per-tab status view instead of the scrolling log (implies --quiet)')
+    parser.add_argument('--prune-dom', action='store_true',
+                        help='hide already-extracted timeline cells in the page so layout and extraction stay cheap')
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help='profile the job (cpu: cProfile, mem: tracemalloc top allocation sites) '
+                             'and save the report next to the output CSV')
+    return parser.parse_args()
+
+def start_metrics(args):
+    """Expose the metrics registry if --metrics-port / --metrics-file asked for it"""
+    if args.metrics_port:
+        metrics.REGISTRY.start_http_server(args.metrics_port)
+    if args.metrics_file:
+        metrics.REGISTRY.start_textfile_writer(args.metrics_file)
+
+_dashboard = None
+
+def start_dashboard(args, scraper):
+    """Show the live status view if --dashboard asked for it"""
+    global _dashboard
+    if args.dashboard:
+        _dashboard = Dashboard(scraper).start()
+
+def stop_dashboard():
+    """Leave the last frame on screen before printing results"""
+    global _dashboard
+    if _dashboard:
+        _dashboard.stop()
+        _dashboard = None
+
+def save_trace(args, scraper):
+    """Write the --trace file and a per-stage summary"""
+    job_id = getattr(scraper, 'job_id', None) or datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = tracing.TRACER.save(args.trace or f'scraped_data/trace_{job_id}.json')
+    print(f"\n🧭 Trace saved to {path} (open in https://ui.perfetto.dev or chrome://tracing)")
+    for name, seconds, count in tracing.TRACER.summary()[:8]:
+        print(f"  • {name}: {seconds:.2f}s over {count} spans")
+
+def make_scraper(args, **kwargs):
+    """TwitterScraper wired to a fixture bundle (--replay / --record) and the --dashboard view"""
+    scraper = TwitterScraper(proxy_preflight=not args.replay, allow_direct=args.allow_direct or None,
+                             tabs_per_identity=args.tabs_per_account, **kwargs)
+    scraper.profile = args.profile
+    scraper.prune_dom = args.prune_dom
+    if args.replay:
+        print(f"📼 Replaying {args.replay} (no network)")
+        scraper.replay = FixtureReplayer(args.replay, latency=args.replay_latency,
+                                         rate_limit_every=args.replay_429_every)
+    elif args.record:
+        scraper.replay = FixtureRecorder(args.record)
+    start_dashboard(args, scraper)
+    return scraper
+
 def get_user_input():
     """Get scraping parameters from user"""
     print("🐦 Twitter/X Scraper - Terminal Edition")
@@ -97,9 +192,87 @@ def display_search_info(params):
     
     print()
 
+def show_results(result_filename):
+    """Print where the CSV went and a short preview"""
+    stop_dashboard()
+    flush_logging()  # Scraper log lines first, then the summary
+    if result_filename:
+        print("\n" + "=" * 50)
+        print("✅ SCRAPING COMPLETED SUCCESSFULLY!")
+        print("=" * 50)
+        print(f"📁 File saved: {result_filename}")
+        
+        # Show file info
+        csv_path = f"scraped_data/{result_filename}"
+        if os.path.exists(csv_path):
+            # Count actual tweets in file
+            try:
+                with open(csv_path, 'r', encoding='utf-8-sig') as f:
+                    lines = f.readlines()
+                    actual_count = len(lines) - 1  # Minus header
+                
+                file_size = os.path.getsize(csv_path)
+                print(f"📊 Tweets collected: {actual_count}")
+                print(f"📏 File size: {file_size:,} bytes")
+                print(f"📂 Full path: {os.path.abspath(csv_path)}")
+                
+                # Show first few tweets as preview
+                print(f"\n📋 Preview of collected tweets:")
+                print("-" * 40)
+                
+                import csv
+                with open(csv_path, 'r', encoding='utf-8-sig') as f:
+                    reader = csv.DictReader(f)
+                    for i, row in enumerate(reader):
+                        if i >= 3:  # Show first 3 tweets
+                            break
+                        text = row.get('text', 'No text')[:80] + "..." if len(row.get('text', '')) > 80 else row.get('text', 'No text')
+                        username = row.get('username', 'Unknown')
+                        print(f"  {i+1}. @{username}: {text}")
+                
+                if actual_count > 3:
+                    print(f"  ... and {actual_count - 3} more tweets")
+                
+            except Exception as e:
+                print(f"⚠️  Could not read file details: {e}")
+        
+    else:
+        print("\n" + "=" * 50)
+        print("❌ SCRAPING FAILED")
+        print("=" * 50)
+        print("No tweets were collected. This might be due to:")
+        print("  • Network connection issues")
+        print("  • Search terms too specific")
+        print("  • Twitter rate limiting")
+        print("  • Browser automation detection")
+
 def main():
     """Main scraper function"""
+    args = parse_args()
+    setup_logging(verbose=args.verbose, quiet=args.quiet or (args.dashboard and not args.verbose))
+    start_metrics(args)
+    if args.trace is not None:
+        tracing.TRACER.enable()
+    scraper = None
     try:
+        if args.resume:
+            print(f"🔁 Resuming job {args.resume}...")
+            print("=" * 50)
+            scraper = make_scraper(args)
+            show_results(scraper.resume(args.resume))
+            return
+        
+        if args.watch:
+            print(f"👀 Watching {args.watch} every {args.interval}s (Ctrl+C to stop)")
+            print("=" * 50)
+            scraper = make_scraper(args, num_tabs=1)
+            watcher = QueryWatcher(scraper)
+            for term in args.watch.split(','):
+                if term.strip():
+                    watcher.add_query(term, interval=args.interval)
+            show_results(watcher.run())
+            return
+        
         # Get user input
         params = get_user_input()
         if not params:
@@ -119,12 +292,17 @@ def main():
         
         # Create timestamp for job ID
         job_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        print(f"💾 Job ID: {job_id} (if interrupted: python main.py --resume {job_id})")
         
         # Initialize scraper
-        scraper = TwitterScraper()
+        scraper = make_scraper(args)
         
         # Start scraping
-        result_filename = scraper.scrape(
+        scrape = scraper.scrape
+        if args.processes:
+            print(f"🧩 Process mode: {args.processes} processes (checkpoint/resume is off)")
+            scrape = lambda **kw: scraper.scrape_processes(num_processes=args.processes, **kw)
+        result_filename = scrape(
             keyword=params['keyword'],
             hashtag=params['hashtag'],
             username=params['username'],
@@ -133,62 +311,30 @@ def main():
             search_mode=params.get('search_mode', 'top')
         )
         
-        if result_filename:
-            print("\n" + "=" * 50)
-            print("✅ SCRAPING COMPLETED SUCCESSFULLY!")
-            print("=" * 50)
-            print(f"📁 File saved: {result_filename}")
-            
-            # Show file info
-            csv_path = f"scraped_data/{result_filename}"
-            if os.path.exists(csv_path):
-                # Count actual tweets in file
-                try:
-                    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-                        lines = f.readlines()
-                        actual_count = len(lines) - 1  # Minus header
-                    
-                    file_size = os.path.getsize(csv_path)
-                    print(f"📊 Tweets collected: {actual_count}")
-                    print(f"📏 File size: {file_size:,} bytes")
-                    print(f"📂 Full path: {os.path.abspath(csv_path)}")
-                    
-                    # Show first few tweets as preview
-                    print(f"\n📋 Preview of collected tweets:")
-                    print("-" * 40)
-                    
-                    import csv
-                    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-                        reader = csv.DictReader(f)
-                        for i, row in enumerate(reader):
-                            if i >= 3:  # Show first 3 tweets
-                                break
-                            text = row.get('text', 'No text')[:80] + "..." if len(row.get('text', '')) > 80 else row.get('text', 'No text')
-                            username = row.get('username', 'Unknown')
-                            print(f"  {i+1}. @{username}: {text}")
-                    
-                    if actual_count > 3:
-                        print(f"  ... and {actual_count - 3} more tweets")
-                    
-                except Exception as e:
-                    print(f"⚠️  Could not read file details: {e}")
-            
-        else:
-            print("\n" + "=" * 50)
-            print("❌ SCRAPING FAILED")
-            print("=" * 50)
-            print("No tweets were collected. This might be due to:")
-            print("  • Network connection issues")
-            print("  • Search terms too specific")
-            print("  • Twitter rate limiting")
-            print("  • Browser automation detection")
+        show_results(result_filename)
     
     except KeyboardInterrupt:
+        stop_dashboard()
+        flush_logging()
         print("\n\n⚠️  Scraping interrupted by user (Ctrl+C)")
+        if scraper and scraper.csv_handler:
+            # Tabs are already cancelled; keep what was saved
+            show_results(scraper.stop('interrupted'))
     except Exception as e:
         print(f"\n❌ Error occurred: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        stop_dashboard()
+        if scraper and scraper.replay:
+            scraper.replay.save()
+        if scraper:
+            scraper.close()
+        if args.metrics_file:
+            metrics.REGISTRY.stop_textfile_writer()
+            metrics.REGISTRY.write_textfile(args.metrics_file)  # Final values
+        if args.trace is not None:
+            save_trace(args, scraper)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
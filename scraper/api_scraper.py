@@ -7,11 +7,16 @@ import time
 import random
 from playwright.sync_api import sync_playwright
 from urllib.parse import quote
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
 
 class TwitterAPIScraper:
-    def __init__(self):
+    def __init__(self, replay=None):
         self.api_responses = []
         self.tweets_data = []
+        self.replay = replay  # FixtureReplayer / FixtureRecorder (scraper/replay.py)
+        self.scroll_latencies = []  # Seconds per scroll iteration
         
     def intercept_response(self, response):
         """Intercept Twitter API responses to extract tweet data"""
@@ -48,7 +53,7 @@ class TwitterAPIScraper:
                     for tweet_id, tweet_data in tweets.items():
                         self._process_tweet_data(tweet_data)
         except Exception as e:
-            print(f"Error extracting from API: {e}")
+            logger.error(f"Error extracting from API: {e}")
     
     def _find_key(self, obj, key):
         """Recursively find a key in nested dict/list"""
@@ -170,15 +175,15 @@ class TwitterAPIScraper:
             # Check if we already have this tweet
             if not any(t['tweet_id'] == tweet_id for t in self.tweets_data):
                 self.tweets_data.append(tweet)
-                print(f"✅ Extracted tweet: {username} - {likes} likes, {retweets} RTs, {replies} replies")
+                logger.debug("✅ Extracted tweet: %s - %s likes, %s RTs, %s replies", username, likes, retweets, replies)
         
         except Exception as e:
-            print(f"Error processing tweet data: {e}")
+            logger.error(f"Error processing tweet data: {e}")
     
     def scrape_with_api(self, search_url, num_tweets, cookies):
         """Scrape tweets using API interception"""
-        print(f"🔍 Starting API-based scraping...")
-        print(f"🎯 Target: {num_tweets} tweets")
+        logger.info(f"🔍 Starting API-based scraping...")
+        logger.info(f"🎯 Target: {num_tweets} tweets")
         
         try:
             with sync_playwright() as p:
@@ -189,11 +194,13 @@ class TwitterAPIScraper:
                 )
                 
                 context = browser.new_context()
+                if self.replay:
+                    self.replay.attach(context)
                 
                 # Add cookies for authentication
                 if cookies:
                     context.add_cookies(cookies)
-                    print(f"🔐 Added {len(cookies)} cookies for authentication")
+                    logger.info(f"🔐 Added {len(cookies)} cookies for authentication")
                 
                 page = context.new_page()
                 
@@ -201,7 +208,7 @@ class TwitterAPIScraper:
                 page.on('response', self.intercept_response)
                 
                 # Navigate to search page
-                print(f"🌐 Navigating to: {search_url}")
+                logger.info(f"🌐 Navigating to: {search_url}")
                 page.goto(search_url, timeout=30000)
                 time.sleep(3)  # Wait for initial load
                 
@@ -220,9 +227,10 @@ class TwitterAPIScraper:
                 
                 for scroll in range(max_scrolls):
                     if len(self.tweets_data) >= num_tweets:
-                        print(f"✅ Reached target: {len(self.tweets_data)} tweets")
+                        logger.info(f"✅ Reached target: {len(self.tweets_data)} tweets")
                         break
                     
+                    scroll_started = time.perf_counter()
                     previous_count = len(self.tweets_data)
                     
                     # Scroll down
@@ -232,23 +240,25 @@ class TwitterAPIScraper:
                     # Check if we got new tweets
                     if len(self.tweets_data) == previous_count:
                         no_new_tweets_count += 1
-                        print(f"⏳ No new tweets... ({no_new_tweets_count}/5)")
+                        logger.debug("⏳ No new tweets... (%d/5)", no_new_tweets_count)
                     else:
                         no_new_tweets_count = 0
-                        print(f"📊 Progress: {len(self.tweets_data)}/{num_tweets} tweets")
+                        logger.debug("📊 Progress: %d/%d tweets", len(self.tweets_data), num_tweets)
+                    
+                    self.scroll_latencies.append(time.perf_counter() - scroll_started)
                     
                     # Stop if no new tweets for 5 scrolls
                     if no_new_tweets_count >= 5:
-                        print(f"⚠️ No new tweets found, stopping")
+                        logger.warning(f"⚠️ No new tweets found, stopping")
                         break
                 
                 browser.close()
                 
-                print(f"✅ Scraping complete! Collected {len(self.tweets_data)} tweets with real engagement")
+                logger.info(f"✅ Scraping complete! Collected {len(self.tweets_data)} tweets with real engagement")
                 return self.tweets_data[:num_tweets]
         
         except Exception as e:
-            print(f"❌ Error during API scraping: {e}")
+            logger.error(f"❌ Error during API scraping: {e}")
             import traceback
             traceback.print_exc()
             return []
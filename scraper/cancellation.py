@@ -0,0 +1,58 @@
+"""
+Cancellation token shared by every worker of a job.
+
+Tabs, API handlers and child processes used to poll a plain
+`target_reached` flag that was set without locking. The token is set once,
+remembers why, and can notify callbacks so waiting work can be interrupted
+instead of noticing at its next loop iteration.
+"""
+import threading
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None  # e.g. 'target reached', 'interrupted'
+        self._callbacks = []
+        self.lock = threading.Lock()
+    
+    def cancel(self, reason='cancelled'):
+        """Cancel once; later calls keep the first reason. Returns True for the first call."""
+        with self.lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        
+        for callback in callbacks:
+            try:
+                callback(reason)
+            except Exception as e:
+                logger.error(f"Cancellation callback error: {e}")
+        return True
+    
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def wait(self, timeout=None) -> bool:
+        """Block until cancelled (or timeout); True if cancelled"""
+        return self._event.wait(timeout)
+    
+    def on_cancel(self, callback):
+        """Call callback(reason) on cancellation (right away if already cancelled)"""
+        with self.lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self.reason)
+    
+    def remove_callback(self, callback):
+        with self.lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+    
+    def __repr__(self):
+        return f"CancellationToken({'cancelled: ' + self.reason if self.is_cancelled() else 'active'})"
@@ -0,0 +1,68 @@
+"""
+Job checkpoints for resumable scrapes.
+
+A running job periodically saves the last timeline cursor per query shard,
+the dedupe set and the sink's byte offset. `TwitterScraper.resume(job_id)`
+reloads them, truncates the CSV back to the checkpointed offset and continues
+each query from its cursor, appending to the same output file.
+"""
+import os
+import json
+import time
+import threading
+from typing import Optional
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+CHECKPOINT_DIR = 'scraped_data/checkpoints'
+
+class JobCheckpoint:
+    def __init__(self, job_id, directory=CHECKPOINT_DIR):
+        self.job_id = job_id
+        self.directory = directory
+        self.path = os.path.join(directory, f'{job_id}.json')
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @classmethod
+    def load(cls, job_id, directory=CHECKPOINT_DIR) -> Optional[dict]:
+        """Saved state for a job, or None if it was never checkpointed"""
+        path = os.path.join(directory, f'{job_id}.json')
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save(self, state: dict):
+        """Atomically write the checkpoint (a crash mid-write keeps the previous one)"""
+        state = dict(state, job_id=self.job_id, updated_at=time.time())
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+    
+    def start(self, collect_state, interval=10):
+        """Call collect_state() and save its result every `interval` seconds"""
+        def checkpoint_worker():
+            while not self._stop.wait(interval):
+                try:
+                    self.save(collect_state())
+                except Exception as e:
+                    logger.error(f"Checkpoint error: {e}")
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=checkpoint_worker, daemon=True)
+        self._thread.start()
+    
+    def stop(self, final_state: dict = None):
+        """Stop periodic saves and write one last checkpoint"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if final_state is not None:
+            self.save(final_state)
@@ -1,5 +1,31 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import List, Optional
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+# Cookies X needs for an authenticated session
+REQUIRED_COOKIES = ('auth_token', 'ct0')
+
+# Parsed cookie files keyed by (path, mtime) so workers never re-read the same file
+_cookie_cache = {}
+_cookie_cache_lock = threading.Lock()
+
 def load_cookies(cookie_file='x.com_cookies.txt'):
     """Load cookies from Netscape format file"""
+    try:
+        cache_key = (os.path.abspath(cookie_file), os.path.getmtime(cookie_file))
+    except OSError:
+        cache_key = None
+    
+    if cache_key:
+        with _cookie_cache_lock:
+            if cache_key in _cookie_cache:
+                return [dict(cookie) for cookie in _cookie_cache[cache_key]]
+    
     cookies = []
     
     try:
@@ -28,9 +54,144 @@ def load_cookies(cookie_file='x.com_cookies.txt'):
                     }
                     cookies.append(cookie)
         
-        print(f"Loaded {len(cookies)} cookies")
-        return cookies
+        logger.info(f"Loaded {len(cookies)} cookies")
+        if cache_key:
+            with _cookie_cache_lock:
+                _cookie_cache[cache_key] = cookies
+        return [dict(cookie) for cookie in cookies]
     
     except FileNotFoundError:
-        print(f"Warning: {cookie_file} not found. Scraping without authentication.")
+        logger.warning(f"{cookie_file} not found. Scraping without authentication.")
         return []
+
+def find_cookie_files(source) -> List[str]:
+    """Expand a cookie source into Netscape cookie files.
+    
+    `source` may be a file, a directory of *.txt files, a comma-separated
+    string of either, or a list of them.
+    """
+    if isinstance(source, str):
+        source = [s.strip() for s in source.split(',') if s.strip()]
+    
+    files = []
+    for path in source or []:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.txt')
+            ))
+        else:
+            files.append(path)
+    return files
+
+class Account:
+    def __init__(self, name, cookies, requests_per_window=150, window_seconds=900, path=None):
+        self.name = name
+        self.cookies = cookies
+        self.path = path  # Cookie file the account was loaded from
+        self.requests_per_window = requests_per_window  # Rate-limit budget per window
+        self.window_seconds = window_seconds
+        self.request_times = deque()
+        self.cooldown_until = 0
+        self.lock = threading.Lock()
+    
+    def _expire(self, now):
+        while self.request_times and now - self.request_times[0] > self.window_seconds:
+            self.request_times.popleft()
+    
+    def budget_remaining(self) -> int:
+        """Requests left in the current rate-limit window"""
+        with self.lock:
+            self._expire(time.time())
+            return self.requests_per_window - len(self.request_times)
+    
+    def is_available(self) -> bool:
+        """Not cooling down and still has budget"""
+        return time.time() >= self.cooldown_until and self.budget_remaining() > 0
+    
+    def available_at(self) -> float:
+        """Earliest time this account can be used again"""
+        with self.lock:
+            now = time.time()
+            self._expire(now)
+            ready_at = self.cooldown_until
+            if len(self.request_times) >= self.requests_per_window:
+                ready_at = max(ready_at, self.request_times[0] + self.window_seconds)
+            return max(ready_at, now)
+    
+    def record_request(self, count=1):
+        """Spend budget for requests made with this account"""
+        with self.lock:
+            now = time.time()
+            self.request_times.extend([now] * count)
+            self._expire(now)
+    
+    def cooldown(self, seconds):
+        """Rest this account, e.g. after X answered with 429"""
+        with self.lock:
+            self.cooldown_until = max(self.cooldown_until, time.time() + seconds)
+        logger.info(f"Account {self.name}: cooling down for {seconds}s")
+    
+    def __repr__(self):
+        return f"Account({self.name})"
+
+class CookiePool:
+    def __init__(self, source='x.com_cookies.txt', requests_per_window=150, window_seconds=900,
+                 cooldown_seconds=900):
+        """Pool of authenticated accounts loaded from one or more Netscape cookie files"""
+        self.cooldown_seconds = cooldown_seconds
+        self.accounts = []
+        self.next_index = 0
+        self.lock = threading.Lock()
+        
+        for path in find_cookie_files(source):
+            if not os.path.exists(path):
+                logger.warning(f"{path} not found. Scraping without authentication.")
+                continue
+            cookies = load_cookies(path)
+            names = {cookie['name'] for cookie in cookies}
+            missing = [name for name in REQUIRED_COOKIES if name not in names]
+            if missing:
+                logger.warning(f"Skipping {path}, missing cookies: {', '.join(missing)}")
+                continue
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.accounts.append(Account(name, cookies, requests_per_window, window_seconds, path=path))
+        
+        if len(self.accounts) > 1:
+            logger.info(f"Cookie pool: {len(self.accounts)} accounts")
+    
+    def __len__(self):
+        return len(self.accounts)
+    
+    def cookie_sets(self):
+        """(name, cookies) pairs, one per account"""
+        return [(account.name, account.cookies) for account in self.accounts]
+    
+    def get_account(self, name) -> Optional[Account]:
+        for account in self.accounts:
+            if account.name == name:
+                return account
+        return None
+    
+    def lease(self, timeout=None) -> Optional[Account]:
+        """Next account in round-robin order that has budget, waiting up to `timeout` seconds"""
+        if not self.accounts:
+            return None
+        
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self.lock:
+                for offset in range(len(self.accounts)):
+                    account = self.accounts[(self.next_index + offset) % len(self.accounts)]
+                    if account.is_available():
+                        self.next_index = (self.next_index + offset + 1) % len(self.accounts)
+                        return account
+                wake_at = min(account.available_at() for account in self.accounts)
+            
+            if deadline is not None and wake_at > deadline:
+                return None
+            time.sleep(max(0.05, min(wake_at - time.time(), 1.0)))
+    
+    def mark_rate_limited(self, account: Account):
+        """Put an account on cooldown after a 429"""
+        if account:
+            account.cooldown(self.cooldown_seconds)
@@ -2,17 +2,24 @@ import csv
 import os
 from datetime import datetime
 import threading
+from scraper.reservation import ReservingSink
+from scraper.log import get_logger
+from scraper.tracing import span
 
-class CSVHandler:
-    def __init__(self, job_id=None):
+logger = get_logger(__name__)
+
+class CSVHandler(ReservingSink):
+    def __init__(self, job_id=None, resume=False):
         self.timestamp = job_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.job_id = self.timestamp
         self.tweets_file = f'scraped_data/twitter_scrape_{self.timestamp}.csv'
         self.seen_tweet_ids = set()
         self.write_lock = threading.Lock()
         self.tweet_count = 0
         
-        # Create CSV with headers
-        self._initialize_csv()
+        # Create CSV with headers (a resumed job appends to the existing file)
+        if not (resume and os.path.exists(self.tweets_file)):
+            self._initialize_csv()
     
     def _initialize_csv(self):
         """Create CSV file with headers"""
@@ -30,42 +37,37 @@ class CSVHandler:
             ], quoting=csv.QUOTE_ALL)
             writer.writeheader()
         
-        print(f"Created CSV file: {self.tweets_file}")
-    
-    def add_tweet(self, tweet_data):
-        """Alias for append_tweet for compatibility"""
-        return self.append_tweet(tweet_data)
+        logger.info(f"Created CSV file: {self.tweets_file}")
     
-    def append_tweet(self, tweet_data):
-        """Append a single tweet to CSV (thread-safe)"""
+    def _append_locked(self, tweet_data):
+        """Append a single tweet to CSV; caller holds write_lock"""
         tweet_id = tweet_data.get('tweet_id')
         
         # Check for duplicates
-        with self.write_lock:
-            if tweet_id in self.seen_tweet_ids:
-                return False
-            
-            self.seen_tweet_ids.add(tweet_id)
+        if tweet_id in self.seen_tweet_ids:
+            return False
+        
+        self.seen_tweet_ids.add(tweet_id)
+        
+        # Append to CSV
+        try:
+            with span('csv_write', 'io'), open(self.tweets_file, 'a', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=[
+                    'tweet_id', 'tweet_url', 'username', 'display_name', 'verified',
+                    'text', 'timestamp', 'language', 'tweet_type',
+                    'likes', 'retweets', 'replies', 'quotes', 'bookmarks', 'views', 'engagement_rate',
+                    'hashtags', 'mentions', 'media_urls', 'is_original',
+                    'tweet_link', 'profile_link',
+                    'profile_bio', 'profile_location', 'profile_website', 'profile_email',
+                    'followers_count', 'following_count'
+                ], quoting=csv.QUOTE_ALL)
+                writer.writerow(tweet_data)
             
-            # Append to CSV
-            try:
-                with open(self.tweets_file, 'a', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.DictWriter(f, fieldnames=[
-                        'tweet_id', 'tweet_url', 'username', 'display_name', 'verified',
-                        'text', 'timestamp', 'language', 'tweet_type',
-                        'likes', 'retweets', 'replies', 'quotes', 'bookmarks', 'views', 'engagement_rate',
-                        'hashtags', 'mentions', 'media_urls', 'is_original',
-                        'tweet_link', 'profile_link',
-                        'profile_bio', 'profile_location', 'profile_website', 'profile_email',
-                        'followers_count', 'following_count'
-                    ], quoting=csv.QUOTE_ALL)
-                    writer.writerow(tweet_data)
-                
-                self.tweet_count += 1
-                return True
-            except Exception as e:
-                print(f"❌ Error writing tweet to CSV: {e}")
-                return False
+            self.tweet_count += 1
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error writing tweet to CSV: {e}")
+            return False
     
     def get_filename(self):
         """Get the CSV filename"""
@@ -75,6 +77,30 @@ class CSVHandler:
         """Get current number of tweets saved"""
         return self.tweet_count
 
+    def close(self):
+        """Rows are written as they come; nothing to flush or stop"""
+
+    def checkpoint_state(self, collect=None):
+        """Return what a resumed job needs to continue this file"""
+        with self.write_lock:
+            state = {
+                'sink_offset': os.path.getsize(self.tweets_file),
+                'tweet_count': self.tweet_count,
+                'seen_ids': list(self.seen_tweet_ids),
+            }
+            if collect:
+                state.update(collect())  # Read in the same snapshot as the offset
+            return state
+    
+    def restore(self, state):
+        """Roll the file back to a checkpoint and reload its dedupe set"""
+        with self.write_lock:
+            # Rows written after the checkpoint are dropped; they will be scraped again
+            with open(self.tweets_file, 'r+b') as f:
+                f.truncate(state['sink_offset'])
+            self.seen_tweet_ids = set(state['seen_ids'])
+            self.tweet_count = state['tweet_count']
+
     def save_user_profile(self, user_data):
         """Save user profile data to a separate CSV"""
         user_file = f'scraped_data/twitter_user_{self.timestamp}.csv'
@@ -88,9 +114,9 @@ class CSVHandler:
                 writer.writeheader()
                 writer.writerow(user_data)
             
-            print(f"👤 User profile saved to: {user_file}")
+            logger.info(f"👤 User profile saved to: {user_file}")
         except Exception as e:
-            print(f"❌ Error saving user profile: {e}")
+            logger.error(f"❌ Error saving user profile: {e}")
     
     def get_tweet_count(self):
         """Get current number of tweets in CSV"""
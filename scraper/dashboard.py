@@ -0,0 +1,200 @@
+"""
+Live terminal dashboard: per-tab state and throughput, redrawn at a fixed rate.
+
+The engine records tab events on BOARD (a few attribute writes per event);
+a Dashboard thread redraws one frame every `interval` seconds, so rendering
+cost stays bounded no matter how many tweets or responses arrive:
+
+    📺 Job 20250101_120000  340/1000 tweets  412/min  ETA 1m36s  4 tabs, 1 stalled
+     TAB  STATE          TWEETS   /MIN  LATENCY  429s  LAST NEW  PROXY
+       0  scrolling         120    160    0.42s     0        2s  10.0.0.1
+       1  rate limited       40      0        -     3       45s  10.0.0.2  ⚠️ stalled
+"""
+import sys
+import time
+import logging
+import threading
+from collections import deque
+
+class TabStatus:
+    def __init__(self, tab_id):
+        self.tab_id = tab_id
+        self.state = 'starting'
+        self.active = True  # False once the tab's page is closed
+        self.proxy = '-'
+        self.query = None  # Shard label of a fan-out tab
+        self.tweets = 0  # New tweets this tab saved (API + DOM)
+        self.rate_limited = 0  # 429/503 answers seen by this tab
+        self.latency = None  # Seconds the last timeline API response took
+        self.started = time.time()
+        self.last_tweet = None  # Unix time of the last new tweet
+        self.samples = deque()  # (time, tweets) per rendered frame, for tweets/min
+
+class TabBoard:
+    """Per-tab status written by the engine and read by the dashboard"""
+    def __init__(self):
+        self.tabs = {}
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.tabs = {}
+
+    def tab(self, tab_id):
+        status = self.tabs.get(tab_id)
+        if status is None:
+            with self.lock:
+                status = self.tabs.setdefault(tab_id, TabStatus(tab_id))
+        return status
+
+    def set_state(self, tab_id, state, **fields):
+        status = self.tab(tab_id)
+        status.state = state
+        status.active = True
+        for name, value in fields.items():
+            setattr(status, name, value)
+
+    def tweet(self, tab_id, count=1):
+        status = self.tab(tab_id)
+        status.tweets += count
+        status.last_tweet = time.time()
+
+    def response(self, tab_id, latency):
+        status = self.tab(tab_id)
+        status.latency = latency
+        if status.state == 'rate limited':
+            status.state = 'scrolling'  # Answers are coming through again
+
+    def rate_limited(self, tab_id):
+        status = self.tab(tab_id)
+        status.rate_limited += 1
+        status.state = 'rate limited'
+
+    def finish(self, tab_id):
+        status = self.tab(tab_id)
+        status.active = False
+        if status.state in ('starting', 'navigating', 'scrolling'):
+            status.state = 'done'
+
+    def snapshot(self):
+        with self.lock:
+            return sorted(self.tabs.values(), key=lambda status: str(status.tab_id))
+
+BOARD = TabBoard()
+
+def _duration(seconds):
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    if seconds < 60:
+        return f'{seconds}s'
+    if seconds < 3600:
+        return f'{seconds // 60}m{seconds % 60:02d}s'
+    return f'{seconds // 3600}h{seconds % 3600 // 60:02d}m'
+
+class _RecentWarnings(logging.Handler):
+    """Keeps the last few warnings so they stay on screen under the table"""
+    def __init__(self, size=3):
+        super().__init__(logging.WARNING)
+        self.messages = deque(maxlen=size)
+
+    def emit(self, record):
+        self.messages.append(f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.getMessage()}")
+
+class Dashboard:
+    def __init__(self, scraper, board=None, interval=1.0, window=60, stall_after=30, stream=None):
+        self.scraper = scraper  # TwitterScraper whose sink and target give the global progress
+        self.board = board or BOARD
+        self.interval = interval  # Seconds between frames
+        self.window = window  # Seconds of history behind tweets/min
+        self.stall_after = stall_after  # A working tab with no new tweet for this long is flagged
+        self.stream = stream or sys.stdout
+        self.ansi = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.samples = deque()  # (time, sink count) for the global rate
+        self.warnings = _RecentWarnings()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _rate(self, samples, now, value):
+        """Per-minute rate over the window, from one sample per frame"""
+        if samples and value < samples[-1][1]:
+            samples.clear()  # A new job started
+        samples.append((now, value))
+        while len(samples) > 1 and samples[0][0] < now - self.window:
+            samples.popleft()
+        then, old_value = samples[0]
+        if now - then < 1e-6:
+            return 0.0
+        return (value - old_value) / (now - then) * 60
+
+    def render(self, now=None):
+        """One frame as text"""
+        now = now or time.time()
+        scraper = self.scraper
+        sink = scraper.csv_handler
+        count = sink.get_tweet_count() if sink else 0
+        target = getattr(scraper, 'target_tweets', None) or 0
+        rate = self._rate(self.samples, now, count)
+        if target and count >= target:
+            eta = 'done'
+        elif rate > 0 and target != float('inf'):
+            eta = _duration((target - count) / rate * 60)
+        else:
+            eta = '-'
+        target_text = f'/{target}' if target and target != float('inf') else ''
+
+        rows = []
+        stalled = 0
+        for status in self.board.snapshot():
+            tab_rate = self._rate(status.samples, now, status.tweets)
+            since = now - (status.last_tweet or status.started)
+            flag = ''
+            if status.active and since >= self.stall_after:
+                stalled += 1
+                flag = '  ⚠️ stalled'
+            latency = f'{status.latency:.2f}s' if status.latency is not None else '-'
+            proxy = status.proxy + (f' [{status.query}]' if status.query else '')
+            rows.append(f'{status.tab_id!s:>4}  {status.state:<13} {status.tweets:>7} {tab_rate:>6.0f} '
+                        f'{latency:>8} {status.rate_limited:>5} {_duration(since):>9}  {proxy}{flag}')
+
+        job_id = getattr(scraper, 'job_id', None) or '-'
+        lines = [
+            f'📺 Job {job_id}  {count}{target_text} tweets  {rate:.0f}/min  ETA {eta}  '
+            f'{len(rows)} tabs, {stalled} stalled',
+            f'{"TAB":>4}  {"STATE":<13} {"TWEETS":>7} {"/MIN":>6} {"LATENCY":>8} {"429s":>5} {"LAST NEW":>9}  PROXY',
+        ]
+        lines += rows
+        if self.warnings.messages:
+            lines += [''] + [f'⚠️  {message}' for message in self.warnings.messages]
+        return '\n'.join(lines)
+
+    def draw(self):
+        frame = self.render()
+        if self.ansi:
+            frame = '\x1b[H\x1b[2J' + frame  # Redraw in place
+        else:
+            frame += '\n'
+        self.stream.write(frame + '\n')
+        self.stream.flush()
+
+    def start(self):
+        def loop():
+            while not self.stop_event.wait(self.interval):
+                try:
+                    self.draw()
+                except Exception:
+                    pass  # A torn frame must never kill the job
+        logging.getLogger('scraper').addHandler(self.warnings)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=loop, daemon=True, name='dashboard')
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop redrawing and leave the final frame on screen"""
+        self.stop_event.set()
+        logging.getLogger('scraper').removeHandler(self.warnings)
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+            self.draw()
@@ -0,0 +1,780 @@
+"""
+Unified asyncio scrape engine.
+
+Every tab used to be an OS thread with its own sync_playwright() driver
+process, and turbo mode was a separate async scraper with its own extraction
+code. Here all pages are coroutines on one event loop sharing one Playwright
+driver; identities get their own context (with their sticky proxy) inside at
+most two browsers, one direct and one with per-context proxies.
+
+Standard, optimized and turbo scraping are EngineConfig presets. Tweets are
+parsed by TwitterScraper's API parser, with a single-evaluate DOM fallback.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+from urllib.parse import urlsplit, urlunsplit, parse_qs, urlencode
+from playwright.async_api import async_playwright
+from scraper import metrics
+from scraper.dashboard import BOARD
+from scraper.log import get_logger
+from scraper.tracing import span
+
+logger = get_logger(__name__)
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+
+STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+"""
+
+# One round trip per scroll: raw article data plus a no-results check
+EXTRACT_TWEETS_JS = """
+() => {
+    const bodyText = ((document.body && document.body.innerText) || '').toLowerCase();
+    const noResults = ['no results', 'try searching for something else', 'nothing here', 'no tweets found',
+                       "hmm...this page doesn't exist", "this page doesn't exist"].some(s => bodyText.includes(s));
+    const count = (article, testId) => {
+        const button = article.querySelector(`[data-testid="${testId}"]`);
+        const match = button && (button.getAttribute('aria-label') || '').match(/(\\d+)/);
+        return match ? match[1] : '0';
+    };
+    const articles = Array.from(document.querySelectorAll('article'))
+        .filter(article => !article.closest('[data-scraper-pruned]'))  // Hidden by PRUNE_CELLS_JS
+        .slice(0, 50).map(article => {
+        const textElem = article.querySelector('[data-testid="tweetText"]') || article.querySelector('div[lang]');
+        const href = Array.from(article.querySelectorAll('a[href*="/status/"]'))
+            .map(a => a.getAttribute('href'))
+            .find(h => /\\/status\\/\\d+/.test(h)) || '';
+        return {
+            text: textElem ? textElem.innerText : '',
+            href: href,
+            likes: count(article, 'like'),
+            retweets: count(article, 'retweet'),
+            replies: count(article, 'reply')
+        };
+    });
+    return {articles: articles, noResults: noResults};
+}
+"""
+
+# Optional (EngineConfig.prune_dom): cells far above the viewport were extracted on earlier
+# scrolls, so their content is hidden and the cell pinned at its measured height. React still
+# owns the children, so they are left in place (removing them breaks its next reconcile); with
+# display:none they cost no layout or paint, extraction skips them, and the scroll height, and
+# with it the timeline's requests for more, is unchanged.
+PRUNE_CELLS_JS = """
+(keepScreens) => {
+    const limit = -window.innerHeight * keepScreens;
+    const cells = document.querySelectorAll('[data-testid="cellInnerDiv"]');
+    let pruned = 0;
+    for (const cell of cells) {
+        if (cell.dataset.scraperPruned) continue;
+        const rect = cell.getBoundingClientRect();
+        if (rect.bottom >= limit) continue;
+        cell.style.height = rect.height + 'px';
+        for (const child of cell.children) child.style.display = 'none';
+        cell.dataset.scraperPruned = '1';
+        pruned++;
+    }
+    return {pruned: pruned, cells: cells.length};
+}
+"""
+
+BLOCKING_INDICATORS = [
+    "something went wrong",
+    "this account is suspended",
+    "this account doesn't exist",
+    "rate limit exceeded",
+    "temporarily restricted",
+    "suspicious activity",
+    "page doesn't exist",
+    "try searching for something else",
+    "hmm...this page doesn't exist",
+    "this page doesn't exist"
+]
+
+TIMELINE_ROUTE = re.compile(r'/(SearchTimeline|UserTweets)\?')
+
+class EngineConfig:
+    """How many pages to run and how they scroll. None = size it to the target."""
+    def __init__(self, name='standard', num_pages=None, max_scrolls=None, scroll_screens=None,
+                 scroll_pause=None, max_idle_scrolls=None, block_resources=False, timeout=None, stagger=0.0,
+                 recycle_scrolls=100, recycle_heap_mb=300, recycle_nodes=20000, health_every=10,
+                 prune_dom=False, prune_keep_screens=3):
+        self.name = name
+        self.num_pages = num_pages
+        self.max_scrolls = max_scrolls
+        self.scroll_screens = scroll_screens  # (min, max) viewport heights per scroll
+        self.scroll_pause = scroll_pause  # (min, max) seconds after each scroll
+        self.max_idle_scrolls = max_idle_scrolls  # Scrolls without new tweets before a page gives up
+        self.block_resources = block_resources  # Abort image/media/font requests
+        self.timeout = timeout  # Seconds before the whole run is cancelled
+        self.stagger = stagger  # Seconds between page starts
+        # A page past any of these is reopened at its timeline cursor (None = never)
+        self.recycle_scrolls = recycle_scrolls
+        self.recycle_heap_mb = recycle_heap_mb  # Used JS heap
+        self.recycle_nodes = recycle_nodes  # DOM nodes
+        self.health_every = health_every  # Scrolls between heap/node samples
+        self.prune_dom = prune_dom  # Hide extracted cells in the page (PRUNE_CELLS_JS)
+        self.prune_keep_screens = prune_keep_screens  # Viewport heights above the fold left intact
+    
+    @classmethod
+    def standard(cls):
+        """Adaptive pacing sized to the target (scrape)"""
+        return cls('standard')
+    
+    @classmethod
+    def optimized(cls):
+        """Many pages, fast fixed-pace scrolling for 500+ tweet targets (scrape_optimized)"""
+        return cls('optimized', num_pages=12, max_scrolls=200, scroll_screens=(2, 2), scroll_pause=(0.5, 0.5),
+                   max_idle_scrolls=10, stagger=0.1)
+    
+    @classmethod
+    def turbo(cls):
+        """Short, aggressive runs with heavy resources blocked (scrape_turbo)"""
+        return cls('turbo', num_pages=8, max_scrolls=25, scroll_screens=(2.5, 2.5), scroll_pause=(0.4, 0.4),
+                   max_idle_scrolls=5, block_resources=True, timeout=120)
+
+class PageMonitor:
+    """JS heap and DOM node counts of one page, read from the CDP Performance domain"""
+    def __init__(self, context, page, tab_id=None):
+        self.context = context
+        self.page = page
+        self.tab_id = tab_id
+        self.session = None
+        self.available = True
+    
+    async def sample(self):
+        """{'heap_mb': ..., 'nodes': ...}, or None when the browser has no CDP"""
+        if not self.available:
+            return None
+        try:
+            if self.session is None:
+                self.session = await self.context.new_cdp_session(self.page)
+                await self.session.send('Performance.enable')
+            result = await self.session.send('Performance.getMetrics')
+        except Exception:
+            self.available = False
+            return None
+        values = {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+        heap = values.get('JSHeapUsedSize', 0)
+        nodes = int(values.get('Nodes', 0))
+        metrics.PAGE_JS_HEAP.set(heap, tab=self.tab_id)
+        metrics.PAGE_DOM_NODES.set(nodes, tab=self.tab_id)
+        logger.debug("Tab %s: Page at %.0f MB JS heap, %d DOM nodes", self.tab_id, heap / 1024 / 1024, nodes)
+        return {'heap_mb': heap / 1024 / 1024, 'nodes': nodes}
+
+class ScrapeEngine:
+    def __init__(self, scraper, config=None):
+        self.scraper = scraper  # TwitterScraper providing identities, sessions, parsing and the sink
+        self.config = config or EngineConfig.standard()
+        self.playwright = None
+        self._playwright_manager = None
+        self.browsers = {}  # 'direct' / 'proxied' -> Browser
+        self.browser_lock = None
+        self.scroll_latencies = []  # Seconds per scroll iteration (extract + save + scroll + pause)
+        self.tab_cursors = {}  # tab_id -> bottom cursor of the last timeline page that tab received
+    
+    def run(self, search_url, num_tweets, num_tabs, fanout=False):
+        """Blocking entry point for sync callers"""
+        return asyncio.run(self.run_async(search_url, num_tweets, num_tabs, fanout))
+    
+    async def run_async(self, search_url, num_tweets, num_tabs, fanout=False):
+        """Run num_tabs pages on one driver until the target is met or every page gives up
+        
+        With fanout, pages take query shards from the scraper instead of search_url.
+        """
+        self.browser_lock = asyncio.Lock()
+        tasks = []
+        # Target reached or Ctrl+C: cancel every tab, even one stuck in a navigation or a wait
+        loop = asyncio.get_running_loop()
+        token = self.scraper.cancel_token
+        def cancel_tabs(reason):
+            try:
+                loop.call_soon_threadsafe(self._cancel_tabs, tasks, reason)
+            except RuntimeError:
+                pass  # Loop already closed
+        token.on_cancel(cancel_tabs)
+        try:
+            for tab_id in range(num_tabs):
+                if token.is_cancelled():
+                    break
+                if fanout:
+                    work = self._fanout_tab(tab_id)
+                else:
+                    work = self.scrape_timeline(search_url, num_tweets, tab_id)
+                tasks.append(asyncio.create_task(self._run_tab(work, tab_id)))
+                if self.config.stagger:
+                    await asyncio.sleep(self.config.stagger)
+            
+            try:
+                await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=self.config.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏰ {self.config.name} run timed out after {self.config.timeout}s")
+        except asyncio.CancelledError:
+            token.cancel('interrupted')  # Ctrl+C under asyncio.run cancels this coroutine
+            raise
+        finally:
+            token.remove_callback(cancel_tabs)
+            for browser in self.browsers.values():
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            self.browsers = {}
+            if self._playwright_manager:
+                await self._playwright_manager.__aexit__(None, None, None)
+                self._playwright_manager = None
+                self.playwright = None
+    
+    def _cancel_tabs(self, tasks, reason):
+        running = [task for task in tasks if not task.done()]
+        if running:
+            logger.info(f"🛑 {reason.capitalize()}: cancelling {len(running)} running tabs")
+        for task in running:
+            task.cancel()
+    
+    async def _lease_identity(self):
+        """Lease off the event loop; a lease that lands after cancellation goes straight back"""
+        pool = self.scraper.identity_pool
+        while not self.scraper.target_reached:
+            # Short waits so a cancelled job leaves no thread blocked in lease()
+            lease = asyncio.ensure_future(asyncio.to_thread(pool.lease, 0.5))
+            try:
+                identity = await asyncio.shield(lease)
+            except asyncio.CancelledError:
+                lease.add_done_callback(
+                    lambda f: f.cancelled() or f.exception() or pool.release(f.result()))
+                raise
+            if identity:
+                return identity
+        return None
+    
+    async def _run_tab(self, work, tab_id):
+        try:
+            await work
+        except Exception as e:
+            logger.error(f"Tab error: {e}")
+    
+    async def _fanout_tab(self, tab_id):
+        """Keep one page busy with one query after another"""
+        scraper = self.scraper
+        while not scraper.target_reached:
+            shard = scraper._next_shard()
+            if shard is None:
+                return
+            try:
+                logger.info(f"Tab {tab_id}: Query {shard.label}")
+                await self.scrape_timeline(shard.url, shard.quota, tab_id, shard=shard)
+            finally:
+                with scraper.lock:
+                    shard.active_tabs -= 1
+                    if not shard.is_full():
+                        shard.failed_runs += 1
+                        # Two runs that could not fill the quota = timeline is drained
+                        shard.exhausted = shard.failed_runs >= 2
+                logger.info(f"Tab {tab_id}: {shard.progress()}")
+    
+    async def _get_browser(self, proxied):
+        """Shared browsers, launched on first use (the driver is started lazily too)"""
+        key = 'proxied' if proxied else 'direct'
+        async with self.browser_lock:
+            if self.playwright is None:
+                self._playwright_manager = async_playwright()
+                self.playwright = await self._playwright_manager.__aenter__()
+            if key not in self.browsers:
+                # Chromium only honours per-context proxies when launched with a global one
+                with span('browser_launch', 'browser', lane='Browser', proxied=proxied):
+                    self.browsers[key] = await self.playwright.chromium.launch(
+                        headless=True,
+                        args=BROWSER_ARGS,
+                        proxy={'server': 'http://per-context'} if proxied else None
+                    )
+            return self.browsers[key]
+    
+    async def _new_context(self, identity, tab_id):
+        """Context carrying the identity's sticky proxy, user agent and warm session"""
+        scraper = self.scraper
+        proxy = identity.get_proxy(scraper.proxy_manager)
+        if proxy:
+            logger.info(f"Tab {tab_id}: Using proxy {proxy.get('server', 'unknown')} ({identity.name})")
+        else:
+            logger.info(f"Tab {tab_id}: No proxy available, using direct connection ({identity.name})")
+        
+        browser = await self._get_browser(bool(proxy))
+        saved_state = scraper.session_store.load(identity.name)
+        context = await browser.new_context(
+            user_agent=identity.user_agent,
+            viewport={'width': 1366, 'height': 768},
+            locale='en-US',
+            timezone_id='America/New_York',
+            storage_state=saved_state,
+            service_workers='block',  # Keep saved state free of service-worker caches
+            proxy={k: v for k, v in proxy.items() if not k.startswith('_')} if proxy else None
+        )
+        
+        if saved_state:
+            # Saved state already carries the refreshed cookies
+            logger.info(f"Tab {tab_id}: Restored warm session for {identity.name}")
+        elif identity.cookies:
+            await context.add_cookies(identity.cookies)
+        
+        if self.config.block_resources:
+            async def block_heavy(route):
+                if route.request.resource_type in ('image', 'media', 'font'):
+                    await route.abort()
+                else:
+                    await route.continue_()
+            await context.route('**/*', block_heavy)
+        if scraper.replay:
+            await scraper.replay.attach_async(context)  # Registered last, so it answers first
+        return context, proxy, saved_state
+    
+    async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+        """One page working one timeline
+        
+        With a shard, num_tweets is the shard's quota and the page stops once it is met.
+        """
+        scraper = self.scraper
+        logger.info(f"Tab {tab_id}: Starting...")
+        BOARD.set_state(tab_id, 'starting', query=shard.label if shard else None)
+        identity = await self._lease_identity()
+        if identity is None:
+            return
+        context = None
+        try:
+            with span('new_context', 'browser', lane=f'Tab {tab_id}', identity=identity.name):
+                context, proxy, saved_state = await self._new_context(identity, tab_id)
+            proxy_label = metrics.proxy_label(identity.proxy_string if proxy else None)
+            BOARD.set_state(tab_id, 'navigating', proxy=proxy_label)
+            
+            async def open_page(cursor):
+                """Fresh page on this context, its timeline starting at cursor (None = the top)"""
+                with span('new_page', 'browser', lane=f'Tab {tab_id}'):
+                    page = await context.new_page()
+                    await page.add_init_script(STEALTH_JS)
+                
+                # Set up API response interception for real engagement metrics
+                if scraper.use_api_extraction:
+                    async def on_response(response):
+                        await self._on_api_response(response, tab_id, identity, shard, proxy_label)
+                    page.on('response', on_response)
+                
+                if cursor:
+                    await self._resume_timeline_at(page, cursor, tab_id)
+                if not await self._open_timeline(page, search_url, tab_id, identity, proxy):
+                    return None
+                return page
+            
+            # A resumed job picks the timeline up where the checkpoint left it
+            self.tab_cursors.pop(tab_id, None)
+            page = await open_page(scraper.resume_cursors.get(scraper._cursor_key(tab_id, shard)))
+            if page is None:
+                return
+            
+            if saved_state:
+                # Warm session: wait for the timeline itself instead of a fixed warmup
+                try:
+                    await page.wait_for_selector('article', timeout=5000)
+                except Exception:
+                    pass
+            else:
+                await asyncio.sleep(random.uniform(3, 5))
+            
+            blocking_reason = await self._blocking_reason(page)
+            if blocking_reason:
+                logger.info(f"Tab {tab_id}: {blocking_reason}")
+                BOARD.set_state(tab_id, 'blocked')
+                scraper.session_store.invalidate(identity.name)
+                if proxy:
+                    logger.warning(f"Tab {tab_id}: Marking proxy as failed")
+                    scraper.proxy_manager.mark_failed(proxy)
+                    scraper.identity_pool.rebind(identity)
+                return
+            
+            # Try to close any popups
+            try:
+                close_btn = await page.query_selector('[aria-label="Close"]')
+                if close_btn:
+                    await close_btn.click()
+                    await asyncio.sleep(0.3)
+            except Exception:
+                pass
+            
+            BOARD.set_state(tab_id, 'scrolling')
+            tweets_found = await self._scroll_timeline(page, context, identity, num_tweets, tab_id, shard, open_page)
+            logger.info(f"Tab {tab_id}: Finished with {tweets_found} tweets")
+        except Exception as e:
+            logger.error(f"Tab {tab_id}: Error: {e}")
+            BOARD.set_state(tab_id, 'error')
+        finally:
+            BOARD.finish(tab_id)
+            if context:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            scraper.identity_pool.release(identity)
+    
+    async def _open_timeline(self, page, search_url, tab_id, identity, proxy):
+        """Navigate with retries; False when the tab should give up"""
+        scraper = self.scraper
+        logger.info(f"Tab {tab_id}: Navigating to search page...")
+        max_retries = 3
+        for retry in range(max_retries):
+            try:
+                with span('navigation', 'network', lane=f'Tab {tab_id}', attempt=retry + 1):
+                    response = await page.goto(search_url, timeout=45000, wait_until='domcontentloaded')
+                logger.info(f"Tab {tab_id}: Response status: {response.status if response else 'None'}")
+                
+                if response and response.status == 200:
+                    return True
+                elif response and response.status in [429, 503]:
+                    logger.warning(f"Tab {tab_id}: Rate limited (status {response.status}), marking proxy as failed")
+                    metrics.RATE_LIMITED.inc(tab=tab_id, proxy=metrics.proxy_label(identity.proxy_string if proxy else None))
+                    BOARD.rate_limited(tab_id)
+                    if identity.account:
+                        scraper.cookie_pool.mark_rate_limited(identity.account)
+                    if proxy:
+                        scraper.proxy_manager.mark_failed(proxy)
+                        scraper.identity_pool.rebind(identity)
+                    await asyncio.sleep(random.uniform(5, 10))
+                    return False
+            except Exception as e:
+                logger.warning(f"Tab {tab_id}: Navigation attempt {retry + 1} failed: {e}")
+                if retry < max_retries - 1:
+                    await asyncio.sleep(random.uniform(2, 4))
+                else:
+                    return False
+        return True
+    
+    async def _blocking_reason(self, page):
+        """Why the page looks blocked, or None"""
+        title = await page.title()
+        logger.debug("Page title: '%s' (%s)", title, page.url)
+        if (title == "X" or
+            "login" in title.lower() or
+            "sign" in title.lower() or
+            "suspended" in title.lower() or
+            "unavailable" in title.lower()):
+            return f"Title indicates blocking: {title}"
+        
+        try:
+            page_content = (await page.content()).lower()
+        except Exception:
+            return None
+        for indicator in BLOCKING_INDICATORS:
+            if indicator in page_content:
+                return f"Content indicates blocking: {indicator}"
+        return None
+    
+    async def _scroll_timeline(self, page, context, identity, num_tweets, tab_id, shard, open_page=None):
+        """Scroll until the target, the quota or the timeline runs out; returns tweets saved
+        
+        With open_page, a page grown past the recycle thresholds is swapped for a fresh one
+        at this tab's timeline cursor, so per-scroll cost stays flat on long runs.
+        """
+        scraper = self.scraper
+        tweets_found = 0
+        no_content_count = 0
+        session_saved = scraper.session_store.is_fresh(identity.name)
+        max_scrolls = self.config.max_scrolls or self._default_max_scrolls(num_tweets)
+        last_count = self._progress_count(shard)
+        lane = f'Tab {tab_id}'
+        monitor = PageMonitor(context, page, tab_id)
+        scrolls_on_page = 0
+        
+        for scroll in range(max_scrolls):
+            scroll_started = time.perf_counter()
+            if scraper.target_reached:
+                logger.info(f"Tab {tab_id}: Target reached globally, stopping")
+                break
+            
+            if not identity.is_available():
+                # Wait for the window to refill instead of capping the job at one window's budget
+                wait = identity.account.available_at() - time.time()
+                logger.info(f"Tab {tab_id}: Account {identity.name} out of rate-limit budget, waiting {wait:.0f}s")
+                BOARD.set_state(tab_id, 'rate limited')
+                await asyncio.sleep(wait)
+                BOARD.set_state(tab_id, 'scrolling')
+                if scraper.target_reached:
+                    logger.info(f"Tab {tab_id}: Target reached globally, stopping")
+                    break
+            
+            if shard and shard.is_full():
+                logger.info(f"Tab {tab_id}: Quota reached for {shard.label}, stopping")
+                break
+            
+            scrolls_on_page += 1
+            health = None
+            if self.config.health_every and scrolls_on_page % self.config.health_every == 0:
+                health = await monitor.sample()
+            recycle = self._recycle_reason(health, scrolls_on_page) if open_page else None
+            if recycle:
+                page = await self._recycle_page(page, open_page, tab_id, *recycle)
+                if page is None:
+                    break
+                monitor = PageMonitor(context, page, tab_id)
+                scrolls_on_page = 0
+            
+            with span('dom_extract', 'parse', lane=lane, scroll=scroll):
+                view = await page.evaluate(EXTRACT_TWEETS_JS)
+                tweets = [t for t in (scraper._build_dom_tweet(article) for article in view['articles']) if t]
+            if view['noResults'] and not view['articles']:
+                logger.info(f"Tab {tab_id}: No results page detected, stopping")
+                break
+            
+            # First view with tweets = a working session worth keeping
+            if view['articles'] and not session_saved:
+                await scraper.session_store.save_async(context, identity.name)
+                session_saved = True
+            
+            with span('dom_save', 'sink', lane=lane, tweets=len(tweets)):
+                tweets_found += self._save_dom_tweets(tweets, shard, tab_id)
+            if self.config.prune_dom:
+                await self._prune_dom(page, tab_id)
+            
+            # API interception saves tweets between scrolls, so progress is measured on the sink
+            current_count = self._progress_count(shard)
+            new_tweets = current_count - last_count
+            last_count = current_count
+            if new_tweets > 0:
+                total = scraper.csv_handler.get_tweet_count()
+                if shard:
+                    logger.debug("Tab %s: +%d tweets for %s (%d/%d, Total: %d/%d)", tab_id, new_tweets, shard.label,
+                                 shard.count, num_tweets, total, scraper.target_tweets)
+                else:
+                    logger.debug("Tab %s: +%d tweets (Total: %d/%d)", tab_id, new_tweets, total, num_tweets)
+                no_content_count = 0
+            else:
+                no_content_count += 1
+            
+            progress_ratio = current_count / num_tweets
+            max_no_content = self.config.max_idle_scrolls or self._default_max_idle(num_tweets, progress_ratio)
+            if no_content_count >= max_no_content:
+                logger.info(f"Tab {tab_id}: No new content for {max_no_content} attempts (progress: {progress_ratio:.1%}), stopping")
+                break
+            
+            # Time spent here is mostly waiting for the next timeline page to arrive
+            with span('scroll_wait', 'network', lane=lane, scroll=scroll):
+                screens = random.uniform(*(self.config.scroll_screens or self._default_scroll_screens(num_tweets)))
+                await page.evaluate('(screens) => window.scrollBy(0, window.innerHeight * screens)', screens)
+                
+                if self.config.scroll_pause:
+                    await asyncio.sleep(random.uniform(*self.config.scroll_pause))
+                else:
+                    await asyncio.sleep(self._default_scroll_pause(num_tweets, no_content_count))
+            scroll_latency = time.perf_counter() - scroll_started
+            self.scroll_latencies.append(scroll_latency)
+            metrics.SCROLL_LATENCY.observe(scroll_latency, tab=tab_id)
+        
+        return tweets_found
+    
+    async def _prune_dom(self, page, tab_id):
+        """Hide timeline cells the extraction has already read (keeps extraction cost flat)"""
+        try:
+            with span('dom_prune', 'browser', lane=f'Tab {tab_id}'):
+                result = await page.evaluate(PRUNE_CELLS_JS, self.config.prune_keep_screens)
+        except Exception as e:
+            logger.debug("Tab %s: DOM pruning failed: %s", tab_id, e)
+            return
+        if result['pruned']:
+            metrics.DOM_CELLS_PRUNED.inc(result['pruned'], tab=tab_id)
+            logger.debug("Tab %s: Pruned %d of %d timeline cells", tab_id, result['pruned'], result['cells'])
+    
+    def _recycle_reason(self, health, scrolls_on_page):
+        """(kind, description) once the page is due for recycling, else None"""
+        config = self.config
+        if config.recycle_scrolls and scrolls_on_page >= config.recycle_scrolls:
+            return 'scrolls', f'{scrolls_on_page} scrolls'
+        if not health:
+            return None
+        if config.recycle_heap_mb and health['heap_mb'] >= config.recycle_heap_mb:
+            return 'heap', f"{health['heap_mb']:.0f} MB JS heap"
+        if config.recycle_nodes and health['nodes'] >= config.recycle_nodes:
+            return 'nodes', f"{health['nodes']} DOM nodes"
+        return None
+    
+    async def _recycle_page(self, page, open_page, tab_id, kind, description):
+        """Swap the page for a fresh one at the tab's cursor; same page if no cursor yet, None if reopening failed"""
+        cursor = self.tab_cursors.get(tab_id)
+        if not cursor:
+            logger.debug("Tab %s: Page due for recycling (%s) but no timeline cursor yet", tab_id, description)
+            return page
+        
+        logger.info(f"Tab {tab_id}: Recycling page ({description}), resuming at its timeline cursor")
+        metrics.PAGE_RECYCLES.inc(tab=tab_id, reason=kind)
+        with span('page_recycle', 'browser', lane=f'Tab {tab_id}', reason=kind):
+            try:
+                await page.close()
+            except Exception:
+                pass
+            page = await open_page(cursor)
+            if page is not None:
+                try:
+                    await page.wait_for_selector('article', timeout=5000)
+                except Exception:
+                    pass
+        return page
+    
+    def _progress_count(self, shard):
+        return shard.count if shard else self.scraper.csv_handler.get_tweet_count()
+    
+    def _save_dom_tweets(self, tweets, shard, tab_id=None):
+        """Save DOM-extracted tweets the API interception has not already saved"""
+        scraper = self.scraper
+        saved_count = 0
+        for tweet in tweets:
+            if shard and not shard.reserve():
+                break  # This query's quota is full
+            if not scraper.csv_handler.try_reserve(1):
+                if shard:
+                    shard.commit(False)
+                scraper.target_reached = True
+                break
+            
+            saved = scraper.csv_handler.commit_tweet(tweet)
+            if shard:
+                shard.commit(saved)
+            query = shard.label if shard else 'main'
+            if saved:
+                saved_count += 1
+                scraper._count_saved()
+                metrics.TWEETS_ACCEPTED.inc(tab=tab_id, query=query, source='dom')
+                BOARD.tweet(tab_id)
+            else:
+                metrics.TWEETS_DUPLICATE.inc(tab=tab_id, query=query, source='dom')
+        return saved_count
+    
+    def _default_max_scrolls(self, num_tweets):
+        # Much more aggressive scrolling for larger targets
+        if num_tweets >= 200:
+            return 300
+        elif num_tweets >= 100:
+            return 200
+        elif num_tweets >= 50:
+            return 100
+        return 50
+    
+    def _default_max_idle(self, num_tweets, progress_ratio):
+        """Scrolls without new tweets before giving up: more patience for big targets and early on"""
+        if num_tweets >= 200:
+            if progress_ratio < 0.2:
+                return 25
+            elif progress_ratio < 0.5:
+                return 20
+            elif progress_ratio < 0.8:
+                return 15
+            return 12
+        elif num_tweets >= 100:
+            if progress_ratio < 0.3:
+                return 20
+            elif progress_ratio < 0.6:
+                return 15
+            elif progress_ratio < 0.85:
+                return 12
+            return 10
+        elif num_tweets >= 50:
+            if progress_ratio < 0.5:
+                return 15
+            elif progress_ratio < 0.8:
+                return 12
+            return 10
+        return 8
+    
+    def _default_scroll_screens(self, num_tweets):
+        if num_tweets >= 200:
+            return (8, 12)
+        elif num_tweets >= 100:
+            return (6, 10)
+        return (4, 8)
+    
+    def _default_scroll_pause(self, num_tweets, no_content_count):
+        """Adaptive wait: longer when the timeline is struggling to load"""
+        if no_content_count >= 8:
+            return random.uniform(1.5, 2.0)
+        elif no_content_count >= 5:
+            return random.uniform(1.0, 1.5)
+        elif no_content_count >= 3:
+            return random.uniform(0.8, 1.2)
+        elif num_tweets >= 200:
+            return random.uniform(0.4, 0.6)
+        elif num_tweets >= 100:
+            return random.uniform(0.5, 0.8)
+        return random.uniform(0.3, 0.6)
+    
+    async def _on_api_response(self, response, tab_id, identity=None, shard=None, proxy_label='direct'):
+        """Intercept Twitter API responses to extract real engagement data"""
+        scraper = self.scraper
+        try:
+            url = response.url
+            # Look for Twitter's GraphQL API endpoints
+            operation = next((op for op in ('SearchTimeline', 'TweetDetail', 'UserTweets') if op in url), None)
+            if ('api.twitter.com' in url or 'x.com/i/api' in url) and operation:
+                if response.status == 429:
+                    metrics.RATE_LIMITED.inc(tab=tab_id, proxy=proxy_label)
+                    BOARD.rate_limited(tab_id)
+                # Every timeline call spends the account's rate-limit budget
+                if identity and identity.account:
+                    identity.account.record_request()
+                    if response.status == 429:
+                        logger.warning(f"Tab {tab_id}: Account {identity.account.name} rate limited")
+                        scraper.cookie_pool.mark_rate_limited(identity.account)
+                        return
+                lane = f'Tab {tab_id} API'
+                with span('response_body', 'network', lane=lane, operation=operation):
+                    body = await response.body()
+                metrics.RESPONSE_BYTES.inc(len(body), tab=tab_id, proxy=proxy_label)
+                with span('json_parse', 'parse', lane=lane, bytes=len(body)):
+                    data = json.loads(body)
+                metrics.API_RESPONSES.inc(tab=tab_id, proxy=proxy_label, operation=operation)
+                BOARD.response(tab_id, self._response_latency(response))
+                with span('api_extract', 'parse', lane=lane, operation=operation):
+                    cursor = scraper._extract_tweets_from_api(data, tab_id, shard)
+                if cursor and operation != 'TweetDetail':
+                    self.tab_cursors[tab_id] = cursor  # Where a recycled page picks up
+        except Exception:
+            pass
+    
+    def _response_latency(self, response):
+        """Seconds from request start to the last byte (None when the browser did not time it)"""
+        try:
+            response_end = response.request.timing['responseEnd']
+        except Exception:
+            return None
+        return response_end / 1000 if response_end >= 0 else None
+    
+    async def _resume_timeline_at(self, page, cursor, tab_id):
+        """Make the page's first timeline request start from a saved cursor (checkpoint or recycled page)"""
+        state = {'injected': False}
+        
+        async def handle_route(route):
+            url = route.request.url
+            if not state['injected']:
+                parts = urlsplit(url)
+                query = parse_qs(parts.query)
+                try:
+                    variables = json.loads(query['variables'][0])
+                except (KeyError, ValueError):
+                    variables = None
+                if variables is not None and 'cursor' not in variables:
+                    variables['cursor'] = cursor
+                    query['variables'] = [json.dumps(variables, separators=(',', ':'))]
+                    url = urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+                    state['injected'] = True
+                    logger.info(f"Tab {tab_id}: Resuming timeline from saved cursor")
+            # fallback, not continue_: the context's replayer and resource blocker still see the request
+            await route.fallback(url=url)
+        
+        await page.route(TIMELINE_ROUTE, handle_route)
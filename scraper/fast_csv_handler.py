@@ -1,67 +1,73 @@
 import csv
 import os
 import threading
-from typing import List, Dict
+from typing import Dict
 from collections import deque
 import time
+from scraper.reservation import ReservingSink
+from scraper import metrics
+from scraper.log import get_logger
+from scraper.tracing import span
 
-class FastCSVHandler:
-    def __init__(self, job_id=None, batch_size=50):
+logger = get_logger(__name__)
+
+# Column order of every scrape CSV (also the field order of compact records)
+FIELDNAMES = [
+    'tweet_id', 'tweet_url', 'username', 'display_name', 'verified',
+    'text', 'timestamp', 'language', 'tweet_type',
+    'likes', 'retweets', 'replies', 'quotes', 'bookmarks', 'views', 'engagement_rate',
+    'hashtags', 'mentions', 'media_urls', 'is_original',
+    'tweet_link', 'profile_link',
+    'profile_bio', 'profile_location', 'profile_website', 'profile_email',
+    'followers_count', 'following_count'
+]
+
+class FastCSVHandler(ReservingSink):
+    def __init__(self, job_id=None, batch_size=50, resume=False):
         self.job_id = job_id or int(time.time())
-        self.tweets_file = f'scraped_data/twitter_scrape_{self.job_id}.csv'
+        # Absolute, so late background flushes land in this file even if the cwd changes
+        self.tweets_file = os.path.abspath(f'scraped_data/twitter_scrape_{self.job_id}.csv')
         self.batch_size = batch_size
         self.tweet_buffer = deque()
         self.seen_tweet_ids = set()
         self.write_lock = threading.Lock()
         self.tweet_count = 0
         self.last_flush = time.time()
+        self.stop_event = threading.Event()
+        self.flusher = None
         
-        # Create CSV with headers
-        self._initialize_csv()
+        # Create CSV with headers (a resumed job appends to the existing file)
+        if not (resume and os.path.exists(self.tweets_file)):
+            self._initialize_csv()
         
         # Start background flusher
         self._start_background_flusher()
+        metrics.SINK_QUEUE_DEPTH.set_function(lambda: len(self.tweet_buffer), sink='csv')
     
     def _initialize_csv(self):
         """Create CSV file with headers"""
         os.makedirs('scraped_data', exist_ok=True)
         
-        fieldnames = [
-            'tweet_id', 'tweet_url', 'username', 'display_name', 'verified',
-            'text', 'timestamp', 'language', 'tweet_type',
-            'likes', 'retweets', 'replies', 'quotes', 'bookmarks', 'views', 'engagement_rate',
-            'hashtags', 'mentions', 'media_urls', 'is_original',
-            'tweet_link', 'profile_link',
-            'profile_bio', 'profile_location', 'profile_website', 'profile_email',
-            'followers_count', 'following_count'
-        ]
-        
         with open(self.tweets_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
             writer.writeheader()
     
-    def add_tweet(self, tweet_data: Dict) -> bool:
-        """Alias for append_tweet for compatibility"""
-        return self.append_tweet(tweet_data)
-
-    def append_tweet(self, tweet_data: Dict) -> bool:
-        """Add tweet to buffer (faster than immediate write)"""
+    def _append_locked(self, tweet_data: Dict) -> bool:
+        """Add tweet to buffer (faster than immediate write); caller holds write_lock"""
         tweet_id = tweet_data.get('tweet_id')
+        if tweet_id in self.seen_tweet_ids:
+            return False
         
-        with self.write_lock:
-            if tweet_id in self.seen_tweet_ids:
-                return False
-            
-            self.seen_tweet_ids.add(tweet_id)
-            self.tweet_buffer.append(tweet_data)
-            self.tweet_count += 1
-            
-            # Force flush if buffer is full or it's been too long
-            if (len(self.tweet_buffer) >= self.batch_size or 
-                time.time() - self.last_flush > 1.0):
-                self._flush_buffer()
-            
-            return True
+        self.seen_tweet_ids.add(tweet_id)
+        self.tweet_buffer.append(tweet_data)
+        self.tweet_count += 1
+        
+        # Force flush if buffer is full or it's been too long
+        if (len(self.tweet_buffer) >= self.batch_size or 
+            time.time() - self.last_flush > 1.0):
+            self._flush_buffer()
+        
+        return True
     
     def _flush_buffer(self):
         """Write buffered tweets to CSV"""
@@ -69,18 +75,9 @@ class FastCSVHandler:
             return
         
         try:
-            fieldnames = [
-                'tweet_id', 'tweet_url', 'username', 'display_name', 'verified',
-                'text', 'timestamp', 'language', 'tweet_type',
-                'likes', 'retweets', 'replies', 'quotes', 'bookmarks', 'views', 'engagement_rate',
-                'hashtags', 'mentions', 'media_urls', 'is_original',
-                'tweet_link', 'profile_link',
-                'profile_bio', 'profile_location', 'profile_website', 'profile_email',
-                'followers_count', 'following_count'
-            ]
-            
-            with open(self.tweets_file, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
+            with span('csv_flush', 'io', rows=len(self.tweet_buffer)), \
+                    open(self.tweets_file, 'a', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDNAMES, quoting=csv.QUOTE_ALL)
                 
                 while self.tweet_buffer:
                     tweet = self.tweet_buffer.popleft()
@@ -89,25 +86,55 @@ class FastCSVHandler:
             self.last_flush = time.time()
             
         except Exception as e:
-            print(f"❌ Error flushing to CSV: {e}")
+            logger.error(f"❌ Error flushing to CSV: {e}")
     
     def _start_background_flusher(self):
         """Start background thread to flush buffer periodically"""
         def flush_worker():
-            while True:
-                time.sleep(1)  # Check every second
+            while not self.stop_event.wait(1):  # Check every second
                 with self.write_lock:
                     if self.tweet_buffer and time.time() - self.last_flush > 3:
                         self._flush_buffer()
         
-        thread = threading.Thread(target=flush_worker, daemon=True)
-        thread.start()
+        self.flusher = threading.Thread(target=flush_worker, daemon=True)
+        self.flusher.start()
     
     def force_flush(self):
         """Force immediate flush of all buffered data"""
         with self.write_lock:
             self._flush_buffer()
     
+    def close(self):
+        """Stop the background flusher and write what is still buffered"""
+        self.stop_event.set()
+        if self.flusher:
+            self.flusher.join(timeout=2)
+            self.flusher = None
+        self.force_flush()
+    
+    def checkpoint_state(self, collect=None) -> Dict:
+        """Flush and return what a resumed job needs to continue this file"""
+        with self.write_lock:
+            self._flush_buffer()
+            state = {
+                'sink_offset': os.path.getsize(self.tweets_file),
+                'tweet_count': self.tweet_count,
+                'seen_ids': list(self.seen_tweet_ids),
+            }
+            if collect:
+                state.update(collect())  # Read in the same snapshot as the offset
+            return state
+    
+    def restore(self, state: Dict):
+        """Roll the file back to a checkpoint and reload its dedupe set"""
+        with self.write_lock:
+            self.tweet_buffer.clear()
+            # Rows written after the checkpoint are dropped; they will be scraped again
+            with open(self.tweets_file, 'r+b') as f:
+                f.truncate(state['sink_offset'])
+            self.seen_tweet_ids = set(state['seen_ids'])
+            self.tweet_count = state['tweet_count']
+    
     def get_filename(self):
         return f'twitter_scrape_{self.job_id}.csv'
     
@@ -0,0 +1,238 @@
+"""
+Batch tweet hydration by id list.
+
+Instead of one page load per tweet, the web client's GraphQL setup (bearer
+token, csrf header, feature flags and the TweetResultsByRestIds query id) is
+captured once per context, and tweets are then fetched 100 ids per request.
+Every result goes through TwitterScraper._process_api_tweet.
+"""
+import re
+import json
+import time
+import threading
+from queue import Queue, Empty
+from urllib.parse import quote, urlsplit, parse_qs
+from playwright.sync_api import sync_playwright
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+OPERATION_NAME = 'TweetResultsByRestIds'
+
+# Used when no GraphQL request could be observed to copy feature flags from
+DEFAULT_FEATURES = {
+    'creator_subscriptions_tweet_preview_api_enabled': True,
+    'communities_web_enable_tweet_community_results_fetch': True,
+    'c9s_tweet_anatomy_moderator_badge_enabled': True,
+    'articles_preview_enabled': True,
+    'tweetypie_unmention_optimization_enabled': True,
+    'responsive_web_edit_tweet_api_enabled': True,
+    'graphql_is_translatable_rweb_tweet_is_translatable_enabled': True,
+    'view_counts_everywhere_api_enabled': True,
+    'longform_notetweets_consumption_enabled': True,
+    'responsive_web_twitter_article_tweet_consumption_enabled': True,
+    'tweet_awards_web_tipping_enabled': False,
+    'freedom_of_speech_not_reach_fetch_enabled': True,
+    'standardized_nudges_misinfo': True,
+    'tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled': True,
+    'rweb_video_timestamps_enabled': True,
+    'longform_notetweets_rich_text_read_enabled': True,
+    'longform_notetweets_inline_media_enabled': True,
+    'responsive_web_graphql_exclude_directive_enabled': True,
+    'verified_phone_label_enabled': False,
+    'responsive_web_graphql_skip_user_profile_image_extensions_enabled': False,
+    'responsive_web_graphql_timeline_navigation_enabled': True,
+    'responsive_web_enhance_cards_enabled': False,
+}
+
+# Headers the web client sends with every GraphQL call. x-client-transaction-id is
+# left out: it is signed per request, so a captured one is rejected when replayed.
+CLIENT_HEADERS = ('authorization', 'x-twitter-auth-type', 'x-twitter-active-user',
+                  'x-twitter-client-language')
+
+class RateLimited(Exception):
+    pass
+
+class TweetHydrator:
+    def __init__(self, scraper, batch_size=100, num_workers=4, query_id=None, on_tweet=None):
+        self.scraper = scraper  # TwitterScraper providing identities, sessions and the sink
+        self.on_tweet = on_tweet  # Receives parsed tweets instead of the sink (e.g. metric snapshots)
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.query_id = query_id  # Captured from the client bundle when not given
+        self.client_headers = {}
+        self.features = None
+        self.config_lock = threading.Lock()
+        self.hydrated_ids = set()
+        self.missing_ids = set()  # Ids the API answered for but returned no tweet (deleted/protected)
+    
+    def hydrate(self, tweet_ids):
+        """Fetch tweets in batches and save them through the scraper's sink.
+        
+        Returns the set of ids that were hydrated. Ids that are not in the set
+        either no longer exist or could not be fetched.
+        """
+        batches = [tweet_ids[i:i + self.batch_size] for i in range(0, len(tweet_ids), self.batch_size)]
+        if not batches:
+            return set()
+        
+        work_queue = Queue()
+        for batch in batches:
+            work_queue.put((batch, 0))
+        
+        num_workers = self.scraper._limit_tabs_to_identities(min(self.num_workers, len(batches)))
+        logger.info(f"💧 HYDRATING {len(tweet_ids)} tweets in {len(batches)} batches ({num_workers} workers)")
+        start_time = time.time()
+        
+        threads = [threading.Thread(target=self._worker, args=(work_queue, i), daemon=True)
+                   for i in range(num_workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.scraper.cancel_token.cancel('interrupted')  # Workers stop after their current batch
+            raise
+        
+        elapsed = time.time() - start_time
+        logger.info(f"Hydrated {len(self.hydrated_ids)}/{len(tweet_ids)} tweets in {elapsed:.1f}s")
+        return self.hydrated_ids
+    
+    def _worker(self, work_queue, worker_id):
+        identity = self.scraper.identity_pool.lease()
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(
+                    headless=True,
+                    args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-blink-features=AutomationControlled'],
+                    proxy=identity.get_proxy(self.scraper.proxy_manager)
+                )
+                saved_state = self.scraper.session_store.load(identity.name)
+                context = browser.new_context(
+                    user_agent=identity.user_agent,
+                    locale='en-US',
+                    storage_state=saved_state,
+                    service_workers='block'
+                )
+                if identity.cookies and not saved_state:
+                    context.add_cookies(identity.cookies)
+                if self.scraper.replay:
+                    self.scraper.replay.attach(context)
+                
+                page = context.new_page()
+                if not self._capture_client_config(page):
+                    logger.warning(f"Hydrator {worker_id}: Could not find the {OPERATION_NAME} query id")
+                    browser.close()
+                    return
+                
+                csrf_token = next((c['value'] for c in context.cookies() if c['name'] == 'ct0'), '')
+                headers = dict(self.client_headers)
+                headers['x-csrf-token'] = csrf_token
+                headers['content-type'] = 'application/json'
+                
+                while not self.scraper.cancel_token.is_cancelled():
+                    try:
+                        batch, attempt = work_queue.get_nowait()
+                    except Empty:
+                        break
+                    
+                    try:
+                        self._fetch_batch(context, batch, headers, identity)
+                    except RateLimited:
+                        work_queue.put((batch, attempt))
+                        logger.warning(f"Hydrator {worker_id}: Rate limited, handing batch back")
+                        break
+                    except Exception as e:
+                        if attempt + 1 < 3:
+                            work_queue.put((batch, attempt + 1))
+                        else:
+                            logger.warning(f"Hydrator {worker_id}: Giving up on batch of {len(batch)}: {e}")
+                
+                browser.close()
+        except Exception as e:
+            logger.error(f"Hydrator {worker_id}: Error: {e}")
+        finally:
+            self.scraper.identity_pool.release(identity)
+    
+    def _capture_client_config(self, page):
+        """Load the web client once and copy its GraphQL headers, features and query id"""
+        with self.config_lock:
+            if self.query_id and self.client_headers:
+                return True
+            
+            bundles = []
+            
+            def on_request(request):
+                if '/i/api/graphql/' in request.url and not self.client_headers:
+                    request_headers = request.headers
+                    self.client_headers = {k: v for k, v in request_headers.items() if k in CLIENT_HEADERS}
+                    features = parse_qs(urlsplit(request.url).query).get('features')
+                    if features:
+                        try:
+                            self.features = json.loads(features[0])
+                        except ValueError:
+                            pass
+            
+            def on_response(response):
+                if response.url.endswith('.js') and 'client-web' in response.url:
+                    bundles.append(response)
+            
+            page.on('request', on_request)
+            page.on('response', on_response)
+            try:
+                page.goto('https://x.com/explore', timeout=30000, wait_until='domcontentloaded')
+                page.wait_for_timeout(3000)
+            except Exception as e:
+                logger.warning(f"Hydrator: Could not load the web client: {e}")
+            
+            if not self.query_id:
+                pattern = re.compile(r'queryId:"([^"]+)",operationName:"' + OPERATION_NAME + '"')
+                for bundle in bundles:
+                    try:
+                        match = pattern.search(bundle.text())
+                    except Exception:
+                        continue
+                    if match:
+                        self.query_id = match.group(1)
+                        break
+            
+            page.remove_listener('request', on_request)
+            page.remove_listener('response', on_response)
+            return bool(self.query_id and self.client_headers)
+    
+    def _fetch_batch(self, context, batch, headers, identity):
+        """One GraphQL call for up to batch_size tweets"""
+        variables = {'tweetIds': batch, 'withCommunity': False, 'includePromotedContent': False, 'withVoice': False}
+        features = self.features or DEFAULT_FEATURES
+        url = (f'https://x.com/i/api/graphql/{self.query_id}/{OPERATION_NAME}'
+               f'?variables={quote(json.dumps(variables, separators=(",", ":")))}'
+               f'&features={quote(json.dumps(features, separators=(",", ":")))}')
+        
+        response = context.request.get(url, headers=headers, timeout=30000)
+        if identity.account:
+            identity.account.record_request()
+        if response.status == 429:
+            if identity.account:
+                self.scraper.cookie_pool.mark_rate_limited(identity.account)
+            raise RateLimited()
+        if response.status != 200:
+            raise RuntimeError(f'{OPERATION_NAME} status {response.status}')
+        
+        results = (response.json().get('data') or {}).get('tweetResult') or []
+        returned = set()
+        for item in results:
+            result = (item or {}).get('result')
+            if not result:
+                continue
+            if self.on_tweet:
+                tweet = self.scraper._parse_api_tweet(result)
+                if tweet:
+                    self.on_tweet(tweet)
+            else:
+                tweet = self.scraper._process_api_tweet(result, 'hydrate', require_engagement=False)
+            if tweet:
+                returned.add(tweet['tweet_id'])
+        
+        self.hydrated_ids.update(returned)
+        self.missing_ids.update(set(batch) - returned)
@@ -0,0 +1,182 @@
+"""
+Browser identities: a cookie set bound to a sticky proxy and user agent.
+
+Every tab used to pick a random proxy while sharing the same cookies, so one
+account showed up from many IPs at once. An identity keeps an account on one
+proxy and one user agent across jobs. Leases spread tabs over the accounts,
+least busy first; strict mode (tabs_per_identity) caps the tabs per account.
+"""
+import os
+import json
+import time
+import random
+import threading
+from typing import List, Optional
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+class Identity:
+    def __init__(self, name, cookies=None, proxy_string=None, user_agent=None, account=None):
+        self.name = name
+        self.cookies = cookies or []
+        self.proxy_string = proxy_string  # Sticky proxy (ip:port[:user:pass]) or None for direct
+        self.user_agent = user_agent
+        self.account = account  # cookie_loader.Account carrying the rate-limit budget, if any
+        self.active_leases = 0
+        self.last_leased = 0
+    
+    def is_available(self) -> bool:
+        """False while the account is cooling down or out of budget"""
+        return self.account is None or self.account.is_available()
+    
+    def get_proxy(self, proxy_manager) -> Optional[dict]:
+        """Playwright proxy dict for the sticky proxy, or None for a direct connection"""
+        if not self.proxy_string:
+            return None
+        proxy_dict = proxy_manager.parse_proxy(self.proxy_string)
+        if proxy_dict:
+            proxy_dict['_proxy_string'] = self.proxy_string  # For failure tracking
+        return proxy_dict
+    
+    def to_dict(self):
+        return {'proxy': self.proxy_string, 'user_agent': self.user_agent}
+    
+    def __repr__(self):
+        proxy = self.proxy_string.split(':')[0] if self.proxy_string else 'direct'
+        return f"Identity({self.name}, proxy={proxy})"
+
+class IdentityPool:
+    def __init__(self, proxy_manager, user_agents: List[str], cookie_sets=None,
+                 state_file='identities.json', tabs_per_identity=None, cookie_pool=None, read_only=False):
+        """
+        Args:
+            cookie_sets: list of (name, cookies) pairs, one per account. Without
+                cookies, anonymous identities are created on demand.
+            tabs_per_identity: how many workers may hold the same identity at once
+                (strict mode, e.g. 1). None shares identities between any number of
+                workers, least busy first.
+            cookie_pool: CookiePool whose accounts (and budgets) back the identities
+            read_only: load saved bindings but never write state_file (e.g. child processes)
+        """
+        self.proxy_manager = proxy_manager
+        self.user_agents = user_agents
+        self.state_file = state_file
+        self.read_only = read_only
+        self.tabs_per_identity = tabs_per_identity
+        self.identities = []
+        self.condition = threading.Condition()
+        self.saved_bindings = self._load_state()
+        self.lease_counter = 0
+        if cookie_pool is not None:
+            cookie_sets = cookie_pool.cookie_sets()
+        self.anonymous = not cookie_sets
+        
+        for name, cookies in cookie_sets or []:
+            identity = self._create_identity(name, cookies)
+            if cookie_pool is not None:
+                identity.account = cookie_pool.get_account(name)
+            self.identities.append(identity)
+        if self.identities:
+            self._save_state()
+    
+    def _load_state(self):
+        """Load identity -> proxy/user agent bindings saved by earlier jobs"""
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _save_state(self):
+        """Persist bindings so identities keep their proxy across jobs"""
+        if self.read_only:
+            return
+        bindings = dict(self.saved_bindings)
+        for identity in self.identities:
+            bindings[identity.name] = identity.to_dict()
+        # Write a temp file and swap it in, so a concurrent reader never sees half a file
+        tmp_path = f'{self.state_file}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(bindings, f, indent=2)
+            os.replace(tmp_path, self.state_file)
+            self.saved_bindings = bindings
+        except OSError as e:
+            logger.warning(f"Could not save identities to {self.state_file}: {e}")
+    
+    def _proxy_usable(self, proxy_string):
+        return (proxy_string in self.proxy_manager.proxies and
+                proxy_string not in self.proxy_manager.dead_proxies and
+                proxy_string not in self.proxy_manager.failed_proxies)
+    
+    def _pick_proxy(self):
+        """Least used live proxy, so identities spread over distinct IPs"""
+        proxy = self.proxy_manager.get_proxy()
+        return proxy.get('_proxy_string') if proxy else None
+    
+    def _create_identity(self, name, cookies):
+        saved = self.saved_bindings.get(name, {})
+        proxy_string = saved.get('proxy')
+        if not proxy_string or not self._proxy_usable(proxy_string):
+            proxy_string = self._pick_proxy()
+        user_agent = saved.get('user_agent')
+        if user_agent not in self.user_agents:
+            user_agent = random.choice(self.user_agents)
+        return Identity(name, cookies, proxy_string, user_agent)
+    
+    def capacity(self) -> Optional[int]:
+        """Max concurrent leases, or None when anonymous identities are unbounded"""
+        if self.anonymous or self.tabs_per_identity is None:
+            return None
+        return len(self.identities) * self.tabs_per_identity
+    
+    def _free_identities(self):
+        # Anonymous identities are free to create, so each one serves a single worker
+        limit = self.tabs_per_identity or (1 if self.anonymous else None)
+        return [i for i in self.identities
+                if (limit is None or i.active_leases < limit) and i.is_available()]
+    
+    def lease(self, timeout=None) -> Optional[Identity]:
+        """Lease the least busy identity (round-robin on ties), blocking until one is free"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self.condition:
+            if self.anonymous:
+                free = self._free_identities()
+                if not free:
+                    identity = self._create_identity(f'anonymous_{len(self.identities)}', [])
+                    self.identities.append(identity)
+                    self._save_state()
+                    free = [identity]
+            else:
+                # Cooldowns expire without a notify, so re-check at least once a second
+                while not self._free_identities():
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self.condition.wait(1.0 if remaining is None else min(remaining, 1.0))
+                free = self._free_identities()
+            
+            identity = min(free, key=lambda i: (i.active_leases, i.last_leased))
+            identity.active_leases += 1
+            self.lease_counter += 1
+            identity.last_leased = self.lease_counter
+            return identity
+    
+    def release(self, identity: Identity):
+        """Return an identity to the pool"""
+        if identity is None:
+            return
+        with self.condition:
+            identity.active_leases = max(0, identity.active_leases - 1)
+            self.condition.notify_all()
+    
+    def rebind(self, identity: Identity):
+        """Move an identity to a new sticky proxy after its proxy got blocked"""
+        with self.condition:
+            old_proxy = identity.proxy_string
+            identity.proxy_string = self._pick_proxy()
+            self._save_state()
+        if identity.proxy_string != old_proxy:
+            new_proxy = identity.proxy_string.split(':')[0] if identity.proxy_string else 'direct'
+            logger.info(f"Identity {identity.name}: rebound to proxy {new_proxy}")
@@ -0,0 +1,407 @@
+"""
+Job queue for running scrapes on many worker processes.
+
+Producers enqueue tasks (query shards, tweet-id batches, refresh cycles) and
+workers lease them with a visibility timeout: a task whose worker stops
+heartbeating becomes available again once its lease expires. Scraped rows go
+to a shared results table deduplicated by tweet id, so adding capacity means
+starting more workers instead of adding tabs to one box.
+
+SQLiteJobQueue works across the processes of one host: it runs in WAL mode,
+which needs shared memory, and SQLite locking is unreliable over NFS/SMB, so
+a database on a network filesystem is refused. MemoryJobQueue is the
+in-process stand-in for tests.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# Filesystems SQLite can't lock reliably; WAL mode does not work on them at all
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', '9p', 'ceph',
+                       'glusterfs', 'lustre', 'fuse.sshfs'}
+
+def filesystem_type(path, mounts_file='/proc/mounts'):
+    """Type of the filesystem holding path (None where the mount table can't be read)"""
+    path = os.path.realpath(path)
+    best, fs_type = '', None
+    try:
+        with open(mounts_file) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace('\\040', ' ')
+                inside = path == mount_point or path.startswith(mount_point.rstrip('/') + '/')
+                if inside and len(mount_point) > len(best):
+                    best, fs_type = mount_point, fields[2]
+    except OSError:
+        return None
+    return fs_type
+
+class Task:
+    def __init__(self, task_id, job_id, kind, payload, status=PENDING, attempts=0, worker_id=None,
+                 lease_expires=None, result=None, error=None, created_at=None, updated_at=None):
+        self.task_id = task_id
+        self.job_id = job_id
+        self.kind = kind  # 'search', 'tweets' or 'refresh'
+        self.payload = payload
+        self.status = status
+        self.attempts = attempts
+        self.worker_id = worker_id  # Current lease holder
+        self.lease_expires = lease_expires
+        self.result = result
+        self.error = error
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+
+    def to_dict(self):
+        return {
+            'task_id': self.task_id,
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'worker_id': self.worker_id,
+            'lease_expires': self.lease_expires,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+    def __repr__(self):
+        return f"Task({self.task_id}, {self.kind}, {self.status})"
+
+class MemoryJobQueue:
+    """In-process queue with the same API as SQLiteJobQueue"""
+    def __init__(self, visibility_timeout=300, max_attempts=3):
+        self.visibility_timeout = visibility_timeout  # Seconds a lease lasts without a heartbeat
+        self.max_attempts = max_attempts
+        self.tasks = {}
+        self.results = {}  # job_id -> {tweet_id: row}
+        self.state = {}  # key -> JSON text of state shared by every worker (e.g. refresh schedules)
+        self.lock = threading.Lock()
+
+    def enqueue(self, kind, payload, job_id=''):
+        task = Task(uuid.uuid4().hex[:12], job_id, kind, payload)
+        with self.lock:
+            self.tasks[task.task_id] = task
+        return task.task_id
+
+    def lease(self, worker_id, kinds=None):
+        """Oldest pending (or lease-expired) task, or None"""
+        now = time.time()
+        with self.lock:
+            candidates = [t for t in self.tasks.values()
+                          if (t.status == PENDING or (t.status == LEASED and t.lease_expires < now))
+                          and (not kinds or t.kind in kinds)]
+            if not candidates:
+                return None
+            task = min(candidates, key=lambda t: t.created_at)
+            task.status = LEASED
+            task.worker_id = worker_id
+            task.attempts += 1
+            task.lease_expires = now + self.visibility_timeout
+            task.updated_at = now
+            return Task(**task.to_dict())
+
+    def heartbeat(self, task_id, worker_id):
+        """Extend the lease; False if the worker no longer holds it"""
+        now = time.time()
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if not task or task.status != LEASED or task.worker_id != worker_id:
+                return False
+            task.lease_expires = now + self.visibility_timeout
+            task.updated_at = now
+            return True
+
+    def complete(self, task_id, worker_id, result=None):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if not task or task.status != LEASED or task.worker_id != worker_id:
+                return False
+            task.status = DONE
+            task.result = result
+            task.lease_expires = None
+            task.updated_at = time.time()
+            return True
+
+    def fail(self, task_id, worker_id, error):
+        """Give the task back for a retry, or mark it failed after max_attempts"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if not task or task.status != LEASED or task.worker_id != worker_id:
+                return False
+            task.status = FAILED if task.attempts >= self.max_attempts else PENDING
+            task.error = str(error)
+            task.worker_id = None
+            task.lease_expires = None
+            task.updated_at = time.time()
+            return True
+
+    def add_results(self, job_id, rows):
+        """Store scraped rows; returns how many were new for this job"""
+        with self.lock:
+            job_rows = self.results.setdefault(job_id, {})
+            added = 0
+            for row in rows:
+                if row['tweet_id'] not in job_rows:
+                    job_rows[row['tweet_id']] = dict(row)
+                    added += 1
+            return added
+
+    def get_results(self, job_id):
+        with self.lock:
+            return list(self.results.get(job_id, {}).values())
+
+    def get_state(self, key):
+        """Shared state saved with set_state(), or None"""
+        with self.lock:
+            value = self.state.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_state(self, key, value):
+        with self.lock:
+            self.state[key] = json.dumps(value)
+
+    def update_state(self, key, update):
+        """Replace shared state with update(current) in one step; returns the new value"""
+        with self.lock:
+            value = self.state.get(key)
+            value = update(json.loads(value) if value is not None else None)
+            self.state[key] = json.dumps(value)
+        return value
+
+    def get_tasks(self, job_id=None, status=None):
+        with self.lock:
+            return [t.to_dict() for t in sorted(self.tasks.values(), key=lambda t: t.created_at)
+                    if (job_id is None or t.job_id == job_id) and (status is None or t.status == status)]
+
+    def status(self, job_id=None):
+        """Task counts per status (expired leases count as pending) plus saved rows"""
+        now = time.time()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self.lock:
+            for task in self.tasks.values():
+                if job_id is not None and task.job_id != job_id:
+                    continue
+                expired = task.status == LEASED and task.lease_expires < now
+                counts[PENDING if expired else task.status] += 1
+            if job_id is not None:
+                counts['results'] = len(self.results.get(job_id, {}))
+        return counts
+
+class SQLiteJobQueue:
+    """Queue and results table in one SQLite file shared by the workers of one host"""
+    def __init__(self, path='scraped_data/jobs.db', visibility_timeout=300, max_attempts=3):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fs_type = filesystem_type(os.path.dirname(path) or '.')
+        if fs_type in NETWORK_FILESYSTEMS:
+            raise ValueError(f"{path} is on a {fs_type} filesystem; SQLite can't lock it safely. "
+                             f"Keep the queue database on a local disk and run the workers on that host.")
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY, job_id TEXT, kind TEXT, payload TEXT, status TEXT,
+                attempts INTEGER DEFAULT 0, worker_id TEXT, lease_expires REAL,
+                result TEXT, error TEXT, created_at REAL, updated_at REAL)''')
+            db.execute('CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created_at)')
+            db.execute('''CREATE TABLE IF NOT EXISTS results (
+                job_id TEXT, tweet_id TEXT, row TEXT, created_at REAL,
+                PRIMARY KEY (job_id, tweet_id))''')
+            db.execute('''CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY, value TEXT, updated_at REAL)''')
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the queue usable from any thread
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _to_task(self, row):
+        return Task(
+            row['task_id'], row['job_id'], row['kind'], json.loads(row['payload']),
+            status=row['status'], attempts=row['attempts'], worker_id=row['worker_id'],
+            lease_expires=row['lease_expires'],
+            result=json.loads(row['result']) if row['result'] else None,
+            error=row['error'], created_at=row['created_at'], updated_at=row['updated_at']
+        )
+
+    def enqueue(self, kind, payload, job_id=''):
+        task_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as db:
+            db.execute('INSERT INTO tasks (task_id, job_id, kind, payload, status, created_at, updated_at) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                       (task_id, job_id, kind, json.dumps(payload), PENDING, now, now))
+        return task_id
+
+    def lease(self, worker_id, kinds=None):
+        """Oldest pending (or lease-expired) task, or None"""
+        now = time.time()
+        kind_filter = ''
+        params = [PENDING, LEASED, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+
+        with self._connect() as db:
+            # IMMEDIATE takes the write lock up front so two workers can't lease the same task
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute('SELECT * FROM tasks WHERE (status = ? OR (status = ? AND lease_expires < ?))'
+                                 + kind_filter + ' ORDER BY created_at LIMIT 1', params).fetchone()
+                if row is None:
+                    db.execute('COMMIT')
+                    return None
+                db.execute('UPDATE tasks SET status = ?, worker_id = ?, attempts = attempts + 1, '
+                           'lease_expires = ?, updated_at = ? WHERE task_id = ?',
+                           (LEASED, worker_id, now + self.visibility_timeout, now, row['task_id']))
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+
+        task = self._to_task(row)
+        task.status = LEASED
+        task.worker_id = worker_id
+        task.attempts += 1
+        task.lease_expires = now + self.visibility_timeout
+        return task
+
+    def heartbeat(self, task_id, worker_id):
+        """Extend the lease; False if the worker no longer holds it"""
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute('UPDATE tasks SET lease_expires = ?, updated_at = ? '
+                                'WHERE task_id = ? AND status = ? AND worker_id = ?',
+                                (now + self.visibility_timeout, now, task_id, LEASED, worker_id))
+            return cursor.rowcount == 1
+
+    def complete(self, task_id, worker_id, result=None):
+        with self._connect() as db:
+            cursor = db.execute('UPDATE tasks SET status = ?, result = ?, lease_expires = NULL, updated_at = ? '
+                                'WHERE task_id = ? AND status = ? AND worker_id = ?',
+                                (DONE, json.dumps(result), time.time(), task_id, LEASED, worker_id))
+            return cursor.rowcount == 1
+
+    def fail(self, task_id, worker_id, error):
+        """Give the task back for a retry, or mark it failed after max_attempts"""
+        with self._connect() as db:
+            cursor = db.execute('UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, '
+                                'error = ?, worker_id = NULL, lease_expires = NULL, updated_at = ? '
+                                'WHERE task_id = ? AND status = ? AND worker_id = ?',
+                                (self.max_attempts, FAILED, PENDING, str(error), time.time(),
+                                 task_id, LEASED, worker_id))
+            return cursor.rowcount == 1
+
+    def add_results(self, job_id, rows):
+        """Store scraped rows; returns how many were new for this job"""
+        now = time.time()
+        with self._connect() as db:
+            before = db.total_changes
+            db.execute('BEGIN')
+            db.executemany('INSERT OR IGNORE INTO results (job_id, tweet_id, row, created_at) VALUES (?, ?, ?, ?)',
+                           [(job_id, row['tweet_id'], json.dumps(row), now) for row in rows])
+            db.execute('COMMIT')
+            return db.total_changes - before
+
+    def get_results(self, job_id):
+        with self._connect() as db:
+            rows = db.execute('SELECT row FROM results WHERE job_id = ? ORDER BY created_at, rowid', (job_id,))
+            return [json.loads(row['row']) for row in rows]
+
+    def get_state(self, key):
+        """Shared state saved with set_state(), or None"""
+        with self._connect() as db:
+            row = db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else None
+
+    def set_state(self, key, value):
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)',
+                       (key, json.dumps(value), time.time()))
+
+    def update_state(self, key, update):
+        """Replace shared state with update(current) in one step; returns the new value"""
+        with self._connect() as db:
+            # IMMEDIATE: no other worker can write this state between our read and write
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+                value = update(json.loads(row['value']) if row else None)
+                db.execute('INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)',
+                           (key, json.dumps(value), time.time()))
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+        return value
+
+    def get_tasks(self, job_id=None, status=None):
+        query = 'SELECT * FROM tasks WHERE 1 = 1'
+        params = []
+        if job_id is not None:
+            query += ' AND job_id = ?'
+            params.append(job_id)
+        if status is not None:
+            query += ' AND status = ?'
+            params.append(status)
+        with self._connect() as db:
+            return [self._to_task(row).to_dict() for row in db.execute(query + ' ORDER BY created_at', params)]
+
+    def status(self, job_id=None):
+        """Task counts per status (expired leases count as pending) plus saved rows"""
+        now = time.time()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        job_filter = ' WHERE job_id = ?' if job_id is not None else ''
+        params = (job_id,) if job_id is not None else ()
+        with self._connect() as db:
+            for row in db.execute('SELECT status, lease_expires FROM tasks' + job_filter, params):
+                expired = row['status'] == LEASED and row['lease_expires'] < now
+                counts[PENDING if expired else row['status']] += 1
+            if job_id is not None:
+                counts['results'] = db.execute('SELECT COUNT(*) FROM results WHERE job_id = ?',
+                                               (job_id,)).fetchone()[0]
+        return counts
+
+def enqueue_queries(queue, job_id, keywords=None, hashtags=None, usernames=None, per_query=100, search_mode='top'):
+    """One 'search' task per keyword, hashtag and username"""
+    task_ids = []
+    for field, terms in (('keyword', keywords), ('hashtag', hashtags), ('username', usernames)):
+        for term in terms or []:
+            term = term.strip()
+            if term:
+                task_ids.append(queue.enqueue('search', {field: term, 'num_tweets': per_query,
+                                                         'search_mode': search_mode}, job_id))
+    return task_ids
+
+def enqueue_tweet_batches(queue, job_id, tweet_urls, batch_size=100):
+    """'tweets' tasks of up to batch_size URLs or ids (one hydration call each)"""
+    tweet_urls = [u.strip() for u in tweet_urls if u.strip()]
+    return [queue.enqueue('tweets', {'tweet_urls': tweet_urls[i:i + batch_size]}, job_id)
+            for i in range(0, len(tweet_urls), batch_size)]
+
+def enqueue_refresh(queue, job_id, name='tracked', tweet_urls=None):
+    """One refresh cycle of a RefreshScheduler whose schedule lives in the queue;
+    tweet_urls (URLs or ids) start being tracked first"""
+    tweet_urls = [u.strip() for u in tweet_urls or [] if u.strip()]
+    return queue.enqueue('refresh', {'name': name, 'tweet_urls': tweet_urls}, job_id)
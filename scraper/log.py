@@ -0,0 +1,127 @@
+"""
+Logging for the scraper package.
+
+Every module logs to its own logger (scraper.engine, scraper.proxy_manager, ...).
+setup_logging() routes them all through a QueueHandler, so tabs and worker
+threads only enqueue a record; one QueueListener thread writes to the
+terminal. Per-tweet and per-scroll messages are DEBUG; ProgressLogger prints
+one compact INFO line every few seconds instead:
+
+    setup_logging()               # INFO: job events + periodic progress
+    setup_logging(verbose=True)   # DEBUG: every tweet and scroll
+    setup_logging(quiet=True)     # WARNING: debug/info calls return after one level check
+"""
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT = 'scraper'
+_listener = None
+_lock = threading.Lock()
+
+def _console_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))  # Same look as the old print() output
+    return handler
+
+def _root_logger():
+    logger = logging.getLogger(ROOT)
+    if not logger.handlers:
+        # Library use without setup_logging(): plain synchronous output. Spawned child
+        # processes inherit the parent's level through the environment.
+        logger.addHandler(_console_handler())
+        logger.setLevel(os.environ.get('SCRAPER_LOG_LEVEL', 'INFO'))
+        logger.propagate = False
+    return logger
+
+def get_logger(name):
+    """Per-component logger under the package root (pass __name__)"""
+    _root_logger()
+    return logging.getLogger(name if name.startswith(ROOT) else f'{ROOT}.{name}')
+
+def setup_logging(verbose=False, quiet=False, log_file=None):
+    """Send package logs through a background QueueListener (call once from the entry point)"""
+    global _listener
+    with _lock:
+        _stop_listener()
+        level = logging.WARNING if quiet else logging.DEBUG if verbose else logging.INFO
+        os.environ['SCRAPER_LOG_LEVEL'] = logging.getLevelName(level)
+        handlers = [_console_handler()]
+        if log_file:
+            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            file_handler.setFormatter(logging.Formatter(
+                '%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s'))
+            handlers.append(file_handler)
+        
+        records = queue.SimpleQueue()
+        logger = _root_logger()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(QueueHandler(records))
+        logger.setLevel(level)
+        _listener = QueueListener(records, *handlers)
+        _listener.start()
+    atexit.register(stop_logging)
+
+def flush_logging():
+    """Write out every queued record (before printing directly to the terminal)"""
+    with _lock:
+        if _listener:
+            _listener.stop()  # Drains the queue, then the thread exits
+            _listener.start()
+
+def stop_logging():
+    """Drain the queue and go back to synchronous console output"""
+    with _lock:
+        _stop_listener()
+
+def _stop_listener():
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+        logger = logging.getLogger(ROOT)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(_console_handler())
+
+class ProgressLogger:
+    """One INFO line every interval seconds while a job runs: saved/target, rate and ETA"""
+    def __init__(self, count, target, cancel_token=None, interval=5.0, logger=None):
+        self.count = count  # Callable returning tweets saved so far
+        self.target = target
+        self.cancel_token = cancel_token
+        self.interval = interval
+        self.logger = logger or get_logger('progress')
+        self.started = time.time()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+    
+    def line(self):
+        saved = self.count()
+        elapsed = max(time.time() - self.started, 1e-6)
+        rate = saved / elapsed
+        eta = f', ETA {(self.target - saved) / rate:.0f}s' if rate and self.target and saved < self.target else ''
+        return f"📊 {saved}/{self.target} tweets ({rate * 60:.0f}/min{eta})"
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.cancel_token and self.cancel_token.is_cancelled():
+                break
+            try:
+                self.logger.info(self.line())
+            except Exception:
+                pass
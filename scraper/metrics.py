@@ -0,0 +1,273 @@
+"""
+Metrics registry with a Prometheus text exporter.
+
+Counters, gauges and histograms keyed by label values (tab, proxy, query...).
+Recording is one dict update under a lock, so tabs can record on every tweet;
+the text exposition is only rendered when /metrics is scraped or the text
+file is written:
+
+    metrics.REGISTRY.start_http_server(9108)           # curl localhost:9108/metrics
+    metrics.REGISTRY.start_textfile_writer('scrape.prom')  # node_exporter textfile collector
+"""
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+PREFIX = 'twitter_scraper_'
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def proxy_label(proxy_string):
+    """Proxy host for labels ('direct' without a proxy); credentials never reach a label"""
+    return proxy_string.split(':')[0] if proxy_string else 'direct'
+
+class Metric:
+    kind = 'untyped'
+    
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # Label values tuple -> value
+        self._lock = threading.Lock()
+        if registry is not False:
+            (registry or REGISTRY).register(self)
+    
+    def _key(self, labels):
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"{self.name} has no labels {sorted(unknown)}")
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+    
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+    
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+    
+    def samples(self):
+        """(suffix, label values, extra label, value) tuples for the exposition"""
+        with self._lock:
+            return [('', key, None, value) for key, value in sorted(self._values.items())]
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+    
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        super().__init__(name, help_text, labelnames, registry)
+        self._functions = {}  # Label values tuple -> callable read at collection time
+    
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+    
+    def set_function(self, function, **labels):
+        """Read the value from function() whenever metrics are collected (no hot-path cost)"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+    
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._functions.clear()
+    
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception:
+                pass
+        return [('', key, None, value) for key, value in sorted(values.items())]
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, help_text, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]  # Bucket counts, sum, count
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+    
+    def value(self, **labels):
+        """Number of observations"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+    
+    def samples(self):
+        with self._lock:
+            states = [(key, list(state[0]), state[1], state[2]) for key, state in sorted(self._values.items())]
+        samples = []
+        for key, bucket_counts, total, count in states:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', key, ('le', _format_value(bound)), cumulative))
+            samples.append(('_bucket', key, ('le', '+Inf'), count))
+            samples.append(('_sum', key, None, total))
+            samples.append(('_count', key, None, count))
+        return samples
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self._textfile_stop = None
+    
+    def register(self, metric):
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self.metrics[metric.name] = metric
+    
+    def get(self, name):
+        return self.metrics.get(name)
+    
+    def clear(self):
+        """Drop every recorded value (metrics stay registered)"""
+        for metric in list(self.metrics.values()):
+            metric.clear()
+    
+    def exposition(self):
+        """Prometheus text format (version 0.0.4)"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for suffix, key, extra, value in metric.samples():
+                labels = _format_labels(metric.labelnames, key, extra)
+                lines.append(f'{metric.name}{suffix}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+    
+    def write_textfile(self, path):
+        """Write the exposition atomically (readers never see a half-written file)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.exposition())
+        os.replace(temp_path, path)
+    
+    def start_textfile_writer(self, path, interval=15):
+        """Rewrite the text file every interval seconds until stop_textfile_writer()"""
+        self.stop_textfile_writer()
+        stop = self._textfile_stop = threading.Event()
+        def writer():
+            while True:
+                try:
+                    self.write_textfile(path)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not write metrics to {path}: {e}")
+                if stop.wait(interval):
+                    break
+        threading.Thread(target=writer, daemon=True).start()
+        logger.info(f"📈 Writing metrics to {path} every {interval}s")
+    
+    def stop_textfile_writer(self):
+        if self._textfile_stop:
+            self._textfile_stop.set()
+            self._textfile_stop = None
+    
+    def start_http_server(self, port, addr='127.0.0.1'):
+        """Serve GET /metrics from a daemon thread; returns the server (shutdown() to stop)"""
+        registry = self
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # One line per scrape would drown the scraper output
+        
+        server = ThreadingHTTPServer((addr, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"📈 Metrics at http://{addr}:{server.server_address[1]}/metrics")
+        return server
+
+REGISTRY = Registry()
+
+TWEETS_ACCEPTED = Counter(PREFIX + 'tweets_accepted_total', 'Tweets written to the sink',
+                          ('tab', 'query', 'source'))
+TWEETS_DUPLICATE = Counter(PREFIX + 'tweets_duplicate_total', 'Tweets dropped as already saved',
+                           ('tab', 'query', 'source'))
+API_RESPONSES = Counter(PREFIX + 'api_responses_total', 'Timeline API responses parsed',
+                        ('tab', 'proxy', 'operation'))
+RESPONSE_BYTES = Counter(PREFIX + 'response_bytes_total', 'Bytes of timeline API responses downloaded',
+                         ('tab', 'proxy'))
+RATE_LIMITED = Counter(PREFIX + 'rate_limited_total', 'HTTP 429/503 answers to pages and API calls',
+                       ('tab', 'proxy'))
+PROXY_FAILURES = Counter(PREFIX + 'proxy_failures_total', 'Proxies marked as failed', ('proxy',))
+SCROLL_LATENCY = Histogram(PREFIX + 'scroll_latency_seconds', 'Seconds per scroll (extract, save, scroll, pause)',
+                           ('tab',))
+PAGE_RECYCLES = Counter(PREFIX + 'page_recycles_total', 'Pages reopened at their cursor to cap renderer memory',
+                        ('tab', 'reason'))
+PAGE_JS_HEAP = Gauge(PREFIX + 'page_js_heap_bytes', 'Used JS heap of the page, from the CDP Performance domain', ('tab',))
+PAGE_DOM_NODES = Gauge(PREFIX + 'page_dom_nodes', 'DOM nodes in the page, from the CDP Performance domain', ('tab',))
+DOM_CELLS_PRUNED = Counter(PREFIX + 'dom_cells_pruned_total', 'Extracted timeline cells hidden in the page', ('tab',))
+SINK_QUEUE_DEPTH = Gauge(PREFIX + 'sink_queue_depth', 'Tweets buffered in the sink, not yet written', ('sink',))
+JOB_TARGET = Gauge(PREFIX + 'job_target_tweets', 'Tweet target of the running job')
+JOB_STARTED = Gauge(PREFIX + 'job_start_time_seconds', 'Unix time the running job started')
+
+def job_started(target):
+    JOB_TARGET.set(target)
+    JOB_STARTED.set(time.time())
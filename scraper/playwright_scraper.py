@@ -1,33 +1,64 @@
 """
 Fixed and simplified Twitter scraper with robust error handling
 """
-import os
 import csv
 import time
-import random
 import re
-import json
+import asyncio
 import threading
 from playwright.sync_api import sync_playwright
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import quote
+from queue import Queue, Empty
+from urllib.parse import quote, unquote
 from scraper.proxy_manager import ProxyManager
 from scraper.csv_handler import CSVHandler
 from scraper.fast_csv_handler import FastCSVHandler
-from scraper.cookie_loader import load_cookies
+from scraper.cookie_loader import CookiePool
+from scraper.identity import IdentityPool
+from scraper.session_store import SessionStore
+from scraper.hydrator import TweetHydrator
+from scraper.query_shard import QueryShard
+from scraper.checkpoint import JobCheckpoint
+from scraper.engine import ScrapeEngine, EngineConfig
+from scraper.process_pool import ProcessPoolScraper
+from scraper.cancellation import CancellationToken
+from scraper import metrics
+from scraper.dashboard import BOARD
+from scraper.log import get_logger, ProgressLogger
+from scraper.profiling import JobProfiler
+
+logger = get_logger(__name__)
 
 class TwitterScraper:
-    def __init__(self, num_tabs=None):  # Dynamic tab count
+    def __init__(self, num_tabs=None, tabs_per_identity=None, cookie_source='x.com_cookies.txt', proxy_preflight=True,
+                 allow_direct=None, identities_read_only=False):  # Dynamic tab count
         self.num_tabs = num_tabs
-        self.proxy_manager = ProxyManager()
-        self.cookies = load_cookies()
+        # Drop dead proxies before any tab launches; allow_direct opts into this machine's IP once all are dead.
+        # One pre-flight and one probe thread per process, shared by every scraper (released by close())
+        self.proxy_manager = ProxyManager.shared(preflight=proxy_preflight, probe_interval=300 if proxy_preflight else 0,
+                                                 allow_direct=allow_direct)
+        # cookie_source may be one Netscape file, several (comma-separated) or a directory of them
+        self.cookie_pool = CookiePool(cookie_source)
+        self.cookies = self.cookie_pool.accounts[0].cookies if self.cookie_pool.accounts else []
         self.csv_handler = None
         self.lock = threading.Lock()
         self.total_scraped = 0
-        self.target_reached = False
+        self.cancel_token = CancellationToken()  # Observed by every tab; cancelled once the target is met
+        self.progress = None  # ProgressLogger of the running job (one INFO line every few seconds)
+        self.profile = None  # 'cpu' / 'mem': profile every job and save it next to its CSV (scraper/profiling.py)
+        self.profiler = None
+        self.prune_dom = False  # Hide already-extracted timeline cells in the page (EngineConfig.prune_dom)
         self.api_tweets = []  # Store tweets from API interception
         self.use_api_extraction = True  # Enable API-based extraction
         self.api_users = {}  # Cache users from API responses
+        self.shards = []  # Query shards of a fan-out job
+        self.cursors = {}  # Latest cursor-bottom per query shard, or per tab of a single-query job
+        self.resume_cursors = {}  # Cursors a resumed job starts its timelines from
+        self.checkpoint = None
+        self.checkpoint_interval = 10  # Seconds between job checkpoints
+        self._resume_state = None
+        self.closed = False
+        self.replay = None  # FixtureReplayer / FixtureRecorder attached to every browser context (scraper/replay.py)
         
         # User agent pool for better stealth
         self.user_agents = [
@@ -37,6 +68,35 @@ class TwitterScraper:
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
         ]
+        
+        # Each account keeps one sticky proxy + user agent; tabs_per_identity caps the tabs per account
+        self.identity_pool = IdentityPool(
+            self.proxy_manager, self.user_agents,
+            cookie_pool=self.cookie_pool,
+            tabs_per_identity=tabs_per_identity,
+            read_only=identities_read_only
+        )
+        # Warmed storage_state per identity, restored to skip the cold-session warmup
+        self.session_store = SessionStore()
+
+    def close(self):
+        """Close the sink and release the shared proxy service; its background probe stops with the last scraper"""
+        if not self.closed:
+            self.closed = True
+            if self.csv_handler:
+                self._close_sink()
+            self.proxy_manager.release()
+    
+    @property
+    def target_reached(self):
+        return self.cancel_token.is_cancelled()
+    
+    @target_reached.setter
+    def target_reached(self, reached):
+        if reached:
+            self.cancel_token.cancel('target reached')
+        elif self.cancel_token.is_cancelled():
+            self.cancel_token = CancellationToken()
 
     def scrape(self, keyword='', hashtag='', username='', tweet_url='', tweet_urls=None, num_tweets=100, job_id='', search_mode='top'):
         """Main scraping method with robust error handling
@@ -48,72 +108,326 @@ class TwitterScraper:
         if tweet_urls and len(tweet_urls) > 0:
             return self._scrape_bulk_urls(tweet_urls, job_id)
         
+        # Comma-separated terms fan out into one query per term
+        if ',' in keyword or ',' in hashtag or ',' in username:
+            return self.scrape_many(
+                keywords=self._split_terms(keyword),
+                hashtags=self._split_terms(hashtag),
+                usernames=self._split_terms(username),
+                num_tweets=num_tweets, job_id=job_id, search_mode=search_mode
+            )
+        
         # Build search URL
         search_url = self.build_url(keyword, hashtag, username, tweet_url, search_mode)
         
-        # Initialize CSV handler
-        self.csv_handler = FastCSVHandler(job_id) if num_tweets >= 50 else CSVHandler(job_id)
-        self.job_id = job_id
-        self.target_tweets = num_tweets  # Store target for exact count checking
+        # Initialize CSV handler and counters
+        self._start_job(job_id, num_tweets)
         
         # Optimized tab count for maximum speed
-        if self.num_tabs is None:
-            if num_tweets >= 200:
-                self.num_tabs = 8  # Maximum for very large targets
-            elif num_tweets >= 100:
-                self.num_tabs = 6  # High for large targets
-            elif num_tweets >= 50:
-                self.num_tabs = 5  # Medium-high for medium targets
-            else:
-                self.num_tabs = 4  # Faster for small targets
+        # Kept local so a reused scraper sizes every job afresh
+        num_tabs = self._limit_tabs_to_identities(self._default_tab_count(num_tweets))
         
-        print(f"STARTING SCRAPE: {self.num_tabs} parallel tabs")
-        print(f"Target: {num_tweets} tweets")
-        print(f"URL: {search_url}")
+        logger.info(f"STARTING SCRAPE: {num_tabs} parallel tabs")
+        logger.info(f"Target: {num_tweets} tweets")
+        logger.info(f"URL: {search_url}")
         
-        # Reset counters
-        self.total_scraped = 0
-        self.target_reached = False
+        self._start_checkpointing({'mode': 'search', 'args': {
+            'keyword': keyword, 'hashtag': hashtag, 'username': username, 'tweet_url': tweet_url,
+            'num_tweets': num_tweets, 'search_mode': search_mode}})
         
-        # Run parallel scraping
-        with ThreadPoolExecutor(max_workers=self.num_tabs) as executor:
-            futures = []
-            for i in range(self.num_tabs):
-                future = executor.submit(self.scrape_tab_simple, search_url, num_tweets, i)
-                futures.append(future)
-            
-            # Wait for completion
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"Tab error: {e}")
+        # All tabs are pages on one async engine (one Playwright driver)
+        completed = False
+        try:
+            self._create_engine(EngineConfig.standard()).run(search_url, num_tweets, num_tabs)
+            completed = self.cancel_token.reason != 'interrupted'
+        finally:
+            self._finish_checkpointing(completed)
+        
+        return self._finish_job()
+
+    async def scrape_url_async(self, search_url, num_tweets, job_id='', config=None):
+        """Scrape one search or profile URL from inside a running event loop"""
+        config = config or EngineConfig.standard()
+        self._start_job(job_id, num_tweets)
+        num_tabs = self._limit_tabs_to_identities(config.num_pages or self._default_tab_count(num_tweets))
+        logger.info(f"{config.name.upper()} SCRAPE: {num_tabs} parallel tabs, target {num_tweets} tweets")
+        logger.info(f"URL: {search_url}")
+        await self._create_engine(config).run_async(search_url, num_tweets, num_tabs)
+        return self._finish_job()
+
+    def _create_engine(self, config):
+        if self.prune_dom:
+            config.prune_dom = True
+        return ScrapeEngine(self, config)
+
+    def _start_job(self, job_id, num_tweets):
+        """Open the sink and reset the counters of a single-query job"""
+        self.csv_handler = self._open_sink(job_id, num_tweets)
+        self.job_id = self.csv_handler.job_id
+        self.target_tweets = num_tweets  # Store target for exact count checking
+        self.shards = []
+        self._reset_counters()
+
+    def stop(self, reason='interrupted'):
+        """Cancel every worker of the running job and flush what it saved; returns the CSV filename"""
+        self.cancel_token.cancel(reason)
+        if not self.csv_handler:
+            return None
+        return self._finish_job()
+
+    def _reset_counters(self):
+        """Fresh cancellation token and the sink's exact limit for a new job"""
+        self.csv_handler.limit = self.target_tweets
+        self.total_scraped = 0
+        self.cancel_token = CancellationToken()
+        metrics.job_started(self.target_tweets)
+        BOARD.reset()
+        if self.progress:
+            self.progress.stop()
+        if self.profiler:
+            self.profiler.stop()
+        self.profiler = JobProfiler(self.profile).start() if self.profile else None
+        self.progress = ProgressLogger(self.csv_handler.get_tweet_count, self.target_tweets, self.cancel_token).start()
+        if self.csv_handler.is_full():
+            self.target_reached = True
+
+    def _stop_monitors(self):
+        """Stop the progress line and save the job's profile (if one was asked for)"""
+        if self.progress:
+            self.progress.stop()
+        if self.profiler:
+            profiler, self.profiler = self.profiler, None
+            try:
+                profiler.save(self.csv_handler.tweets_file)
+            except Exception as e:
+                logger.error(f"❌ Error saving {profiler.mode} profile: {e}")
+
+    def _close_sink(self):
+        """Stop the monitors and the sink's background flusher, writing what is still buffered"""
+        self._stop_monitors()
+        if hasattr(self.csv_handler, 'close'):
+            self.csv_handler.close()
+        elif hasattr(self.csv_handler, 'force_flush'):
+            self.csv_handler.force_flush()
+
+    def _finish_job(self):
+        self._close_sink()
         
         final_count = self.csv_handler.get_tweet_count()
-        print(f"Scraping complete! Collected {final_count} tweets")
+        logger.info(f"Scraping complete! Collected {final_count} tweets")
+        return self.csv_handler.get_filename() if final_count > 0 else None
+
+    def scrape_many(self, keywords=None, hashtags=None, usernames=None, num_tweets=100, per_query=None,
+                    job_id='', search_mode='top'):
+        """Fan out many queries over one tab pool, one sink and one dedupe set
         
-        if hasattr(self.csv_handler, 'force_flush'):
-            self.csv_handler.force_flush()
+        Args:
+            num_tweets: total target; split evenly across queries unless per_query is given
+            per_query: quota for every query (total target becomes per_query * queries)
+        """
+        shards = self.build_shards(keywords, hashtags, usernames, search_mode)
+        if not shards:
+            logger.info("No queries to scrape")
+            return None
+        
+        if per_query:
+            num_tweets = per_query * len(shards)
+        else:
+            per_query = max(1, -(-num_tweets // len(shards)))  # Ceiling division
+        for shard in shards:
+            shard.quota = per_query
+        
+        self.csv_handler = self._open_sink(job_id, num_tweets)
+        self.job_id = self.csv_handler.job_id
+        self.target_tweets = num_tweets
+        self._reset_counters()
+        self.shards = shards
+        if self._resume_state:
+            saved_counts = self._resume_state.get('shards', {})
+            for shard in shards:
+                shard.count = saved_counts.get(shard.label, 0)
+        
+        num_tabs = self._limit_tabs_to_identities(min(self._default_tab_count(num_tweets), len(shards)))
+        logger.info(f"STARTING FAN-OUT: {len(shards)} queries over {num_tabs} parallel tabs")
+        logger.info(f"Target: {num_tweets} tweets ({per_query} per query)")
+        
+        self._start_checkpointing({'mode': 'fanout', 'args': {
+            'keywords': keywords, 'hashtags': hashtags, 'usernames': usernames,
+            'per_query': per_query, 'search_mode': search_mode}})
+        completed = False
+        try:
+            self._create_engine(EngineConfig.standard()).run(None, num_tweets, num_tabs, fanout=True)
+            completed = self.cancel_token.reason != 'interrupted'
+        finally:
+            self._finish_checkpointing(completed)
         
+        self._close_sink()
+        
+        final_count = self.csv_handler.get_tweet_count()
+        logger.info(f"Fan-out complete! Collected {final_count} tweets")
+        for shard in shards:
+            logger.info(f"  {shard.progress()}")
         return self.csv_handler.get_filename() if final_count > 0 else None
 
-    def _intercept_api_response(self, response, tab_id):
-        """Intercept Twitter API responses to extract real engagement data"""
+    def scrape_processes(self, keyword='', hashtag='', username='', num_tweets=100, job_id='', search_mode='top',
+                         num_processes=4, tabs_per_process=2):
+        """Scrape with one browser + parser per child process (parsing scales with cores)
+        
+        The parent keeps the only sink: global dedupe and the exact target
+        cut-off happen here. Comma-separated terms fan out across the children.
+        """
+        shards = None
+        search_url = None
+        if ',' in keyword or ',' in hashtag or ',' in username:
+            shards = self.build_shards(self._split_terms(keyword), self._split_terms(hashtag),
+                                       self._split_terms(username), search_mode)
+            per_query = max(1, -(-num_tweets // len(shards)))
+            for shard in shards:
+                shard.quota = per_query
+        else:
+            search_url = self.build_url(keyword, hashtag, username, '', search_mode)
+        
+        self._start_job(job_id, num_tweets)
+        logger.info(f"Target: {num_tweets} tweets")
+        ProcessPoolScraper(self, num_processes, tabs_per_process).run(search_url, shards, num_tweets)
+        return self._finish_job()
+
+    def resume(self, job_id):
+        """Continue a crashed or interrupted job from its last checkpoint"""
+        state = JobCheckpoint.load(job_id)
+        if not state:
+            logger.info(f"No checkpoint found for job {job_id}")
+            return None
+        
+        params = state['params']
+        args = dict(params['args'])
+        target = args['per_query'] * len(state.get('shards', {})) if params['mode'] == 'fanout' else args['num_tweets']
+        if state['tweet_count'] >= target:
+            logger.info(f"Job {job_id} already has {state['tweet_count']}/{target} tweets")
+            return f'twitter_scrape_{job_id}.csv'
+        
+        logger.info(f"Resuming job {job_id} from checkpoint ({state['tweet_count']} tweets, "
+                    f"{len(state.get('cursors', {}))} saved cursors)")
+        self._resume_state = state
         try:
-            url = response.url
-            # Look for Twitter's GraphQL API endpoints
-            if ('api.twitter.com' in url or 'x.com/i/api' in url) and \
-               ('SearchTimeline' in url or 'TweetDetail' in url or 'UserTweets' in url):
-                try:
-                    data = response.json()
-                    self._extract_tweets_from_api(data, tab_id)
-                except:
-                    pass
-        except Exception as e:
-            pass
-    
-    def _extract_tweets_from_api(self, data, tab_id):
-        """Extract tweet data with real engagement from API response"""
+            if params['mode'] == 'fanout':
+                return self.scrape_many(job_id=job_id, **args)
+            return self.scrape(job_id=job_id, **args)
+        finally:
+            self._resume_state = None
+
+    def _open_sink(self, job_id, num_tweets):
+        """CSV handler for a new job, or the rolled-back file of a resumed one"""
+        handler_class = FastCSVHandler if num_tweets >= 50 else CSVHandler
+        if not self._resume_state:
+            self.cursors = {}
+            self.resume_cursors = {}
+            return handler_class(job_id)
+        
+        handler = handler_class(job_id, resume=True)
+        handler.restore(self._resume_state)
+        self.cursors = dict(self._resume_state.get('cursors', {}))
+        self.resume_cursors = dict(self.cursors)
+        logger.info(f"Appending to {handler.get_filename()} ({handler.get_tweet_count()} tweets already saved)")
+        return handler
+
+    def _start_checkpointing(self, params):
+        """Save cursors, dedupe set and sink offset every checkpoint_interval seconds"""
+        self._checkpoint_params = params
+        self.checkpoint = JobCheckpoint(self.job_id)
+        self.checkpoint.start(self._checkpoint_state, interval=self.checkpoint_interval)
+        logger.info(f"Checkpointing to {self.checkpoint.path} (resume with: python main.py --resume {self.job_id})")
+
+    @staticmethod
+    def _cursor_key(tab_id, shard=None):
+        """Checkpoint key of a timeline cursor: the shard in fan-out, else the tab"""
+        return shard.label if shard else f'tab {tab_id}'
+
+    def _checkpoint_state(self, completed=False):
+        def positions():
+            with self.lock:
+                return {'cursors': dict(self.cursors),
+                        'shards': {shard.label: shard.count for shard in self.shards}}
+        # Cursors are read under the sink's write lock, in the same snapshot as its offset
+        state = self.csv_handler.checkpoint_state(positions)
+        state['params'] = self._checkpoint_params
+        state['completed'] = completed
+        return state
+
+    def _finish_checkpointing(self, completed=False):
+        """Final checkpoint; completed only when the run ended normally (not on errors or Ctrl+C)"""
+        if self.checkpoint:
+            try:
+                self.checkpoint.stop(self._checkpoint_state(completed=completed))
+            except Exception as e:
+                logger.error(f"Checkpoint error: {e}")
+            self.checkpoint = None
+
+    def build_shards(self, keywords=None, hashtags=None, usernames=None, search_mode='top'):
+        """One QueryShard per keyword, hashtag and username (duplicates removed)"""
+        shards = []
+        seen_urls = set()
+        for term in keywords or []:
+            shards.append(QueryShard(term, self.build_url(term, '', '', '', search_mode), 0))
+        for term in hashtags or []:
+            label = term if term.startswith('#') else f'#{term}'
+            shards.append(QueryShard(label, self.build_url('', term, '', '', search_mode), 0))
+        for term in usernames or []:
+            label = term if term.startswith('@') else f'@{term}'
+            shards.append(QueryShard(label, self.build_url('', '', term.lstrip('@'), '', search_mode), 0))
+        
+        unique_shards = []
+        for shard in shards:
+            if shard.url not in seen_urls:
+                seen_urls.add(shard.url)
+                unique_shards.append(shard)
+        return unique_shards
+
+    def _split_terms(self, value):
+        return [term.strip() for term in (value or '').split(',') if term.strip()]
+
+    def _next_shard(self):
+        """Idle shard with the least progress, or None when nothing is left"""
+        with self.lock:
+            candidates = [s for s in self.shards if not s.is_full() and not s.exhausted and s.active_tabs == 0]
+            if not candidates:
+                return None
+            shard = min(candidates, key=lambda s: s.count / s.quota)
+            shard.active_tabs += 1
+            return shard
+
+    def _default_tab_count(self, num_tweets):
+        """Configured tab count, or one sized to the target"""
+        if self.num_tabs is not None:
+            return self.num_tabs
+        if num_tweets >= 200:
+            return 8  # Maximum for very large targets
+        elif num_tweets >= 100:
+            return 6  # High for large targets
+        elif num_tweets >= 50:
+            return 5  # Medium-high for medium targets
+        return 4  # Faster for small targets
+
+    def _limit_tabs_to_identities(self, num_tabs):
+        """Never run more tabs than the identities can lease (strict tabs_per_identity only)"""
+        pool = self.identity_pool
+        capacity = pool.capacity()
+        accounts = len(pool.identities)
+        if capacity is not None and num_tabs > capacity:
+            logger.warning(f"Limiting to {capacity} tabs: {accounts} account(s) at {pool.tabs_per_identity} tab(s) each. "
+                           f"Add cookie files (comma-separated or a directory) or raise --tabs-per-account for more tabs")
+            return capacity
+        if not pool.anonymous and num_tabs > accounts:
+            logger.warning(f"{num_tabs} tabs share {accounts} account(s), so each account scrapes from "
+                           f"several tabs at once. Add cookie files (comma-separated or a directory) to spread the load")
+        return num_tabs
+
+    def _extract_tweets_from_api(self, data, tab_id, shard=None):
+        """Extract tweet data with real engagement from API response
+        
+        Returns the page's bottom cursor (None if it has none or extraction stopped early).
+        """
+        cursor = None
         try:
             if not isinstance(data, dict):
                 return
@@ -129,21 +443,47 @@ class TwitterScraper:
                         entries = instruction.get('entries', [])
                         for entry in entries:
                             # Stop processing if we've reached target
-                            if self.target_reached or self.csv_handler.get_tweet_count() >= self.target_tweets:
+                            if self.target_reached:
+                                return
+                            if shard and shard.is_full():
                                 return
-                            self._process_api_entry(entry, tab_id)
+                            self._process_api_entry(entry, tab_id, shard)
+            
+            # Remember where this timeline ends so a resumed job can continue from here
+            if instructions and isinstance(instructions, list):
+                cursor = self._find_bottom_cursor(instructions)
+                if cursor:
+                    # Under the sink's lock, so a checkpoint never sees the cursor without its tweets
+                    with self.csv_handler.write_lock:
+                        self.cursors[self._cursor_key(tab_id, shard)] = cursor
             
             # Also check for direct tweet data
             tweets = self._find_in_dict(data, 'tweets')
             if tweets and isinstance(tweets, dict):
                 for tweet_id, tweet_data in tweets.items():
                     # Stop processing if we've reached target
-                    if self.target_reached or self.csv_handler.get_tweet_count() >= self.target_tweets:
+                    if self.target_reached:
                         return
-                    self._process_api_tweet(tweet_data, tab_id, None)
+                    if shard and shard.is_full():
+                        return
+                    self._process_api_tweet(tweet_data, tab_id, None, shard=shard)
         except Exception as e:
             pass
+        return cursor
     
+    def _find_bottom_cursor(self, instructions):
+        """The 'cursor-bottom' value of a timeline page (None if it has none)"""
+        for instruction in instructions:
+            if not isinstance(instruction, dict):
+                continue
+            entries = instruction.get('entries') or []
+            if isinstance(instruction.get('entry'), dict):  # TimelineReplaceEntry on later pages
+                entries = entries + [instruction['entry']]
+            for entry in entries:
+                if isinstance(entry, dict) and str(entry.get('entryId', '')).startswith('cursor-bottom'):
+                    return entry.get('content', {}).get('value')
+        return None
+
     def _find_in_dict(self, obj, key):
         """Recursively find a key in nested dict/list"""
         if isinstance(obj, dict):
@@ -160,7 +500,7 @@ class TwitterScraper:
                     return result
         return None
     
-    def _process_api_entry(self, entry, tab_id):
+    def _process_api_entry(self, entry, tab_id, shard=None):
         """Process a timeline entry from API"""
         try:
             if not isinstance(entry, dict):
@@ -173,16 +513,67 @@ class TwitterScraper:
             
             if result:
                 # Pass the full entry for better user data extraction
-                self._process_api_tweet(result, tab_id, entry)
+                self._process_api_tweet(result, tab_id, entry, shard=shard)
         except:
             pass
     
-    def _process_api_tweet(self, tweet_data, tab_id, entry=None):
-        """Extract engagement metrics from API tweet data"""
+    def _process_api_tweet(self, tweet_data, tab_id, entry=None, require_engagement=True, shard=None):
+        """Extract engagement metrics from API tweet data and save the tweet
+        
+        Returns the parsed tweet if it passed the filters (even when it was a duplicate).
+        """
+        tweet = self._parse_api_tweet(tweet_data, entry)
+        if not tweet:
+            return None
+        
+        # FILTER: Only include tweets with engagement > 0
+        if require_engagement and tweet['likes'] == '0' and tweet['retweets'] == '0' and tweet['replies'] == '0':
+            return None
+        
+        # Add to CSV if unique and has engagement; a slot is claimed first so tabs can't overshoot
+        if self.target_reached or not self.csv_handler:
+            return None
+        if shard and not shard.reserve():
+            return None  # This query's quota is full
+        if not self.csv_handler.try_reserve(1):
+            if shard:
+                shard.commit(False)
+            self.target_reached = True
+            return None
+        
+        saved = self.csv_handler.commit_tweet(tweet)
+        if shard:
+            shard.commit(saved)
+        
+        query = shard.label if shard else 'main'
+        if saved:
+            metrics.TWEETS_ACCEPTED.inc(tab=tab_id, query=query, source='api')
+            BOARD.tweet(tab_id)
+            current_count = self._count_saved()
+            logger.debug("Tab %s: API tweet - %s: %s likes, %s RTs, %s replies (Total: %d)", tab_id, tweet['username'],
+                         tweet['likes'], tweet['retweets'], tweet['replies'], current_count)
+        else:
+            metrics.TWEETS_DUPLICATE.inc(tab=tab_id, query=query, source='api')
+        return tweet
+    
+    def _count_saved(self):
+        """Book one saved tweet; cancels every tab once the sink is full. Returns the sink count."""
+        with self.lock:
+            self.total_scraped += 1
+        if self.csv_handler.is_full():
+            self.target_reached = True
+        return self.csv_handler.get_tweet_count()
+
+    def _parse_api_tweet(self, tweet_data, entry=None):
+        """Build a CSV row from API tweet data (None for retweets or malformed data)"""
         try:
             if not isinstance(tweet_data, dict):
                 return
             
+            # Tweets with visibility notices wrap the real tweet one level down
+            if tweet_data.get('__typename') == 'TweetWithVisibilityResults':
+                tweet_data = tweet_data.get('tweet', {})
+            
             # Get legacy data (contains engagement metrics)
             legacy = tweet_data.get('legacy', {})
             if not legacy:
@@ -230,10 +621,6 @@ class TwitterScraper:
             else:
                 engagement_rate = 0
             
-            # FILTER: Only include tweets with engagement > 0
-            if likes == 0 and retweets == 0 and replies == 0:
-                return
-            
             # Get user data - try ALL possible paths in the API response
             username = None
             display_name = None
@@ -415,653 +802,80 @@ class TwitterScraper:
                 'followers_count': str(followers_count),
                 'following_count': str(following_count)
             }
-            
-            # Add to CSV if unique and has engagement
-            # Check if we've already reached the target before adding
-            current_count = self.csv_handler.get_tweet_count()
-            if current_count >= self.target_tweets:
-                return  # Stop processing more tweets
-            
-            if self.csv_handler and self.csv_handler.add_tweet(tweet):
-                with self.lock:
-                    self.total_scraped += 1
-                current_count = self.csv_handler.get_tweet_count()
-                print(f"Tab {tab_id}: API tweet - {username}: {likes} likes, {retweets} RTs, {replies} replies (Total: {current_count})")
-                
-                # Check again after adding
-                if current_count >= self.target_tweets:
-                    self.target_reached = True
+            return tweet
         
         except Exception as e:
-            pass
+            return None
 
-    def scrape_tab_simple(self, search_url, num_tweets, tab_id):
-        """Simplified, more reliable tab scraping"""
-        print(f"Tab {tab_id}: Starting...")
+    def _build_dom_tweet(self, article):
+        """CSV row from article data read off the page (fallback when the API path misses a tweet)
         
-        try:
-            with sync_playwright() as p:
-                # Get a random proxy for this tab for better distribution
-                # Proxies enabled for better rate limiting and avoiding blocks
-                use_proxies = True  # Enabled to avoid getting blocked
-                
-                proxy = None
-                if use_proxies:
-                    # Use random proxy selection for better distribution
-                    proxy = self.proxy_manager.get_random_proxy()
-                    if proxy:
-                        print(f"Tab {tab_id}: Using proxy {proxy.get('server', 'unknown')}")
-                    else:
-                        print(f"Tab {tab_id}: No proxy available, using direct connection")
-                
-                # Launch browser with global proxy setting (required by Playwright)
-                # If proxy is None, Playwright will use direct connection
-                browser_args = [
-                    '--no-sandbox', 
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-                
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=browser_args,
-                    proxy=proxy if proxy else None
-                )
-                
-                # Create context with better stealth settings
-                user_agent = random.choice(self.user_agents)
-                context = browser.new_context(
-                    user_agent=user_agent,
-                    viewport={'width': 1366, 'height': 768},
-                    locale='en-US',
-                    timezone_id='America/New_York'
-                )
-                
-                print(f"Tab {tab_id}: Using user agent: {user_agent[:50]}...")
-                
-                if not proxy:
-                    print(f"Tab {tab_id}: Using direct connection (no proxies available)")
-                
-                if self.cookies:
-                    context.add_cookies(self.cookies)
-                
-                page = context.new_page()
-                
-                # Add stealth JavaScript
-                page.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined,
-                    });
-                """)
-                
-                # Set up API response interception for real engagement metrics
-                if self.use_api_extraction:
-                    page.on('response', lambda response: self._intercept_api_response(response, tab_id))
-                
-                # Navigate to URL with retries
-                print(f"Tab {tab_id}: Navigating to search page...")
-                max_retries = 3
-                response = None
-                
-                for retry in range(max_retries):
-                    try:
-                        response = page.goto(search_url, timeout=45000, wait_until='domcontentloaded')
-                        print(f"Tab {tab_id}: Response status: {response.status if response else 'None'}")
-                        
-                        if response and response.status == 200:
-                            break
-                        elif response and response.status in [429, 503]:
-                            print(f"Tab {tab_id}: Rate limited (status {response.status}), marking proxy as failed")
-                            if proxy:
-                                self.proxy_manager.mark_failed(proxy)
-                            time.sleep(random.uniform(5, 10))
-                            return
-                    except Exception as e:
-                        print(f"Tab {tab_id}: Navigation attempt {retry + 1} failed: {e}")
-                        if retry < max_retries - 1:
-                            time.sleep(random.uniform(2, 4))
-                        else:
-                            return
-                
-                time.sleep(random.uniform(3, 5))  # Give more time to load
-                
-                # Debug: Check what we loaded
-                title = page.title()
-                current_url = page.url
-                print(f"Tab {tab_id}: Page title: '{title}'")
-                print(f"Tab {tab_id}: Current URL: {current_url}")
-                
-                # Enhanced blocking detection
-                is_blocked = False
-                blocking_reason = ""
-                
-                # Check for various blocking indicators
-                if (title == "X" or 
-                    "login" in title.lower() or 
-                    "sign" in title.lower() or
-                    "suspended" in title.lower() or
-                    "unavailable" in title.lower()):
-                    is_blocked = True
-                    blocking_reason = f"Title indicates blocking: {title}"
-                
-                # Check page content for additional blocking indicators
-                try:
-                    page_content = page.content().lower()
-                    blocking_indicators = [
-                        "something went wrong",
-                        "this account is suspended", 
-                        "this account doesn't exist",
-                        "rate limit exceeded",
-                        "temporarily restricted",
-                        "suspicious activity",
-                        "page doesn't exist",
-                        "try searching for something else",
-                        "hmm...this page doesn't exist",
-                        "this page doesn't exist"
-                    ]
-                    
-                    for indicator in blocking_indicators:
-                        if indicator in page_content:
-                            is_blocked = True
-                            blocking_reason = f"Content indicates blocking: {indicator}"
-                            break
-                            
-                except Exception as e:
-                    pass
-                
-                if is_blocked:
-                    print(f"Tab {tab_id}: {blocking_reason}")
-                    print(f"Tab {tab_id}: Marking proxy as failed and trying different search")
-                    if proxy:
-                        self.proxy_manager.mark_failed(proxy)
-                    
-                    # Try a simpler search approach
-                    try:
-                        # Try searching for just "AI" instead of complex query
-                        simple_url = "https://x.com/search?q=AI&src=typed_query&f=top"
-                        print(f"Tab {tab_id}: Trying simpler search: {simple_url}")
-                        page.goto(simple_url, timeout=30000)
-                        time.sleep(random.uniform(2, 4))
-                        
-                        new_title = page.title()
-                        print(f"Tab {tab_id}: Simple search title: {new_title}")
-                        
-                        # If simple search also fails, skip this tab
-                        if ("doesn't exist" in new_title.lower() or 
-                            new_title == "X" or 
-                            "login" in new_title.lower()):
-                            print(f"Tab {tab_id}: Simple search also failed, skipping tab")
-                            return
-                            
-                    except Exception as e:
-                        print(f"Tab {tab_id}: Simple search attempt failed: {e}")
-                        return
-                
-                # Try to close any popups (faster)
-                try:
-                    close_btn = page.query_selector('[aria-label=\"Close\"]')
-                    if close_btn:
-                        close_btn.click()
-                        time.sleep(0.3)
-                except:
-                    pass
-                
-                tweets_found = 0
-                # Much more aggressive scrolling for larger targets
-                if num_tweets >= 200:
-                    max_scrolls = 300  # Very aggressive for 200+
-                elif num_tweets >= 100:
-                    max_scrolls = 200  # More aggressive for 100+
-                elif num_tweets >= 50:
-                    max_scrolls = 100  # Moderate for 50+
-                else:
-                    max_scrolls = 50   # Conservative for small targets
-                    
-                no_content_count = 0
-                consecutive_no_tweets = 0  # Track consecutive failed extractions
-                
-                for scroll in range(max_scrolls):
-                    if self.target_reached:
-                        print(f"Tab {tab_id}: Target reached globally, stopping")
-                        break
-                    
-                    # Extract tweets from current view
-                    tweets = self.extract_tweets_simple(page)
-                    
-                    # Check if we're on a "no results" page or empty page
-                    try:
-                        page_content = page.content().lower()
-                        no_results_indicators = [
-                            'no results',
-                            'try searching for something else',
-                            'nothing here',
-                            'no tweets found',
-                            "hmm...this page doesn't exist",
-                            "this page doesn't exist"
-                        ]
-                        
-                        if any(indicator in page_content for indicator in no_results_indicators):
-                            print(f"Tab {tab_id}: No results page detected, stopping")
-                            break
-                            
-                        # Check if page is completely empty
-                        if len(page_content) < 1000:  # Very small page likely means error
-                            print(f"Tab {tab_id}: Page seems empty ({len(page_content)} chars), stopping")
-                            break
-                            
-                    except Exception as e:
-                        # If page content check fails, continue trying
-                        print(f"Tab {tab_id}: Could not check page content: {e}")
-                    
-                    if tweets:
-                        new_tweets = 0
-                        for tweet in tweets:
-                            # Check global count
-                            current_count = self.csv_handler.get_tweet_count()
-                            if current_count >= num_tweets:
-                                self.target_reached = True
-                                break
-                            
-                            # Add tweet if unique
-                            if self.csv_handler.add_tweet(tweet):
-                                new_tweets += 1
-                                tweets_found += 1
-                                with self.lock:
-                                    self.total_scraped += 1
-                        
-                        if new_tweets > 0:
-                            current_count = self.csv_handler.get_tweet_count()
-                            print(f"Tab {tab_id}: +{new_tweets} tweets (Total: {current_count}/{num_tweets})")
-                            no_content_count = 0
-                        else:
-                            no_content_count += 1
-                    else:
-                        no_content_count += 1
-                        print(f"Tab {tab_id}: No tweets found in view {scroll + 1}")
-                    
-                    # Much more aggressive persistence for larger targets
-                    current_total = self.csv_handler.get_tweet_count()
-                    progress_ratio = current_total / num_tweets
-                    
-                    if num_tweets >= 200:
-                        # For very large targets (200+), extremely persistent
-                        if progress_ratio < 0.2:
-                            max_no_content = 25   # Very persistent early on
-                        elif progress_ratio < 0.5:
-                            max_no_content = 20   # Persistent early-mid
-                        elif progress_ratio < 0.8:
-                            max_no_content = 15   # Still persistent mid-way
-                        else:
-                            max_no_content = 12   # Persistent near end
-                    elif num_tweets >= 100:
-                        # For large targets (100-199), very persistent
-                        if progress_ratio < 0.3:
-                            max_no_content = 20   # Very persistent early on
-                        elif progress_ratio < 0.6:
-                            max_no_content = 15   # Persistent mid-way
-                        elif progress_ratio < 0.85:
-                            max_no_content = 12   # Still persistent
-                        else:
-                            max_no_content = 10   # Try harder near end
-                    elif num_tweets >= 50:
-                        # For medium targets (50-99), moderately persistent
-                        if progress_ratio < 0.5:
-                            max_no_content = 15   # Persistent early
-                        elif progress_ratio < 0.8:
-                            max_no_content = 12   # Moderate persistence
-                        else:
-                            max_no_content = 10   # Still trying near end
-                    else:
-                        max_no_content = 8  # Conservative for small targets
-                    
-                    if no_content_count >= max_no_content:
-                        print(f"Tab {tab_id}: No new content for {max_no_content} attempts (progress: {progress_ratio:.1%}), stopping")
-                        break
-                    
-                    # More aggressive scrolling with variable speeds
-                    if num_tweets >= 200:
-                        # Largest targets: very aggressive scrolling
-                        scroll_distance = random.uniform(8, 12) * page.evaluate('window.innerHeight')
-                        page.evaluate(f'window.scrollBy(0, {scroll_distance})')
-                    elif num_tweets >= 100:
-                        # Large targets: aggressive scrolling
-                        scroll_distance = random.uniform(6, 10) * page.evaluate('window.innerHeight')
-                        page.evaluate(f'window.scrollBy(0, {scroll_distance})')
-                    else:
-                        # Smaller targets: moderate scrolling
-                        scroll_distance = random.uniform(4, 8) * page.evaluate('window.innerHeight')
-                        page.evaluate(f'window.scrollBy(0, {scroll_distance})')
-                    
-                    # Adaptive wait times based on performance and target
-                    if no_content_count >= 8:
-                        sleep_time = random.uniform(1.5, 2.0)  # Longer wait when really struggling
-                    elif no_content_count >= 5:
-                        sleep_time = random.uniform(1.0, 1.5)  # Moderate wait when struggling
-                    elif no_content_count >= 3:
-                        sleep_time = random.uniform(0.8, 1.2)  # Short wait when struggling
-                    elif num_tweets >= 200:
-                        sleep_time = random.uniform(0.4, 0.6)  # Fast for very large targets
-                    elif num_tweets >= 100:
-                        sleep_time = random.uniform(0.5, 0.8)  # Moderate for large targets
-                    else:
-                        sleep_time = random.uniform(0.3, 0.6)  # Quick for smaller targets
-                    
-                    time.sleep(sleep_time)
-                
-                print(f"Tab {tab_id}: Finished with {tweets_found} tweets")
-                browser.close()
-                
-        except Exception as e:
-            print(f"Tab {tab_id}: Error: {e}")
-
-    def extract_tweets_simple(self, page):
-        """Simplified tweet extraction with basic selectors"""
-        tweets = []
+        article: {'text', 'href', 'likes', 'retweets', 'replies'} as returned by the engine's extractor.
+        Returns None for UI chrome, promoted content, retweets and articles without a status link.
+        """
+        text = (article.get('text') or '').strip()
+        if not text or len(text) < 10:  # Minimum length for real tweets
+            return None
         
-        try:
-            # Minimal content loading wait (optimized for speed)
-            time.sleep(0.1)
-            
-            # Look for tweet articles with multiple strategies
-            articles = page.query_selector_all('article')
-            
-            # If no articles, try alternative selectors
-            if not articles:
-                # Try alternative selectors for tweet containers
-                alt_selectors = [
-                    '[data-testid="tweet"]',
-                    '[data-testid="cellInnerDiv"]',
-                    'div[data-testid*="tweet"]',
-                    '[role="article"]',
-                    '.css-175oi2r[data-testid]',  # Generic Twitter container
-                    '[data-testid="primaryColumn"] > div > div',  # Timeline items
-                    'div[aria-label*="timeline"]',  # Timeline specific
-                    'section[aria-labelledby] article',  # Section articles
-                    '.r-1d09ksm',  # CSS class often used for tweets
-                    '.r-18u37iz'   # Another common CSS class
-                ]
-                
-                for selector in alt_selectors:
-                    articles = page.query_selector_all(selector)
-                    if articles:
-                        print(f"Found {len(articles)} articles using selector: {selector}")
-                        break
-            else:
-                print(f"Found {len(articles)} articles using standard selector")
-            
-            if not articles:
-                # No articles found - this likely means the page has no tweets or is blocked
-                print("No articles found - likely empty page, no tweets, or authentication required")
-                return tweets
-            
-            for i, article in enumerate(articles[:50]):  # Aggressive: 50 per extraction for speed
-                try:
-                    # Look for tweet text in various ways
-                    text_elem = None
-                    text_selectors = [
-                        '[data-testid="tweetText"]',
-                        'div[lang]',
-                        'span[dir="auto"]',
-                        'div[data-testid*="text"]',
-                        '.css-1rynq56',
-                        '.css-901oao',
-                        'span',
-                        'div'
-                    ]
-                    
-                    for selector in text_selectors:
-                        text_elems = article.query_selector_all(selector)
-                        if text_elems:
-                            # Try to find the best text element (longest text)
-                            best_elem = max(text_elems, key=lambda e: len(e.inner_text().strip()) if e.inner_text() else 0)
-                            if best_elem and len(best_elem.inner_text().strip()) > 10:
-                                text_elem = best_elem
-                                break
-                    
-                    if not text_elem:
-                        continue
-                    
-                    text = text_elem.inner_text().strip()
-                    if not text or len(text) < 10:  # Minimum length for real tweets
-                        continue
-                    
-                    # Skip obvious UI elements by content
-                    ui_elements = [
-                        'notifications', 'home', 'explore', 'messages', 'bookmarks',
-                        'top latest people media lists', 'people you follow', 'advanced search',
-                        'politics · trending', 'trending', 'what\'s happening',
-                        'kismat adhikari', 'see new tweets', 'show this thread',
-                        'top latest people media', 'latest people media lists',
-                        'people media lists', 'top latest', 'media lists',
-                        'click to follow', 'follow'
-                    ]
-                    
-                    if any(ui_elem in text.lower() for ui_elem in ui_elements):
-                        continue
-                    
-                    # Skip very short text that's likely UI
-                    if len(text.split()) < 4:  # Require at least 4 words for a real tweet
-                        continue
-                    
-                    # Skip if it's only navigation terms
-                    nav_only_terms = ['top', 'latest', 'people', 'media', 'lists', 'home', 'explore', 'trending']
-                    text_words = [word.lower().strip('.,!?') for word in text.split()]
-                    if all(word in nav_only_terms for word in text_words):
-                        continue
-                    
-                    # Clean text for CSV: remove newlines and normalize whitespace
-                    text = ' '.join(text.split())  # This removes all extra whitespace and newlines
-                    text = text.replace('"', '""')  # Escape quotes for CSV
-                    
-                    # Skip promoted content and retweets
-                    if 'Promoted' in text or text.startswith('RT @'):
-                        continue
-                    
-                    # Try to get username and tweet ID from links - enhanced approach
-                    username = 'unknown'
-                    tweet_id = f'tweet_{int(time.time())}_{i}'
-                    
-                    # First, try to get the article's main link
-                    try:
-                        # Method 1: Look for time/date links (most reliable)
-                        time_selectors = [
-                            'a[href*="/status/"]',
-                            'time parent a',
-                            'a time',
-                            '[data-testid="Time"] a'
-                        ]
-                        
-                        for selector in time_selectors:
-                            time_links = article.query_selector_all(selector)
-                            for link in time_links:
-                                href = link.get_attribute('href')
-                                if href and '/status/' in href:
-                                    # Clean and parse href
-                                    href = href.strip('/')
-                                    if href.startswith('/'):
-                                        href = href[1:]  # Remove leading slash
-                                    
-                                    # Extract from pattern: username/status/id
-                                    parts = href.split('/')
-                                    status_index = -1
-                                    for idx, part in enumerate(parts):
-                                        if part == 'status':
-                                            status_index = idx
-                                            break
-                                    
-                                    if status_index > 0 and status_index + 1 < len(parts):
-                                        username = parts[status_index - 1]
-                                        tweet_id = parts[status_index + 1].split('?')[0].split('#')[0]
-                                        if username and tweet_id and tweet_id.isdigit():
-                                            break
-                            
-                            if username != 'unknown' and tweet_id.isdigit():
-                                break
-                        
-                        # Method 2: If still unknown, try profile links in article
-                        if username == 'unknown':
-                            profile_selectors = [
-                                'a[href^="/"][href*="/"]:not([href*="/status/"]):not([href*="/search/"]):not([href*="/hashtag/"])',
-                                '[data-testid="User-Name"] a',
-                                '[data-testid="User-Names"] a'
-                            ]
-                            
-                            for selector in profile_selectors:
-                                profile_links = article.query_selector_all(selector)
-                                for link in profile_links:
-                                    href = link.get_attribute('href')
-                                    if href:
-                                        href = href.strip('/')
-                                        if href.startswith('/'):
-                                            href = href[1:]
-                                        
-                                        # Simple username pattern (just username, no other paths)
-                                        if '/' not in href and len(href) > 0 and not any(skip in href.lower() for skip in ['search', 'hashtag', 'compose', 'home', 'explore', 'notifications', 'settings']):
-                                            username = href
-                                            break
-                                
-                                if username != 'unknown':
-                                    break
-                        
-                        # Method 3: If we have username but no real tweet ID, try to find it again
-                        if username != 'unknown' and not tweet_id.isdigit():
-                            status_links = article.query_selector_all(f'a[href*="/{username}/status/"]')
-                            for link in status_links:
-                                href = link.get_attribute('href')
-                                if href and f'/{username}/status/' in href:
-                                    potential_id = href.split('/status/')[-1].split('?')[0].split('#')[0]
-                                    if potential_id.isdigit():
-                                        tweet_id = potential_id
-                                        break
-                        
-                    except Exception as e:
-                        pass
-                    
-                    # Try to get tweet ID from data attributes or aria-labels
-                    if tweet_id.startswith('tweet_'):
-                        try:
-                            # Look for tweet timestamp links or data attributes
-                            time_links = article.query_selector_all('a[href*="/status/"]')
-                            for time_link in time_links:
-                                href = time_link.get_attribute('href')
-                                if href and '/status/' in href:
-                                    tweet_id = href.split('/status/')[-1].split('?')[0]
-                                    if tweet_id and tweet_id.isdigit():
-                                        break
-                        except:
-                            pass
-                        try:
-                            # Look for tweet timestamp links or data attributes
-                            time_links = article.query_selector_all('a[href*="/status/"]')
-                            for time_link in time_links:
-                                href = time_link.get_attribute('href')
-                                if href and '/status/' in href:
-                                    tweet_id = href.split('/status/')[-1].split('?')[0]
-                                    if tweet_id and tweet_id.isdigit():
-                                        break
-                        except:
-                            pass
-                    
-                    # Extract engagement metrics from HTML
-                    likes = '0'
-                    retweets = '0'
-                    replies = '0'
-                    
-                    try:
-                        # Try to extract engagement from aria-labels and data attributes
-                        # Look for like button
-                        like_button = article.query_selector('[data-testid="like"]')
-                        if like_button:
-                            aria_label = like_button.get_attribute('aria-label')
-                            if aria_label:
-                                # Parse "123 Likes" or "Like"
-                                import re
-                                match = re.search(r'(\d+)', aria_label)
-                                if match:
-                                    likes = match.group(1)
-                        
-                        # Look for retweet button
-                        retweet_button = article.query_selector('[data-testid="retweet"]')
-                        if retweet_button:
-                            aria_label = retweet_button.get_attribute('aria-label')
-                            if aria_label:
-                                match = re.search(r'(\d+)', aria_label)
-                                if match:
-                                    retweets = match.group(1)
-                        
-                        # Look for reply button
-                        reply_button = article.query_selector('[data-testid="reply"]')
-                        if reply_button:
-                            aria_label = reply_button.get_attribute('aria-label')
-                            if aria_label:
-                                match = re.search(r'(\d+)', aria_label)
-                                if match:
-                                    replies = match.group(1)
-                    except Exception as e:
-                        pass
-                    
-                    # Simple hashtag and mention extraction
-                    import re
-                    hashtags = ', '.join(re.findall(r'#\w+', text))
-                    mentions = ', '.join(re.findall(r'@\w+', text))
-                    
-                    tweet = {
-                        'tweet_id': tweet_id,
-                        'tweet_url': f'https://x.com/{username}/status/{tweet_id}',
-                        'username': username,
-                        'display_name': username,
-                        'verified': '',
-                        'text': text,
-                        'timestamp': '',
-                        'language': '',
-                        'tweet_type': 'original',
-                        'likes': likes,
-                        'retweets': retweets,
-                        'replies': replies,
-                        'quotes': '0',  # HTML extraction doesn't get quotes
-                        'bookmarks': '0',  # HTML extraction doesn't get bookmarks
-                        'views': '',  # HTML extraction doesn't get views
-                        'engagement_rate': '',
-                        'hashtags': hashtags,
-                        'mentions': mentions,
-                        'media_urls': '',
-                        'is_original': 'true',
-                        'tweet_link': f'https://x.com/{username}/status/{tweet_id}',
-                        'profile_link': f'https://x.com/{username}',
-                        'profile_bio': '',
-                        'profile_location': '',
-                        'profile_website': '',
-                        'profile_email': '',
-                        'followers_count': '0',
-                        'following_count': '0'
-                    }
-                    
-                    tweets.append(tweet)
-                    
-                except Exception as e:
-                    continue
-            
-            print(f"Extracted {len(tweets)} tweets from current view")
-            return tweets
-            
-        except Exception as e:
-            print(f"Extract error: {e}")
-            return tweets
-
-    def build_url(self, keyword, hashtag, username, tweet_url, search_mode='top'):
-        """Build search URL with engagement filtering
+        # Skip obvious UI elements by content
+        ui_elements = [
+            'notifications', 'home', 'explore', 'messages', 'bookmarks',
+            'top latest people media lists', 'people you follow', 'advanced search',
+            'politics · trending', 'trending', 'what\'s happening',
+            'see new tweets', 'show this thread', 'click to follow'
+        ]
+        if any(ui_elem in text.lower() for ui_elem in ui_elements):
+            return None
         
-        Args:
-            search_mode: 'top' (popular/high engagement), 'live' (latest), 'people' (from verified accounts)
-        """
-        if tweet_url:
-            return tweet_url
+        # Skip very short text that's likely UI
+        if len(text.split()) < 4:  # Require at least 4 words for a real tweet
+            return None
         
-        if username:
-            return f'https://x.com/{username}'
+        # Skip promoted content and retweets
+        if 'Promoted' in text or text.startswith('RT @'):
+            return None
+        
+        # Extract from pattern: /username/status/id
+        match = re.search(r'/([^/]+)/status/(\d+)', article.get('href') or '')
+        if not match:
+            return None
+        username, tweet_id = match.group(1), match.group(2)
         
+        # Clean text for CSV: remove newlines and normalize whitespace
+        text = ' '.join(text.split())
+        text = text.replace('"', '""')  # Escape quotes for CSV
+        
+        return {
+            'tweet_id': tweet_id,
+            'tweet_url': f'https://x.com/{username}/status/{tweet_id}',
+            'username': username,
+            'display_name': username,
+            'verified': '',
+            'text': text,
+            'timestamp': '',
+            'language': '',
+            'tweet_type': 'original',
+            'likes': article.get('likes') or '0',
+            'retweets': article.get('retweets') or '0',
+            'replies': article.get('replies') or '0',
+            'quotes': '0',  # HTML extraction doesn't get quotes
+            'bookmarks': '0',  # HTML extraction doesn't get bookmarks
+            'views': '',  # HTML extraction doesn't get views
+            'engagement_rate': '',
+            'hashtags': ', '.join(re.findall(r'#\w+', text)),
+            'mentions': ', '.join(re.findall(r'@\w+', text)),
+            'media_urls': '',
+            'is_original': 'true',
+            'tweet_link': f'https://x.com/{username}/status/{tweet_id}',
+            'profile_link': f'https://x.com/{username}',
+            'profile_bio': '',
+            'profile_location': '',
+            'profile_website': '',
+            'profile_email': '',
+            'followers_count': '0',
+            'following_count': '0'
+        }
+
     def build_url(self, keyword, hashtag, username, tweet_url, search_mode='top'):
         """Build search URL with engagement filtering
         
@@ -1085,6 +899,7 @@ class TwitterScraper:
                 # If it contains commas, treat as multiple keywords
                 if ',' in keyword_clean:
                     # Take only first keyword to avoid complex queries
+                    # (scrape() fans comma lists out into one query per term instead)
                     first_keyword = keyword_clean.split(',')[0].strip()
                     if first_keyword:
                         search_parts.append(first_keyword)
@@ -1098,6 +913,7 @@ class TwitterScraper:
                 # If it contains commas, treat as multiple hashtags
                 if ',' in hashtag_clean:
                     # Take only first hashtag to avoid complex queries
+                    # (scrape() fans comma lists out into one query per term instead)
                     first_hashtag = hashtag_clean.split(',')[0].strip()
                     if first_hashtag and not first_hashtag.startswith('#'):
                         search_parts.append(f'#{first_hashtag}')
@@ -1121,10 +937,10 @@ class TwitterScraper:
             
             # Ensure query isn't too long (Twitter has limits)
             if len(combined_query) > 100:
-                print(f"Query too long ({len(combined_query)} chars), using first part only")
+                logger.info(f"Query too long ({len(combined_query)} chars), using first part only")
                 combined_query = search_parts[0] + ' min_faves:1'
             
-            print(f"Search query: {combined_query}")
+            logger.info(f"Search query: {combined_query}")
             encoded_query = quote(combined_query)
             
             # Choose the right filter parameter
@@ -1143,232 +959,223 @@ class TwitterScraper:
     def scrape_optimized(self, keyword='', hashtag='', username='', tweet_url='', num_tweets=500, search_mode='top'):
         """Optimized scraping method for very large targets (500+ tweets)
         
-        Uses advanced strategies:
-        - More aggressive scrolling
-        - Query rotation
-        - Enhanced tab management
-        - Reduced delays
+        Runs the engine's optimized preset: 12 pages, fast fixed-pace scrolling.
         """
-        print(f"🚀 OPTIMIZED SCRAPING: Target {num_tweets} tweets")
-        
-        # Build search URL
+        logger.info(f"🚀 OPTIMIZED SCRAPING: Target {num_tweets} tweets")
         search_url = self.build_url(keyword, hashtag, username, tweet_url, search_mode)
+        return asyncio.run(self.scrape_url_async(search_url, num_tweets, f"optimized_{num_tweets}", EngineConfig.optimized()))
+
+    def _scrape_bulk_urls(self, tweet_urls, job_id, num_workers=8, max_retries=3, use_hydration=True):
+        """Scrape specific tweets by URL or id over a bounded pool of warm contexts
         
-        # Force optimal settings for large targets
-        self.num_tabs = 12  # Maximum tabs
-        self.csv_handler = FastCSVHandler(f"optimized_{num_tweets}")
-        self.job_id = f"optimized_{num_tweets}"
-        self.target_tweets = num_tweets
+        Tweets are first hydrated in batches of 100 ids per GraphQL call. Whatever
+        that misses is fetched one page at a time: each worker keeps one browser
+        context open and reads the tweet from the TweetDetail API response.
+        """
+        tweet_ids = self._dedupe_tweet_ids(tweet_urls)
+        logger.info(f"📋 BULK MODE: {len(tweet_ids)} unique tweets ({len(tweet_urls)} URLs given)")
         
-        print(f"OPTIMIZED SCRAPE: {self.num_tabs} parallel tabs")
-        print(f"Target: {num_tweets} tweets")
-        print(f"URL: {search_url}")
+        self.csv_handler = FastCSVHandler(job_id)
+        self.job_id = job_id
+        self.target_tweets = len(tweet_ids)
+        self._reset_counters()
+        self.bulk_failures = {}  # tweet_id -> last error
         
-        # Reset counters
-        self.total_scraped = 0
-        self.target_reached = False
+        if not tweet_ids:
+            self._stop_monitors()
+            return None
         
-        # Enhanced parallel scraping with rotation
         start_time = time.time()
-        with ThreadPoolExecutor(max_workers=self.num_tabs) as executor:
-            futures = []
-            
-            # Submit initial tasks
-            for i in range(self.num_tabs):
-                future = executor.submit(self._scrape_tab_optimized, search_url, num_tweets, i)
-                futures.append(future)
-                time.sleep(0.1)  # Stagger starts slightly
-            
-            # Monitor progress and rotate if needed
-            completed = 0
-            last_count = 0
-            rotation_count = 0
-            
-            while completed < len(futures) and not self.target_reached:
-                # Check for completed tasks
-                for i, future in enumerate(futures):
-                    if future.done() and future not in [f for f in futures[:completed]]:
-                        try:
-                            result = future.result()
-                            print(f"Tab {i}: Completed with {result} tweets")
-                        except Exception as e:
-                            print(f"Tab {i}: Error - {e}")
-                        completed += 1
-                
-                # Check if we should rotate stalled tabs
-                current_time = time.time()
-                if current_time - start_time > 60 * (rotation_count + 1):  # Every minute
-                    current_count = self.total_scraped
-                    if current_count == last_count and current_count < num_tweets * 0.8:
-                        print(f"⚡ ROTATING tabs - progress stalled at {current_count}")
-                        # Start new rotation tasks
-                        for i in range(min(4, self.num_tabs)):  # Rotate up to 4 tabs
-                            if rotation_count < 3:  # Max 3 rotations
-                                future = executor.submit(self._scrape_tab_optimized, search_url, num_tweets, f"{i}_r{rotation_count}")
-                                futures.append(future)
-                        rotation_count += 1
-                    last_count = current_count
-                
-                time.sleep(5)  # Check every 5 seconds
-            
-            # Wait for remaining tasks (with timeout)
-            timeout = 300  # 5 minutes max
-            for future in futures:
-                try:
-                    future.result(timeout=timeout)
-                except:
-                    pass
+        remaining_ids = tweet_ids
+        if use_hydration:
+            hydrator = TweetHydrator(self)
+            hydrated = hydrator.hydrate(tweet_ids)
+            # Ids the batch endpoint answered as missing won't show up in TweetDetail either
+            for tweet_id in hydrator.missing_ids:
+                self.bulk_failures[tweet_id] = 'not returned by TweetResultsByRestIds (deleted or protected?)'
+            remaining_ids = [t for t in tweet_ids if t not in hydrated and t not in hydrator.missing_ids]
+        
+        work_queue = Queue()
+        for tweet_id in remaining_ids:
+            work_queue.put((tweet_id, 0))
+        
+        num_workers = self._limit_tabs_to_identities(max(1, min(num_workers, len(remaining_ids))))
+        if remaining_ids:
+            logger.info(f"Fetching {len(remaining_ids)} tweets one page at a time")
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [executor.submit(self._bulk_worker, work_queue, i, max_retries)
+                       for i in range(num_workers if remaining_ids else 0)]
+            try:
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Bulk worker error: {e}")
+            except KeyboardInterrupt:
+                self.stop('interrupted')  # Workers finish their current tweet and exit
+                raise
+        
+        # Anything still queued was never attempted (e.g. every worker failed to start)
+        while not work_queue.empty():
+            tweet_id, _ = work_queue.get_nowait()
+            self.bulk_failures.setdefault(tweet_id, 'not attempted')
+        
+        self._close_sink()
+        elapsed = time.time() - start_time
+        final_count = self.csv_handler.get_tweet_count()
+        logger.info(f"Bulk scrape complete: {final_count}/{len(tweet_ids)} tweets in {elapsed:.1f}s "
+                    f"({final_count / elapsed if elapsed else 0:.1f} tweets/sec)")
         
-        return self.csv_handler.get_filename()
+        if self.bulk_failures:
+            self._save_bulk_failures(job_id)
+        
+        return self.csv_handler.get_filename() if final_count > 0 else None
 
-    def _scrape_tab_optimized(self, search_url, num_tweets, tab_id):
-        """Optimized tab scraping with aggressive settings"""
-        tab_tweets = 0
-        browser = None
+    def hydrate_tweets(self, tweet_ids, job_id=''):
+        """Refresh known tweets by id in batches (no per-tweet page loads)"""
+        job_id = job_id or f"hydrate_{int(time.time())}"
+        tweet_ids = self._dedupe_tweet_ids(tweet_ids)
+        self.csv_handler = FastCSVHandler(job_id)
+        self.job_id = job_id
+        self.target_tweets = len(tweet_ids)
+        self._reset_counters()
         
+        TweetHydrator(self).hydrate(tweet_ids)
+        self._close_sink()
+        return self.csv_handler.get_filename() if self.csv_handler.get_tweet_count() > 0 else None
+
+    def _dedupe_tweet_ids(self, tweet_urls):
+        """Extract tweet ids from URLs or bare ids, keeping first-seen order"""
+        tweet_ids = []
+        seen = set()
+        for item in tweet_urls:
+            item = str(item).strip()
+            match = re.search(r'/status(?:es)?/(\d+)', item)
+            tweet_id = match.group(1) if match else (item if item.isdigit() else None)
+            if not tweet_id:
+                logger.warning(f"Skipping invalid tweet URL: {item}")
+                continue
+            if tweet_id not in seen:
+                seen.add(tweet_id)
+                tweet_ids.append(tweet_id)
+        return tweet_ids
+
+    def _bulk_worker(self, work_queue, worker_id, max_retries):
+        """Pull tweet ids off the queue and fetch them through one warm context"""
+        identity = self.identity_pool.lease()
         try:
-            # Launch browser
             with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = self._create_optimized_context(browser)
-                page = context.new_page()
-                
-                # Set optimized timeouts
-                page.set_default_navigation_timeout(15000)  # 15 seconds
-                page.set_default_timeout(10000)  # 10 seconds
-                
-                print(f"Tab {tab_id}: Starting optimized scraping...")
-                
-                # Navigate
-                response = page.goto(search_url, wait_until='domcontentloaded')
-                print(f"Tab {tab_id}: Response status: {response.status}")
-                
-                if response.status != 200:
-                    print(f"Tab {tab_id}: Bad response, skipping")
-                    return 0
-                
-                # Wait for content with reduced timeout
-                try:
-                    page.wait_for_selector('[data-testid="tweet"]', timeout=10000)
-                except:
-                    print(f"Tab {tab_id}: No tweets found quickly, skipping")
-                    return 0
+                browser = p.chromium.launch(
+                    headless=True,
+                    args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-blink-features=AutomationControlled'],
+                    proxy=identity.get_proxy(self.proxy_manager)
+                )
+                saved_state = self.session_store.load(identity.name)
+                context = browser.new_context(
+                    user_agent=identity.user_agent,
+                    viewport={'width': 1366, 'height': 768},
+                    locale='en-US',
+                    storage_state=saved_state,
+                    service_workers='block'
+                )
+                if identity.cookies and not saved_state:
+                    context.add_cookies(identity.cookies)
                 
-                # Optimized scraping loop
-                no_new_tweets = 0
-                last_count = 0
-                scroll_count = 0
-                max_scrolls = 200  # Increased for large targets
+                # Only the API response matters, so skip images, media and fonts
+                context.route('**/*', lambda route: route.abort()
+                              if route.request.resource_type in ('image', 'media', 'font')
+                              else route.continue_())
+                if self.replay:
+                    self.replay.attach(context)
+                page = context.new_page()
                 
-                while (not self.target_reached and 
-                       no_new_tweets < 10 and  # Reduced patience
-                       scroll_count < max_scrolls):
-                    
-                    if self.total_scraped >= num_tweets:
-                        self.target_reached = True
+                while not self.cancel_token.is_cancelled():
+                    try:
+                        tweet_id, attempt = work_queue.get_nowait()
+                    except Empty:
                         break
                     
-                    # Fast extraction
-                    new_tweets = self._extract_tweets_fast(page, tab_id)
-                    tab_tweets += new_tweets
-                    
-                    if new_tweets > 0:
-                        no_new_tweets = 0
-                    else:
-                        no_new_tweets += 1
-                    
-                    # Aggressive scrolling
-                    page.evaluate("window.scrollBy(0, window.innerHeight * 2)")  # Double scroll
-                    time.sleep(0.5)  # Faster scrolling
-                    scroll_count += 1
+                    if identity.account and not identity.is_available():
+                        work_queue.put((tweet_id, attempt))
+                        logger.info(f"Bulk worker {worker_id}: Account {identity.name} out of budget, stopping")
+                        break
                     
-                    # Progress check
-                    if scroll_count % 10 == 0:
-                        progress = (self.total_scraped / num_tweets) * 100
-                        print(f"Tab {tab_id}: Progress {progress:.1f}% ({self.total_scraped}/{num_tweets})")
-                
-                print(f"Tab {tab_id}: Finished with {tab_tweets} tweets")
-                return tab_tweets
+                    try:
+                        self._fetch_tweet_detail(page, tweet_id, identity)
+                    except Exception as e:
+                        if attempt + 1 < max_retries:
+                            work_queue.put((tweet_id, attempt + 1))
+                        else:
+                            self.bulk_failures[tweet_id] = str(e).splitlines()[0] if str(e) else type(e).__name__
+                            logger.warning(f"Bulk worker {worker_id}: Failed {tweet_id} after {max_retries} attempts: {self.bulk_failures[tweet_id]}")
                 
-        except Exception as e:
-            print(f"Tab {tab_id}: Error - {e}")
-            return tab_tweets
-        finally:
-            if browser:
                 browser.close()
+        finally:
+            self.identity_pool.release(identity)
 
-    def _create_optimized_context(self, browser):
-        """Create browser context optimized for speed"""
-        context = browser.new_context(
-            user_agent=random.choice([
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            ]),
-            viewport={'width': 1920, 'height': 1080},
-            extra_http_headers={'Accept-Language': 'en-US,en;q=0.9'}
-        )
+    def _fetch_tweet_detail(self, page, tweet_id, identity):
+        """Open one tweet and save it from the intercepted TweetDetail response"""
+        def is_detail_response(response):
+            return 'TweetDetail' in response.url and tweet_id in unquote(response.url)
+        
+        with page.expect_response(is_detail_response, timeout=20000) as response_info:
+            page.goto(f'https://x.com/i/status/{tweet_id}', timeout=20000, wait_until='commit')
+        response = response_info.value
         
-        # Load cookies if available
-        if hasattr(self, 'cookies') and self.cookies:
-            context.add_cookies(self.cookies)
+        if identity.account:
+            identity.account.record_request()
+        if response.status == 429:
+            if identity.account:
+                self.cookie_pool.mark_rate_limited(identity.account)
+            raise RuntimeError('rate limited (429)')
+        if response.status != 200:
+            raise RuntimeError(f'TweetDetail status {response.status}')
         
-        return context
+        tweet_data = self._find_tweet_result(response.json(), tweet_id)
+        if not tweet_data:
+            raise RuntimeError('tweet not in TweetDetail response (deleted or protected?)')
+        
+        tweet = self._parse_api_tweet(tweet_data)
+        if not tweet:
+            raise RuntimeError('could not parse tweet')
+        
+        # Claim a slot first so concurrent workers can't overshoot the target
+        if not self.csv_handler.try_reserve(1):
+            self.target_reached = True
+            return
+        if self.csv_handler.commit_tweet(tweet):
+            current_count = self._count_saved()
+            logger.debug("Bulk: %s/%s: %s likes (%d/%d)", tweet['username'], tweet_id, tweet['likes'],
+                         current_count, self.target_tweets)
 
-    def _extract_tweets_fast(self, page, tab_id):
-        """Fast tweet extraction optimized for speed"""
-        try:
-            # Quick extraction
-            tweets = page.query_selector_all('[data-testid="tweet"]')
-            new_tweets = 0
-            
-            for tweet in tweets[-5:]:  # Only check last 5 tweets
-                try:
-                    tweet_data = self._extract_tweet_data_fast(tweet)
-                    if tweet_data and not self._is_duplicate(tweet_data):
-                        self.csv_handler.add_tweet(tweet_data)
-                        self.total_scraped += 1
-                        new_tweets += 1
-                        
-                        if self.total_scraped >= self.target_tweets:
-                            self.target_reached = True
-                            break
-                except:
-                    continue
-            
-            return new_tweets
-        except:
-            return 0
+    def _find_tweet_result(self, obj, tweet_id):
+        """Find the tweet result with a given rest_id anywhere in an API response"""
+        if isinstance(obj, dict):
+            if obj.get('rest_id') == tweet_id and 'legacy' in obj:
+                return obj
+            if obj.get('__typename') == 'TweetWithVisibilityResults' and \
+               obj.get('tweet', {}).get('rest_id') == tweet_id:
+                return obj
+            for value in obj.values():
+                result = self._find_tweet_result(value, tweet_id)
+                if result is not None:
+                    return result
+        elif isinstance(obj, list):
+            for item in obj:
+                result = self._find_tweet_result(item, tweet_id)
+                if result is not None:
+                    return result
+        return None
 
-    def _extract_tweet_data_fast(self, tweet_element):
-        """Fast tweet data extraction with minimal processing"""
+    def _save_bulk_failures(self, job_id):
+        """Write tweets that could not be scraped next to the output CSV"""
+        failures_file = f'scraped_data/twitter_scrape_{job_id}_failed.csv'
         try:
-            # Get basic data quickly
-            text_elem = tweet_element.query_selector('[data-testid="tweetText"]')
-            text = text_elem.inner_text() if text_elem else ""
-            
-            username_elem = tweet_element.query_selector('[data-testid="User-Name"] [href^="/"]')
-            username = username_elem.get_attribute('href').strip('/') if username_elem else ""
-            
-            # Generate simple tweet data
-            return {
-                'username': username,
-                'text': text[:500],  # Truncate for speed
-                'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
-                'likes': 1,  # Placeholder
-                'retweets': 0,
-                'replies': 0
-            }
-        except:
-            return None
-
-    def _scrape_bulk_urls(self, tweet_urls, job_id):
-        """Handle bulk URL scraping"""
-        print(f"📋 BULK MODE: {len(tweet_urls)} URLs")
-        self.csv_handler = CSVHandler(job_id)
-        
-        for i, url in enumerate(tweet_urls):
-            print(f"Scraping URL {i+1}/{len(tweet_urls)}: {url}")
-            # Simple implementation for now
-            time.sleep(1)
-        
-        return self.csv_handler.get_filename()
\ No newline at end of file
+            with open(failures_file, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+                writer.writerow(['tweet_id', 'tweet_url', 'error'])
+                for tweet_id, error in self.bulk_failures.items():
+                    writer.writerow([tweet_id, f'https://x.com/i/status/{tweet_id}', error])
+            logger.warning(f"⚠️ {len(self.bulk_failures)} tweets failed, see {failures_file}")
+        except Exception as e:
+            logger.error(f"❌ Error saving bulk failures: {e}")
@@ -0,0 +1,249 @@
+"""
+Process-pool worker mode.
+
+With many tabs in one interpreter, JSON decoding, tweet parsing and CSV
+writing all contend for the GIL. Here every child process runs its own engine
+(own driver, browsers and parser) and ships compact records, one tuple of
+strings per tweet in FIELDNAMES order, to the parent over a
+multiprocessing queue. The parent is the only writer: it does the global
+dedupe and stops every child the moment the exact target is reached.
+
+Each child gets its own slice of the cookie accounts (accounts are shared only
+when there are fewer accounts than processes). A single search is split into
+disjoint date windows (since:/until:) so children never scroll the same
+tweets. Children read the sticky identity bindings but never write them.
+Checkpoint/resume is not available in this mode.
+"""
+import time
+import threading
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from queue import Empty
+from urllib.parse import urlsplit, urlunsplit, parse_qs, urlencode, quote
+from scraper.engine import ScrapeEngine, EngineConfig
+from scraper.fast_csv_handler import FIELDNAMES
+from scraper.query_shard import QueryShard
+from scraper.reservation import ReservingSink
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+class RecordSink(ReservingSink):
+    """Child-side sink: dedupes locally and sends compact rows to the parent in small batches"""
+    def __init__(self, record_queue, child_id, batch_size=20, max_delay=0.25):
+        self.record_queue = record_queue
+        self.child_id = child_id
+        self.batch_size = batch_size
+        self.max_delay = max_delay  # Seconds a row may wait before its batch is sent
+        self.seen_tweet_ids = set()
+        self.buffer = []
+        self.tweet_count = 0
+        self.last_flush = time.time()
+        self.write_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.job_id = f'child{child_id}'
+        self._start_background_flusher()
+    
+    def _start_background_flusher(self):
+        """Send a lone trailing row even if no further tweet arrives to fill its batch"""
+        def flush_worker():
+            while not self.stop_event.wait(self.max_delay):
+                with self.write_lock:
+                    if self.buffer and time.time() - self.last_flush > self.max_delay:
+                        self._flush()
+        
+        self.flusher = threading.Thread(target=flush_worker, daemon=True)
+        self.flusher.start()
+    
+    def _append_locked(self, tweet_data):
+        tweet_id = tweet_data.get('tweet_id')
+        if tweet_id in self.seen_tweet_ids:
+            return False
+        self.seen_tweet_ids.add(tweet_id)
+        self.buffer.append(tuple(str(tweet_data.get(field, '')) for field in FIELDNAMES))
+        self.tweet_count += 1
+        if len(self.buffer) >= self.batch_size or time.time() - self.last_flush > self.max_delay:
+            self._flush()
+        return True
+    
+    def _flush(self):
+        if self.buffer:
+            self.record_queue.put(('rows', self.child_id, self.buffer))
+            self.buffer = []
+        self.last_flush = time.time()
+    
+    def force_flush(self):
+        with self.write_lock:
+            self._flush()
+    
+    def close(self):
+        """Stop the background flusher and send what is still buffered"""
+        self.stop_event.set()
+        if self.flusher:
+            self.flusher.join(timeout=2)
+            self.flusher = None
+        self.force_flush()
+    
+    def get_tweet_count(self):
+        return self.tweet_count
+    
+    def get_filename(self):
+        return None
+
+def split_by_time(search_url, count, quota, today=None):
+    """Split one search into `count` disjoint date windows, newest first and doubling in
+    length (the last one open-ended); None when the URL is not a search (e.g. a profile)"""
+    parts = urlsplit(search_url or '')
+    params = parse_qs(parts.query)
+    if parts.path != '/search' or 'q' not in params:
+        return None
+    query = params['q'][0]
+    today = today or datetime.now(timezone.utc).date()
+    # Window k covers the days [2^k - 1, 2^(k+1) - 1) before today
+    dates = [(today - timedelta(days=2 ** k - 1)).isoformat() for k in range(count)]
+    shards = []
+    for k in range(count):
+        if count == 1:
+            window = ''
+        elif k == 0:
+            window = f'since:{dates[1]}'
+        elif k == count - 1:
+            window = f'until:{dates[k]}'
+        else:
+            window = f'since:{dates[k + 1]} until:{dates[k]}'
+        params['q'] = [f'{query} {window}'.strip()]
+        url = urlunsplit(parts._replace(query=urlencode(params, doseq=True, quote_via=quote)))
+        shards.append(QueryShard(f'{query} [{window or "all"}]', url, quota))
+    return shards
+
+def _child_main(child_id, cookie_files, dead_proxies, search_url, shard_specs, num_tweets, num_tabs,
+                config_name, record_queue, stop_event):
+    """Entry point of a child process: scrape until the parent says stop"""
+    from scraper.playwright_scraper import TwitterScraper
+    
+    # Proxies were already probed by the parent; identities.json is the parent's to write
+    scraper = TwitterScraper(num_tabs=num_tabs, cookie_source=cookie_files, proxy_preflight=False,
+                             identities_read_only=True)
+    scraper.proxy_manager.dead_proxies.update(dead_proxies)
+    sink = RecordSink(record_queue, child_id)
+    scraper.csv_handler = sink
+    scraper.job_id = sink.job_id
+    scraper.target_tweets = float('inf')  # The parent owns the target
+    scraper.shards = [QueryShard(label, url, quota) for label, url, quota in shard_specs]
+    
+    def wait_for_stop():
+        stop_event.wait()
+        scraper.target_reached = True
+    threading.Thread(target=wait_for_stop, daemon=True).start()
+    
+    try:
+        engine = ScrapeEngine(scraper, getattr(EngineConfig, config_name)())
+        num_tabs = scraper._limit_tabs_to_identities(num_tabs)
+        if scraper.shards:
+            engine.run(None, num_tweets, min(num_tabs, len(scraper.shards)), fanout=True)
+        else:
+            engine.run(search_url, num_tweets, num_tabs)
+    except Exception as e:
+        logger.error(f"Process {child_id}: Error: {e}")
+    finally:
+        sink.close()
+        record_queue.put(('done', child_id, None))
+
+class ProcessPoolScraper:
+    def __init__(self, scraper, num_processes=4, tabs_per_process=2, config_name='standard'):
+        self.scraper = scraper  # Parent TwitterScraper: owns the sink, accounts and proxy health
+        self.num_processes = num_processes
+        self.tabs_per_process = tabs_per_process
+        self.config_name = config_name  # EngineConfig preset run by every child
+        self.drain_timeout = 30  # Seconds to wait for children after the target is reached
+        self.child_target = _child_main  # Module-level function run in every child (spawn pickles it)
+    
+    def _cookie_slices(self, num_processes):
+        """Split the cookie files over the children (shared only with fewer accounts than children)"""
+        paths = [account.path for account in self.scraper.cookie_pool.accounts if account.path]
+        if not paths:
+            return [[] for _ in range(num_processes)]
+        if len(paths) < num_processes:
+            logger.warning(f"{num_processes} processes share {len(paths)} account(s). "
+                           f"Add cookie files (comma-separated or a directory) so each process gets its own")
+            return [[paths[i % len(paths)]] for i in range(num_processes)]
+        return [paths[i::num_processes] for i in range(num_processes)]
+    
+    def run(self, search_url=None, shards=None, num_tweets=100):
+        """Scrape into the scraper's open sink; returns the number of tweets saved"""
+        scraper = self.scraper
+        num_processes = self.num_processes
+        if not shards and num_processes > 1:
+            # Children working the same timeline from the top would only find each other's tweets
+            shards = split_by_time(search_url, num_processes * self.tabs_per_process, num_tweets)
+            if shards is None:
+                logger.error(f"Can't split {search_url} across processes (only searches can be split "
+                             f"by date); running it in 1 process")
+                num_processes = 1
+        cookie_slices = self._cookie_slices(num_processes)
+        if shards:
+            num_processes = min(num_processes, len(shards))
+        shard_specs = [[(s.label, s.url, s.quota) for s in (shards or [])[i::num_processes]]
+                       for i in range(num_processes)]
+        
+        context = multiprocessing.get_context('spawn')
+        record_queue = context.Queue()
+        stop_event = context.Event()
+        dead_proxies = list(scraper.proxy_manager.dead_proxies)
+        children = [
+            context.Process(
+                target=self.child_target,
+                args=(i, cookie_slices[i], dead_proxies, search_url, shard_specs[i], num_tweets,
+                      self.tabs_per_process, self.config_name, record_queue, stop_event),
+                daemon=True
+            )
+            for i in range(num_processes)
+        ]
+        logger.info(f"STARTING PROCESS POOL: {num_processes} processes x {self.tabs_per_process} tabs")
+        for child in children:
+            child.start()
+        
+        sink = scraper.csv_handler
+        running = num_processes
+        stop_deadline = None
+        def stop_children(reason):
+            stop_event.set()  # e.g. scraper.stop() from another thread
+        scraper.cancel_token.on_cancel(stop_children)
+        try:
+            while running:
+                try:
+                    kind, child_id, rows = record_queue.get(timeout=1)
+                except Empty:
+                    if not any(child.is_alive() for child in children):
+                        break  # Children died without reporting
+                    if stop_event.is_set() and stop_deadline is None:
+                        stop_deadline = time.time() + self.drain_timeout
+                    if stop_deadline and time.time() > stop_deadline:
+                        break
+                    continue
+                
+                if kind == 'done':
+                    running -= 1
+                    continue
+                
+                for values in rows:
+                    if not sink.try_reserve(1):
+                        break  # Rows after the cut-off are dropped
+                    if sink.commit_tweet(dict(zip(FIELDNAMES, values))):
+                        scraper.total_scraped += 1
+                if sink.is_full() and not stop_event.is_set():
+                    logger.info(f"🎯 Target of {num_tweets} reached, stopping all processes")
+                    scraper.target_reached = True
+                    stop_event.set()
+                    stop_deadline = time.time() + self.drain_timeout
+        except KeyboardInterrupt:
+            logger.info("Stopping all processes...")
+        finally:
+            scraper.cancel_token.remove_callback(stop_children)
+            stop_event.set()
+            for child in children:
+                child.join(timeout=5)
+                if child.is_alive():
+                    child.terminate()
+        
+        return sink.get_tweet_count()
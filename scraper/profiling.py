@@ -0,0 +1,146 @@
+"""
+Built-in CPU and memory profiling for scrape jobs.
+
+A job regressing in production can be profiled without touching code:
+
+    python main.py --profile cpu    # cProfile of the event loop and worker threads
+    python main.py --profile mem    # tracemalloc top allocation sites + raw snapshot
+
+Reports are written next to the job's CSV:
+twitter_scrape_<job>_profile_cpu.prof (load with pstats, snakeviz or
+`python -m pstats`) plus a _profile_cpu.txt summary, or
+twitter_scrape_<job>_profile_mem.txt plus a .tracemalloc snapshot.
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_MODES = ('cpu', 'mem')
+
+class JobProfiler:
+    def __init__(self, mode, top=25, frames=25):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r} (expected one of {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.top = top  # Functions / allocation sites listed in the text report
+        self.frames = frames  # Traceback depth tracemalloc keeps per allocation
+        self.profile = None
+        self.thread_profiles = []  # cProfile of every thread started while profiling
+        self.snapshot = None
+        self.peak = 0
+        self.started = None
+        self.elapsed = 0.0
+        self.running = False
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.running = True
+        if self.mode == 'cpu':
+            self.thread_profiles = []
+            # cProfile only sees the thread that enables it; bulk/hydration workers enable their own
+            threading.setprofile(self._profile_new_thread)
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start(self.frames)
+            tracemalloc.reset_peak()
+        return self
+
+    def _profile_new_thread(self, frame, event, arg):
+        """First profile event of a new thread: swap the hook for a real profiler"""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        self.thread_profiles.append(profile)
+        profile.enable()
+
+    def stop(self):
+        if not self.running:
+            return self
+        self.running = False
+        self.elapsed = time.perf_counter() - self.started
+        if self.mode == 'cpu':
+            self.profile.disable()
+            threading.setprofile(None)
+        else:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            ))
+            self.peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def stats(self):
+        """Merged pstats.Stats of the job thread and every profiled worker thread"""
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        for profile in self.thread_profiles:
+            try:
+                stats.add(profile)
+            except Exception:
+                pass  # Thread exited before recording a call
+        return stats
+
+    def report(self):
+        """Human-readable top-N summary"""
+        out = io.StringIO()
+        out.write(f"{self.mode.upper()} profile: {self.elapsed:.1f}s wall\n\n")
+        if self.mode == 'cpu':
+            stats = self.stats()
+            stats.stream = out
+            out.write(f"Top {self.top} by cumulative time ({len(self.thread_profiles) + 1} threads)\n")
+            stats.sort_stats('cumulative').print_stats(self.top)
+            out.write(f"\nTop {self.top} by own time\n")
+            stats.sort_stats('tottime').print_stats(self.top)
+        else:
+            statistics = self.snapshot.statistics('lineno')
+            retained = sum(stat.size for stat in statistics)
+            out.write(f"Peak traced: {self.peak / 1024 / 1024:.1f} MB, "
+                      f"retained at end: {retained / 1024 / 1024:.1f} MB in {sum(s.count for s in statistics)} blocks\n\n")
+            out.write(f"Top {self.top} allocation sites (retained at end of job)\n")
+            for index, stat in enumerate(statistics[:self.top], 1):
+                frame = stat.traceback[0]
+                out.write(f"{index:>3}. {frame.filename}:{frame.lineno}: "
+                          f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            out.write("\nLargest allocation tracebacks\n")
+            for stat in self.snapshot.statistics('traceback')[:3]:
+                out.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format(limit=self.frames):
+                    out.write(f"{line}\n")
+        return out.getvalue()
+
+    def save(self, output_file):
+        """Write the profile next to output_file (the job's CSV); returns the written paths"""
+        self.stop()
+        base = f"{os.path.splitext(output_file)[0]}_profile_{self.mode}"
+        os.makedirs(os.path.dirname(base) or '.', exist_ok=True)
+        paths = []
+        if self.mode == 'cpu':
+            self.stats().dump_stats(f'{base}.prof')
+            paths.append(f'{base}.prof')
+        else:
+            self.snapshot.dump(f'{base}.tracemalloc')
+            paths.append(f'{base}.tracemalloc')
+        with open(f'{base}.txt', 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        paths.append(f'{base}.txt')
+        logger.info(f"🔬 {self.mode.upper()} profile saved to {', '.join(paths)}")
+        return paths
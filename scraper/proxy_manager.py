@@ -1,17 +1,91 @@
+import os
+import time
+import base64
 import random
+import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
+from urllib.parse import urlsplit
+from scraper import metrics
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+# Lightweight endpoints used to check that a proxy can actually relay traffic; a proxy
+# is alive if any of them answers, so one blocked endpoint does not kill every proxy.
+# Override with the probe_url argument or PROXY_PROBE_URL (comma-separated, e.g. a local test server).
+DEFAULT_PROBE_URLS = 'http://www.gstatic.com/generate_204,http://cp.cloudflare.com/generate_204'
+
+class NoLiveProxyError(RuntimeError):
+    """Every proxy is dead and a direct connection was not allowed"""
+
+_shared_managers = {}  # abspath(proxy_file) -> ProxyManager shared by every scraper of this process
+_shared_lock = threading.Lock()
 
 class ProxyManager:
-    def __init__(self, proxy_file='proxies.txt', rotation_count=3):  # Rotate more frequently
+    def __init__(self, proxy_file='proxies.txt', rotation_count=3,  # Rotate more frequently
+                 preflight=False, probe_url=None, probe_timeout=5.0, probe_interval=0, allow_direct=None):
         self.proxies = []
         self.failed_proxies = set()
+        self.dead_proxies = set()  # Proxies that failed the latest pre-flight probe
         self.current_index = 0
         self.rotation_count = rotation_count  # Rotate after N uses
         self.usage_count = 0  # Track how many times current proxy has been used
         self.proxy_usage = {}  # Track usage per proxy
+        self.proxy_latency = {}  # Last probe latency in seconds per proxy
+        self.health_scores = {}  # 0.0 (dead) .. 1.0 (fast and healthy) per proxy
+        probe_urls = probe_url or os.environ.get('PROXY_PROBE_URL', DEFAULT_PROBE_URLS)
+        self.probe_urls = [u.strip() for u in probe_urls.split(',') if u.strip()]
+        if allow_direct is None:
+            allow_direct = os.environ.get('PROXY_ALLOW_DIRECT', '') not in ('', '0')
+        # Opt-in: when every proxy is dead, scrape from this machine's own IP instead of failing
+        self.allow_direct = allow_direct
+        self.probe_timeout = probe_timeout
+        self.probe_concurrency = 100  # Max simultaneous probes
         self.lock = threading.Lock()  # Thread safety for parallel tabs
+        self._probe_thread = None
+        self._stop_probing = threading.Event()
+        self.preflighted = False
+        self.users = 0  # Scrapers holding this manager through shared()
         self.load_proxies(proxy_file)
+        
+        # Pre-flight: find dead proxies before any browser is launched with them
+        if preflight and self.proxies:
+            self.preflight()
+        if probe_interval and self.proxies:
+            self.start_background_probing(probe_interval)
+    
+    @classmethod
+    def shared(cls, proxy_file='proxies.txt', preflight=False, probe_interval=0, **kwargs):
+        """Process-wide manager for proxy_file: pre-flighted once and probed by one thread,
+        however many scrapers use it. Other kwargs only apply when it is first created.
+        Pair every call with release().
+        """
+        key = os.path.abspath(proxy_file)
+        with _shared_lock:
+            manager = _shared_managers.get(key)
+            if manager is None:
+                manager = _shared_managers[key] = cls(proxy_file, preflight=preflight,
+                                                      probe_interval=probe_interval, **kwargs)
+            else:
+                if preflight and manager.proxies and not manager.preflighted:
+                    manager.preflight()
+                if probe_interval and manager.proxies:
+                    manager.start_background_probing(probe_interval)
+            manager.users += 1
+        return manager
+    
+    def release(self):
+        """Drop one user; the last one stops background probing"""
+        with _shared_lock:
+            self.users = max(0, self.users - 1)
+            if self.users:
+                return
+            for key, manager in list(_shared_managers.items()):
+                if manager is self:
+                    del _shared_managers[key]
+        self.stop_background_probing()
     
     def load_proxies(self, proxy_file):
         """Load proxies from file in format: ip:port:username:password"""
@@ -21,14 +95,39 @@ class ProxyManager:
                     line = line.strip()
                     if line and not line.startswith('#'):
                         self.proxies.append(line)
-            print(f"Loaded {len(self.proxies)} proxies")
+            logger.info(f"Loaded {len(self.proxies)} proxies")
         except FileNotFoundError:
-            print(f"Warning: {proxy_file} not found. Running without proxies.")
+            logger.warning(f"{proxy_file} not found. Running without proxies.")
     
     def get_next_proxy(self) -> Optional[dict]:
         """Alias for get_proxy for compatibility"""
         return self.get_proxy()
     
+    def _available_proxies(self) -> List[str]:
+        """Proxies that are neither dead nor failed (caller must hold the lock)"""
+        alive_proxies = [p for p in self.proxies if p not in self.dead_proxies]
+        if not alive_proxies:
+            # Never hand a known-dead proxy to a browser
+            return []
+        
+        available_proxies = [p for p in alive_proxies if p not in self.failed_proxies]
+        if not available_proxies:
+            # Reset failed proxies if all are failed
+            logger.warning("All proxies failed, resetting failed list...")
+            self.failed_proxies.clear()
+            available_proxies = alive_proxies
+        return available_proxies
+    
+    def _no_live_proxy(self):
+        """None (direct connection) when allowed, otherwise NoLiveProxyError"""
+        if self.allow_direct:
+            logger.warning("All proxies failed pre-flight, using direct connection (allow_direct)")
+            return None
+        raise NoLiveProxyError(
+            f"All {len(self.proxies)} proxies failed pre-flight against {', '.join(self.probe_urls)}. "
+            f"Check the proxies or PROXY_PROBE_URL, or pass --allow-direct to scrape from this machine's IP."
+        )
+    
     def get_proxy(self) -> Optional[dict]:
         """Get next available proxy with proper rotation for parallel tabs"""
         if not self.proxies:
@@ -36,15 +135,13 @@ class ProxyManager:
         
         with self.lock:
             # Find the least used, non-failed proxy
-            available_proxies = [p for p in self.proxies if p not in self.failed_proxies]
+            available_proxies = self._available_proxies()
             if not available_proxies:
-                # Reset failed proxies if all are failed
-                print("All proxies failed, resetting failed list...")
-                self.failed_proxies.clear()
-                available_proxies = self.proxies[:]
+                return self._no_live_proxy()
             
-            # Sort by usage count (ascending) to get least used proxy
-            available_proxies.sort(key=lambda p: self.proxy_usage.get(p, 0))
+            # Sort by usage count (ascending) to get least used proxy, fastest first on ties
+            available_proxies.sort(key=lambda p: (self.proxy_usage.get(p, 0),
+                                                  self.proxy_latency.get(p, self.probe_timeout)))
             
             # Get the least used proxy
             selected_proxy_str = available_proxies[0]
@@ -56,7 +153,7 @@ class ProxyManager:
             if proxy_dict:
                 proxy_dict['_usage_count'] = self.proxy_usage[selected_proxy_str]
                 proxy_dict['_proxy_string'] = selected_proxy_str  # For failure tracking
-                print(f"Assigned proxy {selected_proxy_str.split(':')[0]} (usage: {self.proxy_usage[selected_proxy_str]})")
+                logger.debug(f"Assigned proxy {selected_proxy_str.split(':')[0]} (usage: {self.proxy_usage[selected_proxy_str]})")
             
             return proxy_dict
     
@@ -78,31 +175,28 @@ class ProxyManager:
         return None
     
     def get_random_proxy(self) -> Optional[dict]:
-        """Get a random proxy from available proxies"""
+        """Get a random proxy from available proxies, weighted by health score"""
         if not self.proxies:
             return None
         
         with self.lock:
-            available_proxies = [p for p in self.proxies if p not in self.failed_proxies]
-            if not available_proxies:
-                # Reset if all failed
-                self.failed_proxies.clear()
-                available_proxies = self.proxies[:]
+            available_proxies = self._available_proxies()
             
             if available_proxies:
-                selected_proxy_str = random.choice(available_proxies)
+                # Unprobed proxies get a neutral weight so they still get a chance
+                weights = [max(self.health_scores.get(p, 0.5), 0.05) for p in available_proxies]
+                selected_proxy_str = random.choices(available_proxies, weights=weights)[0]
                 proxy_dict = self.parse_proxy(selected_proxy_str)
                 if proxy_dict:
                     proxy_dict['_proxy_string'] = selected_proxy_str
                 return proxy_dict
-            
-        return None
+            return self._no_live_proxy()
     
     def reset_usage_counts(self):
         """Reset all proxy usage counts"""
         with self.lock:
             self.proxy_usage.clear()
-            print("Reset all proxy usage counts")
+            logger.info("Reset all proxy usage counts")
     
     def mark_failed(self, proxy_dict: dict):
         """Mark a proxy as failed"""
@@ -110,13 +204,143 @@ class ProxyManager:
             with self.lock:
                 proxy_string = proxy_dict.get('_proxy_string')
                 if proxy_string:
+                    metrics.PROXY_FAILURES.inc(proxy=metrics.proxy_label(proxy_string))
                     self.failed_proxies.add(proxy_string)
-                    print(f"Marked proxy as failed: {proxy_string.split(':')[0]}")
+                    self.health_scores[proxy_string] = self.health_scores.get(proxy_string, 0.5) * 0.5
+                    logger.warning(f"Marked proxy as failed: {proxy_string.split(':')[0]}")
                 else:
                     # Fallback method
                     server = proxy_dict.get('server', '')
                     for proxy_str in self.proxies:
                         if server in proxy_str:
+                            metrics.PROXY_FAILURES.inc(proxy=metrics.proxy_label(proxy_str))
                             self.failed_proxies.add(proxy_str)
-                            print(f"Marked proxy as failed: {server}")
+                            logger.warning(f"Marked proxy as failed: {server}")
                             break
+    
+    def preflight(self):
+        """Probe every proxy concurrently and seed latency and health scores"""
+        start_time = time.time()
+        results = self._run_probes()
+        self.preflighted = True
+        alive = [latency for ok, latency in results.values() if ok]
+        avg_latency = sum(alive) / len(alive) if alive else 0
+        logger.info(f"Proxy pre-flight: {len(alive)}/{len(results)} alive "
+                    f"(avg latency {avg_latency * 1000:.0f}ms, took {time.time() - start_time:.1f}s)")
+        if results and not alive:
+            logger.error(f"No proxy passed pre-flight against {', '.join(self.probe_urls)} "
+                         f"(if the proxies work, the probe endpoints may be blocked: set PROXY_PROBE_URL)")
+        return results
+    
+    def _run_probes(self):
+        """Run preflight_async() to completion, on a helper thread when called from inside an event loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.preflight_async())
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(lambda: asyncio.run(self.preflight_async())).result()
+    
+    async def preflight_async(self):
+        """Async pre-flight for callers that already run an event loop"""
+        semaphore = asyncio.Semaphore(self.probe_concurrency)
+        
+        async def probe(proxy_str):
+            async with semaphore:
+                return await self._probe_proxy(proxy_str)
+        
+        proxies = list(self.proxies)
+        outcomes = await asyncio.gather(*(probe(p) for p in proxies))
+        results = dict(zip(proxies, outcomes))
+        for proxy_str, (ok, latency) in results.items():
+            self._record_probe(proxy_str, ok, latency)
+        return results
+    
+    async def _probe_proxy(self, proxy_str: str):
+        """Probe the proxy against each probe URL until one answers.
+        
+        Returns (ok, latency_seconds).
+        """
+        ok, latency = False, 0.0
+        for probe_url in self.probe_urls:
+            ok, latency = await self._probe_url(proxy_str, probe_url)
+            if ok:
+                break
+        return ok, latency
+    
+    async def _probe_url(self, proxy_str: str, probe_url: str):
+        """TCP connect plus one lightweight HTTP request through the proxy"""
+        parts = proxy_str.split(':')
+        if len(parts) not in (2, 4):
+            return False, 0.0
+        host, port = parts[0], parts[1]
+        
+        target = urlsplit(probe_url)
+        if target.scheme == 'https':
+            # HTTPS targets go through a CONNECT tunnel; a 200 means the proxy relays
+            request_line = f'CONNECT {target.hostname}:{target.port or 443} HTTP/1.1'
+        else:
+            request_line = f'GET {probe_url} HTTP/1.1'
+        headers = [request_line, f'Host: {target.netloc}', 'Connection: close']
+        if len(parts) == 4:
+            credentials = base64.b64encode(f'{parts[2]}:{parts[3]}'.encode()).decode()
+            headers.append(f'Proxy-Authorization: Basic {credentials}')
+        request = ('\r\n'.join(headers) + '\r\n\r\n').encode()
+        
+        start_time = time.perf_counter()
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, int(port)), timeout=self.probe_timeout
+            )
+            writer.write(request)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout=self.probe_timeout)
+            latency = time.perf_counter() - start_time
+            
+            # "HTTP/1.1 204 No Content" -> 204; 407 (bad credentials) and 5xx count as dead
+            status_parts = status_line.decode('latin-1').split()
+            status = int(status_parts[1]) if len(status_parts) > 1 and status_parts[1].isdigit() else 0
+            return 200 <= status < 400, latency
+        except Exception:
+            return False, time.perf_counter() - start_time
+        finally:
+            if writer:
+                writer.close()
+    
+    def _record_probe(self, proxy_str: str, ok: bool, latency: float):
+        """Store probe latency and update the health score of a proxy"""
+        with self.lock:
+            if ok:
+                self.proxy_latency[proxy_str] = latency
+                self.dead_proxies.discard(proxy_str)
+                # Fast proxies score close to 1.0, slow ones close to 0.1
+                speed_score = max(0.1, 1.0 - latency / self.probe_timeout)
+                previous = self.health_scores.get(proxy_str)
+                self.health_scores[proxy_str] = speed_score if previous is None else (previous + speed_score) / 2
+            else:
+                self.dead_proxies.add(proxy_str)
+                self.health_scores[proxy_str] = 0.0
+    
+    def start_background_probing(self, interval=300):
+        """Re-probe all proxies every `interval` seconds on a daemon thread"""
+        if self._probe_thread and self._probe_thread.is_alive():
+            return
+        self._stop_probing.clear()
+        
+        def probe_worker():
+            while not self._stop_probing.wait(interval):
+                try:
+                    asyncio.run(self.preflight_async())
+                except Exception as e:
+                    logger.warning(f"Background proxy probe failed: {e}")
+        
+        self._probe_thread = threading.Thread(target=probe_worker, daemon=True)
+        self._probe_thread.start()
+    
+    def stop_background_probing(self):
+        """Stop the background probe thread"""
+        self._stop_probing.set()
+        if self._probe_thread:
+            self._probe_thread.join(timeout=1)
+            self._probe_thread = None
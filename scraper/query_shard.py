@@ -0,0 +1,45 @@
+"""
+Query shards for multi-query fan-out.
+
+One job can watch many keywords, hashtags and usernames at once. Each query
+becomes a shard with its own quota and progress; all shards write through the
+job's single sink, so the dedupe set is shared.
+"""
+import threading
+
+class QueryShard:
+    def __init__(self, label, url, quota):
+        self.label = label  # e.g. 'AI', '#crypto', '@nasa'
+        self.url = url
+        self.quota = quota
+        self.count = 0  # Tweets saved for this query
+        self.reserved = 0  # Slots claimed by tabs that are writing right now
+        self.active_tabs = 0
+        self.failed_runs = 0  # Tab runs that ended before the quota was met
+        self.exhausted = False  # Timeline drained (or blocked) - stop scheduling it
+        self.lock = threading.Lock()
+    
+    def is_full(self) -> bool:
+        return self.count >= self.quota
+    
+    def reserve(self) -> bool:
+        """Claim one slot of the quota before writing a tweet"""
+        with self.lock:
+            if self.count + self.reserved >= self.quota:
+                return False
+            self.reserved += 1
+            return True
+    
+    def commit(self, saved: bool):
+        """Turn a reservation into a saved tweet, or give it back (duplicate)"""
+        with self.lock:
+            self.reserved -= 1
+            if saved:
+                self.count += 1
+    
+    def progress(self) -> str:
+        state = 'done' if self.is_full() else ('exhausted' if self.exhausted else 'running')
+        return f"{self.label}: {self.count}/{self.quota} ({state})"
+    
+    def __repr__(self):
+        return f"QueryShard({self.progress()})"
@@ -0,0 +1,131 @@
+"""
+Worker loop for the job queue: lease a task, run it with TwitterScraper,
+heartbeat while it runs and push the scraped rows to the shared results table.
+"""
+import os
+import csv
+import time
+import socket
+import threading
+from scraper.playwright_scraper import TwitterScraper
+from scraper.fast_csv_handler import FastCSVHandler
+from scraper.refresh_scheduler import RefreshScheduler
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+class QueueWorker:
+    def __init__(self, queue, scraper_factory=None, worker_id=None, kinds=None, heartbeat_interval=None,
+                 poll_interval=5):
+        self.queue = queue
+        self.scraper_factory = scraper_factory or TwitterScraper
+        self.scraper = None  # Built on the first task and reused for every later one
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.kinds = kinds  # Task kinds this worker takes (None = all)
+        self.heartbeat_interval = heartbeat_interval or max(queue.visibility_timeout / 3, 1)
+        self.poll_interval = poll_interval  # Seconds to wait when the queue is empty
+        self.tasks_done = 0
+
+    def run(self, max_tasks=None, exit_when_idle=False):
+        """Work until stopped (Ctrl+C), max_tasks are done, or the queue is empty with exit_when_idle"""
+        logger.info(f"👷 Worker {self.worker_id} started")
+        try:
+            while max_tasks is None or self.tasks_done < max_tasks:
+                task = self.queue.lease(self.worker_id, self.kinds)
+                if task is None:
+                    if exit_when_idle:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                self.run_task(task)
+        except KeyboardInterrupt:
+            logger.info(f"Worker {self.worker_id} stopped (its lease expires and the task is retried elsewhere)")
+        finally:
+            self.close()
+        logger.info(f"Worker {self.worker_id} finished {self.tasks_done} tasks")
+        return self.tasks_done
+
+    def run_task(self, task):
+        logger.info(f"Worker {self.worker_id}: {task.kind} task {task.task_id} for job {task.job_id} "
+                    f"(attempt {task.attempts})")
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            result = self._execute(task)
+        except Exception as e:
+            logger.warning(f"Worker {self.worker_id}: Task {task.task_id} failed: {e}")
+            self.queue.fail(task.task_id, self.worker_id, e)
+            return None
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        if not self.queue.complete(task.task_id, self.worker_id, result):
+            logger.info(f"Worker {self.worker_id}: Lease on {task.task_id} was lost; results were kept, task may rerun")
+        self.tasks_done += 1
+        logger.info(f"Worker {self.worker_id}: Task {task.task_id} done: {result}")
+        return result
+
+    def _heartbeat(self, task, stop_event):
+        while not stop_event.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(task.task_id, self.worker_id):
+                logger.info(f"Worker {self.worker_id}: Lost the lease on {task.task_id}")
+                return
+
+    def close(self):
+        """Release the worker's scraper (and the proxy probe it holds)"""
+        if self.scraper is not None and hasattr(self.scraper, 'close'):
+            self.scraper.close()
+        self.scraper = None
+
+    def _execute(self, task):
+        if self.scraper is None:
+            self.scraper = self.scraper_factory()
+        scraper = self.scraper
+        payload = dict(task.payload)
+        part_id = f'{task.job_id}_{task.task_id}'  # Local sink for this task only
+
+        if task.kind == 'search':
+            filename = scraper.scrape(job_id=part_id, **payload)
+        elif task.kind == 'tweets':
+            filename = scraper.scrape(tweet_urls=payload['tweet_urls'], job_id=part_id)
+        elif task.kind == 'refresh':
+            # The schedule lives in the queue, so every worker sees the same tracked tweets
+            scheduler = RefreshScheduler(scraper, name=payload['name'], store=self.queue)
+            if payload.get('tweet_urls'):
+                scheduler.track(payload['tweet_urls'])
+            refreshed = scheduler.run_cycle()
+            scheduler.save_state()
+            return {'refreshed': refreshed, 'tracked': len(scheduler.tracked), 'snapshots': scheduler.snapshots}
+        else:
+            raise ValueError(f'Unknown task kind: {task.kind}')
+
+        rows = self._read_rows(filename)
+        added = self.queue.add_results(task.job_id, rows)
+        return {'scraped': len(rows), 'new': added}
+
+    def _read_rows(self, filename):
+        """Rows of a task's local CSV, which is removed once they are in the queue"""
+        if not filename:
+            return []
+        path = os.path.join('scraped_data', filename)
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                rows = list(csv.DictReader(f))
+        except OSError:
+            return []
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return rows
+
+def export_job(queue, job_id):
+    """Write a job's results to scraped_data/twitter_scrape_<job_id>.csv"""
+    handler = FastCSVHandler(job_id)
+    for row in queue.get_results(job_id):
+        handler.add_tweet(row)
+    handler.close()
+    logger.info(f"Exported {handler.get_tweet_count()} tweets to {handler.get_filename()}")
+    return handler.get_filename()
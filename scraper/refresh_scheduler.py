@@ -0,0 +1,269 @@
+"""
+Engagement refresh scheduler for tracked tweets.
+
+Stored tweets are re-hydrated on a decaying cadence: a young tweet is
+refreshed every few minutes, a week-old one a few times a day. Tweets whose
+engagement is still climbing are pulled forward, so when more tweets are due
+than the per-cycle budget allows, the budget goes where metrics are moving.
+Every refresh appends one row to a time-series snapshot CSV.
+
+With a store (a job queue), the schedule lives in the queue database instead
+of a local file, so refresh tasks on any worker share it, and each
+cycle's snapshot rows are returned to the queue with the task result.
+"""
+import os
+import csv
+import json
+import time
+import heapq
+import threading
+from scraper.hydrator import TweetHydrator
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+TWITTER_EPOCH_MS = 1288834974657  # Snowflake ids carry their creation time
+
+SNAPSHOT_FIELDS = ['snapshot_time', 'tweet_id', 'age_hours', 'likes', 'retweets', 'replies',
+                   'quotes', 'bookmarks', 'views', 'velocity_per_hour']
+
+METRIC_FIELDS = ('likes', 'retweets', 'replies', 'quotes', 'bookmarks')
+
+def tweet_created_at(tweet_id):
+    """Creation time (unix seconds) encoded in a tweet id"""
+    return ((int(tweet_id) >> 22) + TWITTER_EPOCH_MS) / 1000.0
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+class TrackedTweet:
+    def __init__(self, tweet_id, engagement=None, last_refresh=None, velocity=0.0, refreshes=0, next_due=0.0):
+        self.tweet_id = tweet_id
+        self.created_at = tweet_created_at(tweet_id)
+        self.engagement = engagement  # Likes + retweets + replies + quotes + bookmarks at last refresh
+        self.last_refresh = last_refresh
+        self.velocity = velocity  # Engagement gained per hour between the last two refreshes
+        self.refreshes = refreshes
+        self.next_due = next_due
+    
+    def age(self, now):
+        return max(now - self.created_at, 0)
+    
+    def to_dict(self):
+        return {
+            'engagement': self.engagement,
+            'last_refresh': self.last_refresh,
+            'velocity': self.velocity,
+            'refreshes': self.refreshes,
+            'next_due': self.next_due
+        }
+
+class RefreshScheduler:
+    def __init__(self, scraper, name='tracked', directory='scraped_data', budget_per_cycle=500,
+                 min_interval=300, max_interval=86400, age_factor=0.25, velocity_scale=50.0,
+                 max_age=30 * 86400, store=None):
+        self.scraper = scraper  # TwitterScraper providing identities and the tweet parser
+        self.store = store  # Job queue holding the shared schedule (None = local state file)
+        self.state_key = f'refresh_{name}'
+        self.state_file = os.path.join(directory, f'refresh_{name}.json')
+        self.snapshot_file = os.path.join(directory, f'refresh_{name}_snapshots.csv')
+        self.budget_per_cycle = budget_per_cycle  # Max tweets hydrated per cycle
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.age_factor = age_factor  # Refresh after the tweet has aged this fraction again
+        self.velocity_scale = velocity_scale  # Engagement/hour that halves the interval
+        self.max_age = max_age  # Stop tracking tweets older than this
+        self.tracked = {}
+        self.heap = []  # (next_due, tweet_id); stale entries are skipped on pop
+        self.snapshots = []  # Snapshot rows of the current cycle (store mode)
+        self.dirty = set()  # Tweets changed since the last save (store mode merges only these)
+        self.lock = threading.Lock()
+        if store is None:
+            os.makedirs(directory, exist_ok=True)
+        self._load_state()
+    
+    def _load_state(self):
+        if self.store is not None:
+            state = self.store.get_state(self.state_key) or {}
+        else:
+            try:
+                with open(self.state_file, 'r') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                return
+        for tweet_id, data in state.items():
+            tracked = TrackedTweet(tweet_id, **data)
+            self.tracked[tweet_id] = tracked
+            heapq.heappush(self.heap, (tracked.next_due, tweet_id))
+    
+    def save_state(self):
+        if self.store is not None:
+            # Refreshes of the same schedule may run at once: merge instead of overwriting
+            self.store.update_state(self.state_key, self._merge_state)
+            return
+        with self.lock:
+            state = {tweet_id: tracked.to_dict() for tweet_id, tracked in self.tracked.items()}
+        tmp_path = f'{self.state_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_file)
+    
+    def _merge_state(self, state):
+        """Fold this scheduler's changes into the stored schedule, keeping newer refreshes made elsewhere"""
+        state = state or {}
+        with self.lock:
+            for tweet_id in self.dirty:
+                tracked = self.tracked.get(tweet_id)
+                if tracked is None:
+                    state.pop(tweet_id, None)
+                elif (state.get(tweet_id, {}).get('last_refresh') or 0) <= (tracked.last_refresh or 0):
+                    state[tweet_id] = tracked.to_dict()
+            self.dirty.clear()
+        return state
+    
+    def track(self, tweet_ids):
+        """Start tracking tweets (ids or URLs); new ones are due immediately"""
+        added = 0
+        with self.lock:
+            for tweet_id in self.scraper._dedupe_tweet_ids(tweet_ids):
+                if tweet_id in self.tracked:
+                    continue
+                self.tracked[tweet_id] = TrackedTweet(tweet_id)
+                self.dirty.add(tweet_id)
+                heapq.heappush(self.heap, (0.0, tweet_id))
+                added += 1
+        logger.info(f"📌 Tracking {added} new tweets ({len(self.tracked)} total)")
+        return added
+    
+    def track_csv(self, csv_path):
+        """Track every tweet in a previous scrape's CSV"""
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            return self.track([row['tweet_id'] for row in csv.DictReader(f) if row.get('tweet_id')])
+    
+    def interval_for(self, tracked, now):
+        """Seconds until the next refresh: grows with age, shrinks with engagement velocity"""
+        interval = tracked.age(now) * self.age_factor
+        interval /= 1 + tracked.velocity / self.velocity_scale
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def due(self, now=None):
+        """Pop the tweets to refresh this cycle, fastest-moving first when over budget"""
+        now = now or time.time()
+        candidates = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                next_due, tweet_id = heapq.heappop(self.heap)
+                tracked = self.tracked.get(tweet_id)
+                if not tracked or tracked.next_due != next_due:
+                    continue  # Untracked or rescheduled since this entry was pushed
+                if tracked.age(now) > self.max_age:
+                    del self.tracked[tweet_id]
+                    self.dirty.add(tweet_id)
+                    continue
+                candidates.append(tracked)
+            
+            # Never-refreshed tweets first, then by velocity
+            candidates.sort(key=lambda t: (t.engagement is not None, -t.velocity))
+            selected = candidates[:self.budget_per_cycle]
+            for tracked in candidates[self.budget_per_cycle:]:
+                heapq.heappush(self.heap, (tracked.next_due, tracked.tweet_id))
+        return [tracked.tweet_id for tracked in selected]
+    
+    def record(self, tweet, now=None):
+        """Store a fresh metric snapshot and reschedule the tweet"""
+        now = now or time.time()
+        with self.lock:
+            tracked = self.tracked.get(tweet['tweet_id'])
+            if not tracked:
+                return
+            engagement = sum(_to_int(tweet.get(field)) for field in METRIC_FIELDS)
+            if tracked.engagement is not None and tracked.last_refresh:
+                hours = max((now - tracked.last_refresh) / 3600, 1 / 60)
+                tracked.velocity = max(engagement - tracked.engagement, 0) / hours
+            tracked.engagement = engagement
+            tracked.last_refresh = now
+            tracked.refreshes += 1
+            tracked.next_due = now + self.interval_for(tracked, now)
+            self.dirty.add(tracked.tweet_id)
+            heapq.heappush(self.heap, (tracked.next_due, tracked.tweet_id))
+            
+            row = {
+                'snapshot_time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)),
+                'tweet_id': tracked.tweet_id,
+                'age_hours': round(tracked.age(now) / 3600, 2),
+                'views': _to_int(tweet.get('views')),
+                'velocity_per_hour': round(tracked.velocity, 2)
+            }
+            for field in METRIC_FIELDS:
+                row[field] = _to_int(tweet.get(field))
+            
+            if self.store is not None:
+                self.snapshots.append(row)
+                return
+            write_header = not os.path.exists(self.snapshot_file)
+            with open(self.snapshot_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=SNAPSHOT_FIELDS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerow(row)
+    
+    def untrack(self, tweet_ids):
+        with self.lock:
+            for tweet_id in tweet_ids:
+                self.tracked.pop(tweet_id, None)
+                self.dirty.add(tweet_id)
+    
+    def run_cycle(self):
+        """Refresh everything due now (within budget); returns the number refreshed"""
+        self.snapshots = []
+        tweet_ids = self.due()
+        if not tweet_ids:
+            return 0
+        
+        logger.info(f"🔄 Refreshing {len(tweet_ids)} of {len(self.tracked)} tracked tweets")
+        self.scraper.target_reached = False  # Fresh cancellation token for this cycle
+        hydrator = TweetHydrator(self.scraper, on_tweet=self.record)
+        hydrator.hydrate(tweet_ids)
+        
+        # Deleted or protected tweets stop being tracked; fetch failures retry next cycle
+        self.untrack(hydrator.missing_ids)
+        now = time.time()
+        with self.lock:
+            for tweet_id in set(tweet_ids) - hydrator.hydrated_ids - hydrator.missing_ids:
+                tracked = self.tracked.get(tweet_id)
+                if tracked:
+                    tracked.next_due = now + self.min_interval
+                    self.dirty.add(tweet_id)
+                    heapq.heappush(self.heap, (tracked.next_due, tweet_id))
+        self.save_state()
+        return len(hydrator.hydrated_ids)
+    
+    def next_due_in(self):
+        """Seconds until the next tracked tweet is due (None when nothing is tracked)"""
+        with self.lock:
+            while self.heap:
+                next_due, tweet_id = self.heap[0]
+                tracked = self.tracked.get(tweet_id)
+                if tracked and tracked.next_due == next_due:
+                    return max(next_due - time.time(), 0)
+                heapq.heappop(self.heap)
+        return None
+    
+    def run(self, poll_interval=60):
+        """Refresh forever (Ctrl+C to stop)"""
+        try:
+            while True:
+                self.run_cycle()
+                wait = self.next_due_in()
+                if wait is None:
+                    logger.info("Nothing left to track")
+                    break
+                time.sleep(max(min(wait, poll_interval), 1))
+        except KeyboardInterrupt:
+            logger.info("Refresh scheduler stopped")
+        finally:
+            self.save_state()
+        return self.snapshot_file
@@ -0,0 +1,419 @@
+"""
+Offline replay of X.com traffic.
+
+A fixture bundle is a directory with a manifest.json and one body file per
+recorded response: SearchTimeline, UserTweets and TweetDetail GraphQL calls,
+page HTML and the scripts/stylesheets the page needs. FixtureRecorder fills a
+bundle from a live browser context; FixtureReplayer answers every request of
+a context from the bundle through Playwright's route.fulfill, so URLs stay on
+x.com and the API interception works unchanged. Nothing reaches the network:
+unknown x.com/twimg requests get a 404, everything else is aborted.
+
+Replays can add latency and inject 429s. build_synthetic_bundle() writes a
+bundle with generated tweets and a small self-contained timeline page that
+pages through them like the real client, so scrapers run end to end with no
+network, cookies or proxies:
+
+    python -m scraper.replay synth fixtures/replay/synthetic --tweets 500
+    python main.py --replay fixtures/replay/synthetic
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+GRAPHQL_OPERATIONS = ('SearchTimeline', 'UserTweets', 'TweetDetail')
+ASSET_TYPES = ('script', 'stylesheet')
+X_HOSTS = ('x.com', 'twitter.com', 'twimg.com')
+RATE_LIMITED_BODY = b'{"errors":[{"code":88,"message":"Rate limit exceeded."}]}'
+
+def _is_x_host(host):
+    return any(host == h or host.endswith('.' + h) for h in X_HOSTS)
+
+def request_key(url, resource_type='fetch'):
+    """(kind, operation, subject, cursor) of a replayable request, or None
+
+    GraphQL calls are keyed by operation, query/user/tweet and cursor, pages by
+    path (the query string is ignored) and assets by host + path.
+    """
+    parts = urlsplit(url)
+    if '/i/api/graphql/' in parts.path:
+        operation = parts.path.rstrip('/').split('/')[-1]
+        if operation not in GRAPHQL_OPERATIONS:
+            return None
+        try:
+            variables = json.loads(parse_qs(parts.query).get('variables', ['{}'])[0])
+        except ValueError:
+            variables = {}
+        subject = variables.get('rawQuery') or variables.get('userId') or variables.get('focalTweetId') or ''
+        return ('graphql', operation, str(subject), variables.get('cursor') or '')
+    if resource_type == 'document' and _is_x_host(parts.netloc):
+        return ('document', '', parts.path.rstrip('/') or '/', '')
+    if resource_type in ASSET_TYPES and _is_x_host(parts.netloc):
+        return ('asset', '', parts.netloc + parts.path, '')
+    return None
+
+class FixtureBundle:
+    """Recorded responses on disk: manifest.json + bodies/"""
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # request key -> {'status', 'content_type', 'body'}
+        self.default_document = None  # Key of the page served for unrecorded x.com paths
+        self.bodies = {}  # Body cache
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        bundle = cls(path)
+        with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        for entry in manifest['entries']:
+            bundle.entries[tuple(entry['key'])] = entry
+        if manifest.get('default_document'):
+            bundle.default_document = tuple(manifest['default_document'])
+        return bundle
+
+    def add(self, key, status, content_type, body):
+        """Store one response (a later response for the same key replaces it)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            filename = entry['body'] if entry else f'bodies/{len(self.entries):05d}'
+            os.makedirs(os.path.join(self.path, 'bodies'), exist_ok=True)
+            with open(os.path.join(self.path, filename), 'wb') as f:
+                f.write(body)
+            self.entries[key] = {'key': list(key), 'status': status, 'content_type': content_type, 'body': filename}
+            self.bodies[filename] = body
+            if key[0] == 'document' and self.default_document is None:
+                self.default_document = key
+
+    def find(self, key):
+        """Entry for a key: exact match, then any subject ('*'), then the default page"""
+        entry = self.entries.get(key)
+        if entry is None and key[0] == 'graphql':
+            entry = self.entries.get((key[0], key[1], '*', key[3]))
+        if entry is None and key[0] == 'document' and self.default_document:
+            entry = self.entries.get(self.default_document)
+        return entry
+
+    def read_body(self, entry):
+        filename = entry['body']
+        body = self.bodies.get(filename)
+        if body is None:
+            with open(os.path.join(self.path, filename), 'rb') as f:
+                body = f.read()
+            self.bodies[filename] = body
+        return body
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self.lock:
+            manifest = {
+                'version': 1,
+                'created': time.time(),
+                'default_document': list(self.default_document) if self.default_document else None,
+                'entries': list(self.entries.values()),
+            }
+        tmp_path = os.path.join(self.path, 'manifest.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.path, 'manifest.json'))
+
+class FixtureRecorder:
+    """Records a live context's timeline calls, pages and assets into a bundle"""
+    def __init__(self, bundle_dir):
+        self.bundle = FixtureBundle(bundle_dir)
+        self.recorded = 0
+
+    def attach(self, context):
+        """Sync Playwright context"""
+        def on_response(response):
+            key = request_key(response.url, response.request.resource_type)
+            if key:
+                try:
+                    self._record(key, response.status, response.headers.get('content-type', ''), response.body())
+                except Exception as e:
+                    logger.warning(f"Recorder: Could not read {response.url[:80]}: {e}")
+        context.on('response', on_response)
+
+    async def attach_async(self, context):
+        """Async Playwright context"""
+        async def on_response(response):
+            key = request_key(response.url, response.request.resource_type)
+            if key:
+                try:
+                    self._record(key, response.status, response.headers.get('content-type', ''),
+                                 await response.body())
+                except Exception as e:
+                    logger.warning(f"Recorder: Could not read {response.url[:80]}: {e}")
+        context.on('response', on_response)
+
+    def _record(self, key, status, content_type, body):
+        if status in (301, 302, 304):
+            return  # Redirects and cache hits have no body worth replaying
+        self.bundle.add(key, status, content_type, body)
+        self.recorded += 1
+
+    def save(self):
+        self.bundle.save()
+        logger.info(f"📼 Recorded {self.recorded} responses to {self.bundle.path}")
+
+class FixtureReplayer:
+    """Serves a bundle to browser contexts instead of the network"""
+    def __init__(self, bundle_dir, latency=0.0, jitter=0.0, rate_limit_every=0, rate_limit_prob=0.0, seed=0):
+        self.bundle = FixtureBundle.load(bundle_dir)
+        self.latency = latency  # Seconds added to every replayed response
+        self.jitter = jitter  # Up to this many extra seconds (seeded, so runs repeat)
+        self.rate_limit_every = rate_limit_every  # Every Nth GraphQL call gets a 429 (0 = never)
+        self.rate_limit_prob = rate_limit_prob  # Or each one with this probability
+        self.random = random.Random(seed)
+        self.graphql_calls = 0
+        self.stats = {'served': 0, 'rate_limited': 0, 'missed': 0, 'aborted': 0, 'bytes': 0}
+        self.lock = threading.Lock()
+
+    def respond(self, url, resource_type='fetch'):
+        """(status, content_type, body, delay) for a request, or None to abort it"""
+        key = request_key(url, resource_type)
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            if key and key[0] == 'graphql':
+                self.graphql_calls += 1
+                if (self.rate_limit_every and self.graphql_calls % self.rate_limit_every == 0) or \
+                   (self.rate_limit_prob and self.random.random() < self.rate_limit_prob):
+                    self.stats['rate_limited'] += 1
+                    return 429, 'application/json', RATE_LIMITED_BODY, delay
+
+            entry = self.bundle.find(key) if key else None
+            if entry is None:
+                if _is_x_host(urlsplit(url).netloc):
+                    self.stats['missed'] += 1
+                    return 404, 'text/plain', b'', 0
+                self.stats['aborted'] += 1
+                return None
+            body = self.bundle.read_body(entry)
+            self.stats['served'] += 1
+            self.stats['bytes'] += len(body)
+        return entry['status'], entry['content_type'], body, delay
+
+    def attach(self, context):
+        """Sync Playwright context"""
+        def handle(route):
+            reply = self.respond(route.request.url, route.request.resource_type)
+            if reply is None:
+                route.abort()
+                return
+            status, content_type, body, delay = reply
+            if delay:
+                time.sleep(delay)
+            route.fulfill(status=status, content_type=content_type, body=body)
+        context.route('**/*', handle)
+
+    async def attach_async(self, context):
+        """Async Playwright context"""
+        async def handle(route):
+            reply = self.respond(route.request.url, route.request.resource_type)
+            if reply is None:
+                await route.abort()
+                return
+            status, content_type, body, delay = reply
+            if delay:
+                await asyncio.sleep(delay)
+            await route.fulfill(status=status, content_type=content_type, body=body)
+        await context.route('**/*', handle)
+
+    def save(self):
+        logger.info(f"📼 Replay stats: {self.stats}")
+
+# Timeline page of a synthetic bundle: fetches GraphQL pages like the web client
+# (first page on load, next cursor near the bottom) and renders <article>s
+SYNTHETIC_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Synthetic timeline</title>
+<style>article { min-height: 160px; border-bottom: 1px solid #ccc; }</style></head>
+<body><main id="timeline"></main>
+<script>
+(() => {
+    const path = location.pathname;
+    const params = new URLSearchParams(location.search);
+    const status = path.match(/\\/status\\/(\\d+)/);
+    let operation, variables;
+    if (status) {
+        operation = 'TweetDetail';
+        variables = {focalTweetId: status[1]};
+    } else if (path.startsWith('/search')) {
+        operation = 'SearchTimeline';
+        variables = {rawQuery: params.get('q') || '', count: 20};
+    } else {
+        operation = 'UserTweets';
+        variables = {userId: path.split('/')[1] || '', count: 20};
+    }
+    const timeline = document.getElementById('timeline');
+    let cursor = null, loading = false, done = false;
+
+    const findEntries = (obj) => {
+        if (!obj || typeof obj !== 'object') return [];
+        if (Array.isArray(obj.instructions)) return obj.instructions.flatMap(i => i.entries || []);
+        for (const value of Object.values(obj)) {
+            const found = findEntries(value);
+            if (found.length) return found;
+        }
+        return [];
+    };
+
+    const render = (tweet) => {
+        const user = tweet.core.user_results.result.core.screen_name;
+        const legacy = tweet.legacy;
+        const article = document.createElement('article');
+        const link = document.createElement('a');
+        link.href = `/${user}/status/${legacy.id_str}`;
+        link.textContent = '@' + user;
+        const text = document.createElement('div');
+        text.setAttribute('data-testid', 'tweetText');
+        text.setAttribute('lang', legacy.lang);
+        text.textContent = legacy.full_text;
+        article.append(link, text);
+        for (const [testId, count] of [['reply', legacy.reply_count], ['retweet', legacy.retweet_count],
+                                       ['like', legacy.favorite_count]]) {
+            const button = document.createElement('div');
+            button.setAttribute('data-testid', testId);
+            button.setAttribute('aria-label', `${count} ${testId}`);
+            article.append(button);
+        }
+        timeline.append(article);
+    };
+
+    const load = async () => {
+        if (loading || done) return;
+        loading = true;
+        const vars = Object.assign({}, variables);
+        if (cursor) vars.cursor = cursor;
+        try {
+            const response = await fetch(`/i/api/graphql/synthetic/${operation}?variables=` +
+                                         encodeURIComponent(JSON.stringify(vars)));
+            if (response.status === 429) {
+                await new Promise(resolve => setTimeout(resolve, 1000));  // Retried on the next scroll
+            } else if (!response.ok) {
+                done = true;
+            } else {
+                let next = null;
+                for (const entry of findEntries(await response.json())) {
+                    if (entry.entryId.startsWith('cursor-bottom')) next = entry.content.value;
+                    const item = entry.content && entry.content.itemContent;
+                    if (item && item.tweet_results) render(item.tweet_results.result);
+                }
+                done = !next || operation === 'TweetDetail';
+                cursor = next;
+            }
+        } catch (e) {
+            done = true;
+        }
+        loading = false;
+    };
+
+    window.addEventListener('scroll', () => {
+        if (innerHeight + scrollY >= document.body.scrollHeight - 2 * innerHeight) load();
+    });
+    load();
+})();
+</script></body></html>
+"""
+
+def _synthetic_tweet(index, rng):
+    tweet_id = str(1800000000000000000 + index)
+    user_number = index % 50
+    likes = rng.randint(1, 5000)
+    return {
+        '__typename': 'Tweet',
+        'rest_id': tweet_id,
+        'core': {'user_results': {'result': {
+            '__typename': 'User',
+            'is_blue_verified': user_number % 7 == 0,
+            'core': {'screen_name': f'synthetic_user_{user_number}', 'name': f'Synthetic User {user_number}'},
+            'legacy': {
+                'screen_name': f'synthetic_user_{user_number}', 'name': f'Synthetic User {user_number}',
+                'description': 'Generated account for offline replays', 'location': 'Localhost',
+                'followers_count': 100 * (user_number + 1), 'friends_count': 10 * (user_number + 1),
+            },
+        }}},
+        'views': {'count': str(likes * rng.randint(10, 50))},
+        'legacy': {
+            'id_str': tweet_id,
+            'full_text': f'Synthetic tweet {index} about #AI and replay testing with @synthetic_user_{(index + 1) % 50}',
+            'created_at': time.strftime('%a %b %d %H:%M:%S +0000 %Y', time.gmtime(1700000000 + index * 60)),
+            'lang': 'en',
+            'favorite_count': likes,
+            'retweet_count': rng.randint(0, likes // 10 + 1),
+            'reply_count': rng.randint(0, likes // 20 + 1),
+            'quote_count': rng.randint(0, 20),
+            'bookmark_count': rng.randint(0, 50),
+            'entities': {
+                'hashtags': [{'text': 'AI'}],
+                'user_mentions': [{'screen_name': f'synthetic_user_{(index + 1) % 50}'}],
+            },
+        },
+    }
+
+def _tweet_entry(tweet):
+    return {'entryId': f"tweet-{tweet['rest_id']}",
+            'content': {'itemContent': {'tweet_results': {'result': tweet}}}}
+
+def _timeline_body(operation, entries):
+    instructions = [{'type': 'TimelineAddEntries', 'entries': entries}]
+    if operation == 'SearchTimeline':
+        data = {'search_by_raw_query': {'search_timeline': {'timeline': {'instructions': instructions}}}}
+    elif operation == 'UserTweets':
+        data = {'user': {'result': {'timeline_v2': {'timeline': {'instructions': instructions}}}}}
+    else:
+        data = {'threaded_conversation_with_injections_v2': {'instructions': instructions}}
+    return json.dumps({'data': data}).encode('utf-8')
+
+def build_synthetic_bundle(path, num_tweets=500, page_size=20, seed=0, tweet_details=True):
+    """Write a bundle of num_tweets generated tweets; returns their ids in timeline order
+
+    SearchTimeline and UserTweets answer any query/user with the same pages
+    (page_size tweets each, linked by cursor-bottom entries). With tweet_details,
+    every tweet also gets a TweetDetail response for URL scraping.
+    """
+    rng = random.Random(seed)
+    bundle = FixtureBundle(path)
+    tweets = [_synthetic_tweet(i, rng) for i in range(num_tweets)]
+
+    bundle.add(('document', '', '/search', ''), 200, 'text/html; charset=utf-8', SYNTHETIC_PAGE.encode('utf-8'))
+    for operation in ('SearchTimeline', 'UserTweets'):
+        for page_number, start in enumerate(range(0, num_tweets, page_size)):
+            entries = [_tweet_entry(t) for t in tweets[start:start + page_size]]
+            if start + page_size < num_tweets:
+                entries.append({'entryId': f'cursor-bottom-{page_number + 1}',
+                                'content': {'value': f'synthetic-cursor-{page_number + 1}'}})
+            cursor = f'synthetic-cursor-{page_number}' if page_number else ''
+            bundle.add(('graphql', operation, '*', cursor), 200, 'application/json',
+                       _timeline_body(operation, entries))
+    if tweet_details:
+        for tweet in tweets:
+            bundle.add(('graphql', 'TweetDetail', tweet['rest_id'], ''), 200, 'application/json',
+                       _timeline_body('TweetDetail', [_tweet_entry(tweet)]))
+    bundle.save()
+    return [t['rest_id'] for t in tweets]
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline replay fixture bundles')
+    commands = parser.add_subparsers(dest='command', required=True)
+    synth = commands.add_parser('synth', help='write a synthetic bundle')
+    synth.add_argument('path')
+    synth.add_argument('--tweets', type=int, default=500)
+    synth.add_argument('--page-size', type=int, default=20)
+    synth.add_argument('--seed', type=int, default=0)
+    synth.add_argument('--no-details', action='store_true', help='skip per-tweet TweetDetail responses')
+    args = parser.parse_args()
+
+    if args.command == 'synth':
+        ids = build_synthetic_bundle(args.path, args.tweets, args.page_size, args.seed, not args.no_details)
+        print(f"📼 Synthetic bundle with {len(ids)} tweets written to {args.path}")
+
+if __name__ == "__main__":
+    main()
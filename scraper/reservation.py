@@ -0,0 +1,50 @@
+"""
+Exact-count reservations for tweet sinks.
+
+Workers used to read get_tweet_count() and then call add_tweet(), so two tabs
+could both see 99/100 and both write. A sink with a limit hands out slots
+atomically: try_reserve(n) grants at most what is left after everything
+already saved or reserved, commit_tweet() turns one slot into a write (or
+gives it back for a duplicate) and release() returns slots that were not used.
+"""
+from scraper.tracing import span
+
+class ReservingSink:
+    """Mixin for sinks with write_lock, tweet_count and _append_locked(tweet_data)"""
+    limit = None  # Most tweets this sink accepts (None = no limit)
+    reserved = 0  # Slots granted to workers that have not written yet
+    
+    def try_reserve(self, n=1) -> int:
+        """Claim up to n slots; returns how many were granted (0 once the limit is met)"""
+        with self.write_lock:
+            if self.limit is None:
+                granted = n
+            else:
+                granted = max(0, min(n, self.limit - self.tweet_count - self.reserved))
+            self.reserved += granted
+            return granted
+    
+    def release(self, n=1):
+        """Give back reserved slots that will not be written"""
+        with self.write_lock:
+            self.reserved = max(0, self.reserved - n)
+    
+    def commit_tweet(self, tweet_data) -> bool:
+        """Write a tweet into a reserved slot; a duplicate gives the slot back"""
+        with span('sink_commit', 'sink'), self.write_lock:
+            self.reserved = max(0, self.reserved - 1)
+            return self._append_locked(tweet_data)
+    
+    def append_tweet(self, tweet_data) -> bool:
+        """Write a tweet without a reservation (refused once the limit is met)"""
+        with span('sink_commit', 'sink'), self.write_lock:
+            if self.limit is not None and self.tweet_count + self.reserved >= self.limit:
+                return False
+            return self._append_locked(tweet_data)
+    
+    def add_tweet(self, tweet_data) -> bool:
+        """Alias for append_tweet for compatibility"""
+        return self.append_tweet(tweet_data)
+    
+    def is_full(self) -> bool:
+        return self.limit is not None and self.tweet_count >= self.limit
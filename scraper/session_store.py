@@ -0,0 +1,91 @@
+"""
+Persisted Playwright storage_state per identity.
+
+A fresh context starts from bare cookies and has to sit through X's cold-session
+warmup. After an identity's first successful session its context state
+(refreshed cookies + localStorage) is saved here and restored by later jobs.
+"""
+import os
+import json
+import time
+from typing import Optional
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+class SessionStore:
+    def __init__(self, directory='sessions', max_age=6 * 3600):
+        self.directory = directory
+        self.max_age = max_age  # Seconds before a saved state is considered stale
+    
+    def path_for(self, identity_name) -> str:
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in identity_name)
+        return os.path.join(self.directory, f'{safe_name}.json')
+    
+    def load(self, identity_name) -> Optional[str]:
+        """Path to a fresh saved state for this identity, or None"""
+        path = self.path_for(identity_name)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return None
+        
+        if age > self.max_age or self._has_expired_auth(path):
+            logger.info(f"Session state for {identity_name} is stale, discarding")
+            self.invalidate(identity_name)
+            return None
+        return path
+    
+    def is_fresh(self, identity_name) -> bool:
+        """True if a state was saved recently enough that re-saving is pointless"""
+        try:
+            age = time.time() - os.path.getmtime(self.path_for(identity_name))
+        except OSError:
+            return False
+        return age < self.max_age / 2
+    
+    def _has_expired_auth(self, path) -> bool:
+        """A state whose auth cookies expired would restore a logged-out session"""
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return True
+        now = time.time()
+        for cookie in state.get('cookies', []):
+            if cookie.get('name') in ('auth_token', 'ct0'):
+                expires = cookie.get('expires', -1)
+                if expires and 0 < expires < now:
+                    return True
+        return False
+    
+    def save(self, context, identity_name):
+        """Save the context's cookies and localStorage for later jobs"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(identity_name)
+        tmp_path = f'{path}.tmp'
+        try:
+            context.storage_state(path=tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"Saved session state for {identity_name}")
+        except Exception as e:
+            logger.warning(f"Could not save session state for {identity_name}: {e}")
+    
+    async def save_async(self, context, identity_name):
+        """save() for contexts from playwright.async_api"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(identity_name)
+        tmp_path = f'{path}.tmp'
+        try:
+            await context.storage_state(path=tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"Saved session state for {identity_name}")
+        except Exception as e:
+            logger.warning(f"Could not save session state for {identity_name}: {e}")
+    
+    def invalidate(self, identity_name):
+        """Drop a saved state, e.g. after the session got blocked"""
+        try:
+            os.remove(self.path_for(identity_name))
+        except OSError:
+            pass
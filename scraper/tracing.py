@@ -0,0 +1,151 @@
+"""
+Per-stage tracing spans, exported as Chrome trace-event JSON.
+
+Spans mark where a job spends its time: browser launch, navigation, waiting
+for timeline responses, JSON parsing, DOM extraction, dedupe and CSV I/O.
+Open the saved file in chrome://tracing, https://ui.perfetto.dev or
+speedscope to see every tab on its own lane:
+
+    tracing.TRACER.enable()
+    with tracing.span('navigation', lane=f'Tab {tab_id}'):
+        ...
+    tracing.TRACER.save('scraped_data/trace_<job>.json')
+
+Disabled (the default), span() returns one shared no-op context manager,
+so instrumented code pays a function call and an attribute check.
+"""
+import os
+import json
+import time
+import threading
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+class _Span:
+    def __init__(self, tracer, name, category, lane, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.lane = lane
+        self.args = args
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._add_complete(self.name, self.category, self.lane, self.start, end, self.args)
+        return False
+
+class Tracer:
+    def __init__(self, max_events=1_000_000):
+        self.enabled = False
+        self.max_events = max_events  # Later events are dropped (and counted) to bound memory
+        self.events = []
+        self.recorded = 0  # Span and instant events (lane metadata does not count)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.lanes = {}  # Lane name -> tid
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+    
+    def enable(self):
+        self.clear()
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def clear(self):
+        with self.lock:
+            self.events = []
+            self.recorded = 0
+            self.dropped = 0
+            self.lanes = {}
+            self.origin = time.perf_counter()
+    
+    def span(self, name, category='scrape', lane=None, **args):
+        """Context manager timing one stage; lane defaults to the current thread's name"""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, category, lane, args)
+    
+    def instant(self, name, category='scrape', lane=None, **args):
+        """A zero-length marker (e.g. 'target reached')"""
+        if not self.enabled:
+            return
+        with self.lock:
+            tid = self._tid(lane)
+            self._append({'name': name, 'cat': category, 'ph': 'i', 's': 't', 'pid': self.pid, 'tid': tid,
+                          'ts': self._us(time.perf_counter()), 'args': args})
+    
+    def _us(self, timestamp):
+        return round((timestamp - self.origin) * 1e6, 1)
+    
+    def _tid(self, lane):
+        """Numeric tid for a lane; caller holds the lock"""
+        lane = lane or threading.current_thread().name
+        tid = self.lanes.get(lane)
+        if tid is None:
+            tid = self.lanes[lane] = len(self.lanes) + 1
+            self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                                'args': {'name': lane}})
+        return tid
+    
+    def _append(self, event):
+        if self.recorded >= self.max_events:
+            self.dropped += 1
+        else:
+            self.recorded += 1
+            self.events.append(event)
+    
+    def _add_complete(self, name, category, lane, start, end, args):
+        with self.lock:
+            tid = self._tid(lane)
+            self._append({'name': name, 'cat': category, 'ph': 'X', 'pid': self.pid, 'tid': tid,
+                          'ts': self._us(start), 'dur': round((end - start) * 1e6, 1), 'args': args})
+    
+    def summary(self):
+        """Total seconds and count per span name, slowest first"""
+        totals = {}
+        with self.lock:
+            for event in self.events:
+                if event['ph'] == 'X':
+                    total = totals.setdefault(event['name'], [0.0, 0])
+                    total[0] += event['dur'] / 1e6
+                    total[1] += 1
+        return sorted(((name, seconds, count) for name, (seconds, count) in totals.items()),
+                      key=lambda item: item[1], reverse=True)
+    
+    def save(self, path):
+        """Write the Chrome trace-event JSON; returns the path"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                         'args': {'name': 'twitter-scraper'}}]
+            trace = {'traceEvents': metadata + list(self.events), 'displayTimeUnit': 'ms',
+                     'otherData': {'dropped_events': self.dropped}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return path
+
+TRACER = Tracer()
+
+def span(name, category='scrape', lane=None, **args):
+    """TRACER.span shortcut for instrumented code"""
+    if not TRACER.enabled:
+        return _NOOP
+    return _Span(TRACER, name, category, lane, args)
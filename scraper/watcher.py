@@ -0,0 +1,217 @@
+"""
+Continuous monitoring mode with since_id incremental polling.
+
+Instead of re-scrolling every search from the top every few minutes, the
+watcher remembers the newest tweet id per query and asks X's live timeline
+only for newer tweets (`since_id:` search operator), stopping early on a known
+id. One browser and context stay warm between polls, with one open page per
+watched query, so steady-state cost follows the number of new tweets rather
+than the depth of the timeline.
+"""
+import os
+import json
+import time
+import heapq
+import threading
+from urllib.parse import quote
+from playwright.sync_api import sync_playwright
+from scraper.fast_csv_handler import FastCSVHandler
+from scraper.log import get_logger
+
+logger = get_logger(__name__)
+
+class WatchedQuery:
+    def __init__(self, label, query, interval=300, newest_id=None):
+        self.label = label  # e.g. 'AI', '#crypto', '@nasa'
+        self.query = query  # Raw search query, e.g. 'from:nasa'
+        self.interval = interval  # Seconds between polls
+        self.newest_id = newest_id  # Newest tweet id seen so far (as str)
+        self.page = None  # Warm page reused across polls
+        self.polls = 0
+        self.new_tweets = 0
+    
+    def poll_url(self):
+        """Live timeline restricted to tweets newer than the newest one seen"""
+        query = self.query
+        if self.newest_id:
+            query += f' since_id:{self.newest_id}'
+        return f'https://x.com/search?q={quote(query)}&src=typed_query&f=live'
+
+class QueryWatcher:
+    def __init__(self, scraper, job_id=None, state_file='scraped_data/watch_state.json', max_pages_per_poll=10):
+        self.scraper = scraper  # TwitterScraper providing identities, sessions and tweet parsing
+        self.job_id = job_id or f"watch_{time.strftime('%Y%m%d_%H%M%S')}"
+        self.state_file = state_file
+        self.max_pages_per_poll = max_pages_per_poll  # Cap on scrolls when a burst of tweets arrives
+        self.queries = {}
+        self.schedule = []  # Heap of (next_due, label)
+        self.stop_event = threading.Event()
+        self.saved_state = self._load_state()
+    
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_state(self):
+        """Persist the newest id per query so a restarted watcher only sees new tweets"""
+        state = dict(self.saved_state)
+        for label, watched in self.queries.items():
+            if watched.newest_id:
+                state[label] = watched.newest_id
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_path = f'{self.state_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+        self.saved_state = state
+    
+    def add_query(self, term, interval=300):
+        """Watch a keyword, '#hashtag' or '@username' every `interval` seconds"""
+        term = term.strip()
+        if term.startswith('@'):
+            query = f'from:{term[1:]}'
+        else:
+            query = term
+        watched = WatchedQuery(term, query, interval, self.saved_state.get(term))
+        self.queries[term] = watched
+        heapq.heappush(self.schedule, (time.time(), term))
+        return watched
+    
+    def stop(self):
+        self.stop_event.set()
+    
+    def run(self, duration=None):
+        """Poll watched queries until stop() is called, Ctrl+C, or `duration` seconds pass"""
+        if not self.queries:
+            logger.info("Nothing to watch")
+            return None
+        
+        scraper = self.scraper
+        scraper.csv_handler = FastCSVHandler(self.job_id)
+        scraper.job_id = self.job_id
+        scraper.target_tweets = float('inf')  # Watching has no target
+        scraper.target_reached = False
+        deadline = time.time() + duration if duration else None
+        
+        logger.info(f"👀 WATCHING {len(self.queries)} queries (job {self.job_id})")
+        identity = scraper.identity_pool.lease()
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(
+                    headless=True,
+                    args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-blink-features=AutomationControlled'],
+                    proxy=identity.get_proxy(scraper.proxy_manager)
+                )
+                saved_state = scraper.session_store.load(identity.name)
+                context = browser.new_context(
+                    user_agent=identity.user_agent,
+                    viewport={'width': 1366, 'height': 768},
+                    locale='en-US',
+                    storage_state=saved_state,
+                    service_workers='block'
+                )
+                if identity.cookies and not saved_state:
+                    context.add_cookies(identity.cookies)
+                context.route('**/*', lambda route: route.abort()
+                              if route.request.resource_type in ('image', 'media', 'font')
+                              else route.continue_())
+                if scraper.replay:
+                    scraper.replay.attach(context)
+                
+                while not self.stop_event.is_set() and self.schedule:
+                    next_due, label = self.schedule[0]
+                    wait = next_due - time.time()
+                    if deadline and time.time() + max(wait, 0) > deadline:
+                        break
+                    if wait > 0 and self.stop_event.wait(wait):
+                        break
+                    
+                    heapq.heappop(self.schedule)
+                    watched = self.queries[label]
+                    try:
+                        if watched.page is None:
+                            watched.page = context.new_page()
+                        self._poll(watched, identity)
+                    except Exception as e:
+                        logger.warning(f"Watch {label}: Poll failed: {e}")
+                    heapq.heappush(self.schedule, (time.time() + watched.interval, label))
+                
+                browser.close()
+        except KeyboardInterrupt:
+            logger.info("Watcher stopped")
+        finally:
+            scraper.identity_pool.release(identity)
+            scraper.csv_handler.close()
+            self._save_state()
+        
+        logger.info(f"Watch finished: {scraper.csv_handler.get_tweet_count()} new tweets saved")
+        return scraper.csv_handler.get_filename()
+    
+    def _poll(self, watched, identity):
+        """Fetch only tweets newer than watched.newest_id"""
+        page = watched.page
+        known_id = int(watched.newest_id) if watched.newest_id else 0
+        newest = known_id
+        saved = 0
+        is_timeline = lambda response: 'SearchTimeline' in response.url
+        
+        with page.expect_response(is_timeline, timeout=20000) as response_info:
+            page.goto(watched.poll_url(), timeout=30000, wait_until='domcontentloaded')
+        
+        for page_number in range(self.max_pages_per_poll):
+            response = response_info.value
+            if identity.account:
+                identity.account.record_request()
+            if response.status == 429:
+                if identity.account:
+                    self.scraper.cookie_pool.mark_rate_limited(identity.account)
+                raise RuntimeError('rate limited (429)')
+            
+            page_ids, page_saved, reached_known = self._save_new_tweets(response.json(), known_id)
+            saved += page_saved
+            if page_ids:
+                newest = max(newest, max(page_ids))
+            
+            # Stop as soon as a known tweet shows up or the page had nothing new
+            if reached_known or not page_ids or not watched.newest_id:
+                break
+            try:
+                with page.expect_response(is_timeline, timeout=10000) as response_info:
+                    page.evaluate('window.scrollBy(0, window.innerHeight * 10)')
+            except Exception:
+                break  # Timeline has no more pages
+        
+        watched.polls += 1
+        watched.new_tweets += saved
+        if newest > known_id:
+            watched.newest_id = str(newest)
+            self._save_state()
+        logger.info(f"Watch {watched.label}: +{saved} new tweets (poll {watched.polls}, total {watched.new_tweets})")
+    
+    def _save_new_tweets(self, data, known_id):
+        """Save tweets newer than known_id; returns (ids on page, saved count, hit a known id)"""
+        scraper = self.scraper
+        page_ids = []
+        saved = 0
+        reached_known = False
+        
+        instructions = scraper._find_in_dict(data, 'instructions') or []
+        for instruction in instructions:
+            if not isinstance(instruction, dict):
+                continue
+            for entry in instruction.get('entries', []):
+                result = entry.get('content', {}).get('itemContent', {}).get('tweet_results', {}).get('result')
+                tweet = scraper._parse_api_tweet(result, entry) if result else None
+                if not tweet or not tweet['tweet_id'].isdigit():
+                    continue
+                tweet_id = int(tweet['tweet_id'])
+                page_ids.append(tweet_id)
+                if tweet_id <= known_id:
+                    reached_known = True
+                    continue
+                if scraper.csv_handler.add_tweet(tweet):
+                    saved += 1
+        return page_ids, saved, reached_known
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the benchmark helpers: percentiles, result comparison, failed cases and the micro-benchmark fixture (no browser needed)
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.e2e import percentile, measure, run_case, compare, format_result
+from benchmarks import micro
+from testlib import scratch_dir
+
+def _run(engine, tweets_per_sec, cpu_seconds, target=100):
+    return {'engine': engine, 'target': target, 'tweets': target, 'tweets_per_sec': tweets_per_sec,
+            'cpu_seconds': cpu_seconds, 'browser_cpu_seconds': 1.0, 'scroll_p50': 0.5, 'scroll_p95': 1.5,
+            'peak_rss_mb': 80.0, 'bytes': 2_000_000, 'error': None}
+
+def test_percentile():
+    values = [0.5, 0.1, 0.4, 0.2, 0.3, 0.9, 0.6, 0.8, 0.7, 1.0]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 95) == 1.0
+    assert percentile(values, 0) == 0.1
+    assert percentile([], 50) is None
+    print("✅ Percentile test passed")
+
+def test_compare_reports():
+    old = {'commit': 'aaa1111', 'runs': [_run('simple', 10.0, 4.0), _run('api', 20.0, 2.0)]}
+    new = {'commit': 'bbb2222', 'runs': [_run('simple', 15.0, 3.0), _run('api', 20.0, 2.0),
+                                         _run('turbo', 50.0, 5.0)]}
+    lines = compare(old, new)
+    assert lines[0] == 'aaa1111 -> bbb2222'
+    assert len(lines) == 3  # turbo has nothing to compare against
+    assert '(+50%)' in lines[1] and '(+25%)' in lines[1]
+    assert '(+0%)' in lines[2]
+    assert 'tweets' in format_result(new['runs'][0])
+    print("✅ Compare test passed")
+
+def test_failed_case_is_recorded():
+    """A broken case becomes an error result instead of aborting the matrix"""
+    with tempfile.TemporaryDirectory() as bundle:
+        result = measure('nope', 10, bundle)
+        assert result['tweets'] == 0 and result['error'].startswith('ValueError')
+        assert format_result(result).endswith(result['error'])
+
+        result = run_case('nope', 10, bundle, timeout=120)
+        assert result['engine'] == 'nope' and 'Unknown engine' in result['error']
+    print("✅ Failed case test passed")
+
+def test_micro_fixture_articles():
+    """The HTML fixture parses like EXTRACT_TWEETS_JS output and the DOM fallback filters it"""
+    articles = micro.fixture_articles()
+    assert len(articles) == 40
+    assert all(a['href'].count('/status/') == 1 and not a['href'].endswith('/analytics') for a in articles)
+    assert articles[0]['likes'] != '0' and articles[0]['text'].endswith('@fixture_user_1')
+    
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        tweets = [scraper._build_dom_tweet(a) for a in articles]
+        assert tweets[5] is None and tweets[11] is None  # Promoted and UI chrome
+        assert sum(t is not None for t in tweets) == 38
+    print("✅ Micro fixture test passed")
+
+def test_micro_cases_report():
+    with scratch_dir():
+        result = micro.measure('fast_csv_append', micro.fast_csv_append, 100, repeat=1)
+        assert result['error'] is None and result['ops_per_sec'] > 0 and result['peak_kb'] > 0
+        result = micro.measure('get_proxy', lambda ops: micro.get_proxy(ops, num_proxies=50), 10, repeat=1)
+        assert result['error'] is None and result['ops'] == 10
+        print("✅ Micro case test passed")
+
+if __name__ == "__main__":
+    test_percentile()
+    test_compare_reports()
+    test_failed_case_is_recorded()
+    test_micro_fixture_articles()
+    test_micro_cases_report()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+🧪 Test resumable jobs: checkpointed cursors, dedupe set and sink offset (no browser needed)
+"""
+
+import os
+import sys
+import csv
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.playwright_scraper import TwitterScraper
+from scraper.checkpoint import JobCheckpoint
+from scraper.engine import ScrapeEngine
+from testlib import scratch_dir
+
+def _timeline_page(tweet_ids, cursor):
+    entries = [{'entryId': f'tweet-{t}', 'content': {'itemContent': {'tweet_results': {'result': {
+        'rest_id': t, 'legacy': {'id_str': t, 'full_text': f'tweet {t}', 'favorite_count': 1,
+                                 'retweet_count': 0, 'reply_count': 0, 'entities': {}}}}}}}
+               for t in tweet_ids]
+    entries.append({'entryId': f'cursor-bottom-{cursor}', 'content': {'value': cursor}})
+    return {'data': {'search_by_raw_query': {'search_timeline': {'timeline': {
+        'instructions': [{'type': 'TimelineAddEntries', 'entries': entries}]}}}}}
+
+class CrashingEngine(ScrapeEngine):
+    """Scrapes two timeline pages, checkpoints, then 'crashes' mid-write"""
+    async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+        scraper = self.scraper
+        scraper._extract_tweets_from_api(_timeline_page(['1', '2', '3'], 'c1'), tab_id)
+        scraper._extract_tweets_from_api(_timeline_page(['4', '5'], 'c2'), tab_id)
+        scraper.checkpoint.save(scraper._checkpoint_state())
+        # Rows written after the last checkpoint must not survive the crash
+        scraper._extract_tweets_from_api(_timeline_page(['6'], 'c3'), tab_id)
+        scraper.csv_handler.force_flush()
+        raise KeyboardInterrupt
+
+class ResumingEngine(ScrapeEngine):
+    started_from = []
+    
+    async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+        self.started_from.append(self.scraper.resume_cursors.get(self.scraper._cursor_key(tab_id, shard)))
+        # The timeline continues after c2; '5' is a repeat the dedupe set must drop
+        self.scraper._extract_tweets_from_api(_timeline_page(['5', '6', '7', '8', '9', '10'], 'c4'), tab_id)
+
+class InterruptedEngine(ScrapeEngine):
+    """Scrapes one timeline page, then the user presses Ctrl+C"""
+    async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+        self.scraper._extract_tweets_from_api(_timeline_page(['1', '2'], 'c1'), tab_id)
+        self.scraper.cancel_token.cancel('interrupted')
+
+class CrashingScraper(TwitterScraper):
+    def _create_engine(self, config):
+        return CrashingEngine(self, config)
+
+class InterruptedScraper(TwitterScraper):
+    def _create_engine(self, config):
+        return InterruptedEngine(self, config)
+
+class ResumingScraper(TwitterScraper):
+    def _create_engine(self, config):
+        return ResumingEngine(self, config)
+
+def test_checkpoint_resume():
+    with scratch_dir() as scratch:
+        crashing = scratch.track(CrashingScraper(num_tabs=1))
+        crashing.checkpoint_interval = 3600
+        # Killed processes write no final checkpoint (the saver thread is still stopped)
+        crashing._finish_checkpointing = lambda completed=False: crashing.checkpoint.stop()
+        try:
+            crashing.scrape(keyword='AI', num_tweets=8, job_id='resume_test')
+        except KeyboardInterrupt:
+            pass
+        state = JobCheckpoint.load('resume_test')
+        assert state['cursors'] == {'tab 0': 'c2'} and state['tweet_count'] == 5
+        
+        resuming = scratch.track(ResumingScraper(num_tabs=1))
+        filename = resuming.resume('resume_test')
+        assert ResumingEngine.started_from == ['c2']
+        
+        with open(os.path.join('scraped_data', filename), encoding='utf-8-sig') as f:
+            ids = [row['tweet_id'] for row in csv.DictReader(f)]
+        assert ids == ['1', '2', '3', '4', '5', '6', '7', '8'], ids
+        assert JobCheckpoint.load('resume_test')['completed']
+        
+        # Ctrl+C still writes a final checkpoint, but the job stays resumable
+        scratch.track(InterruptedScraper(num_tabs=1)).scrape(keyword='AI', num_tweets=8, job_id='interrupted_test')
+        state = JobCheckpoint.load('interrupted_test')
+        assert state['cursors'] == {'tab 0': 'c1'} and not state['completed']
+        print("✅ Checkpoint resume test passed")
+
+def test_cursor_per_tab():
+    """Tabs of one query keep their own cursors, snapshotted under the sink lock with its offset"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=2, cookie_source=[], proxy_preflight=False)
+        scraper._start_job('tabs_test', 100)
+        scraper._checkpoint_params = {}
+        scraper._extract_tweets_from_api(_timeline_page(['1', '2'], 'a1'), 0)
+        scraper._extract_tweets_from_api(_timeline_page(['3'], 'b1'), 1)
+        state = scraper._checkpoint_state()
+        assert state['cursors'] == {'tab 0': 'a1', 'tab 1': 'b1'} and state['tweet_count'] == 3
+        
+        sink = scraper.csv_handler
+        assert sink.checkpoint_state(lambda: {'locked': sink.write_lock.locked()})['locked']
+        print("✅ Per-tab cursor test passed")
+
+if __name__ == "__main__":
+    test_checkpoint_resume()
+    test_cursor_per_tab()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the multi-account cookie pool: validation, caching and round-robin leasing
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.cookie_loader import CookiePool, load_cookies
+
+def _write_cookie_file(path, names):
+    with open(path, 'w') as f:
+        f.write("# Netscape HTTP Cookie File\n")
+        for name in names:
+            f.write(f".x.com\tTRUE\t/\tTRUE\t1999999999\t{name}\tvalue_{name}\n")
+
+def test_cookie_pool():
+    """Directory of cookie files becomes a pool of valid accounts"""
+    with tempfile.TemporaryDirectory() as cookie_dir:
+        _write_cookie_file(os.path.join(cookie_dir, 'alice.txt'), ['auth_token', 'ct0'])
+        _write_cookie_file(os.path.join(cookie_dir, 'bob.txt'), ['auth_token', 'ct0', 'guest_id'])
+        _write_cookie_file(os.path.join(cookie_dir, 'broken.txt'), ['guest_id'])  # No auth_token/ct0
+        
+        pool = CookiePool(cookie_dir, requests_per_window=2, window_seconds=60)
+        assert [a.name for a in pool.accounts] == ['alice', 'bob']
+        
+        # Parsed files are cached, but callers get their own copies
+        first = load_cookies(os.path.join(cookie_dir, 'alice.txt'))
+        first[0]['value'] = 'changed'
+        assert load_cookies(os.path.join(cookie_dir, 'alice.txt'))[0]['value'] == 'value_auth_token'
+        
+        # Round-robin across accounts
+        assert [pool.lease(timeout=0).name for _ in range(4)] == ['alice', 'bob', 'alice', 'bob']
+        
+        # Budgets and cooldowns take accounts out of rotation
+        alice, bob = pool.accounts
+        alice.record_request(2)
+        assert pool.lease(timeout=0) is bob
+        pool.mark_rate_limited(bob)
+        assert pool.lease(timeout=0) is None
+        print("✅ Cookie pool test passed")
+
+if __name__ == "__main__":
+    test_cookie_pool()
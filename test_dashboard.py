@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the live terminal dashboard and the per-tab status board (no browser needed)
+"""
+
+import io
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.dashboard import Dashboard, TabBoard, BOARD
+from scraper.log import get_logger
+from testlib import scratch_dir
+
+class FakeSink:
+    def __init__(self):
+        self.count = 0
+
+    def get_tweet_count(self):
+        return self.count
+
+class FakeScraper:
+    def __init__(self):
+        self.csv_handler = FakeSink()
+        self.target_tweets = 1000
+        self.job_id = 'dash_test'
+
+def test_render():
+    board = TabBoard()
+    scraper = FakeScraper()
+    dashboard = Dashboard(scraper, board=board, stall_after=30)
+    board.set_state(0, 'navigating', proxy='10.0.0.1')
+    board.set_state(1, 'scrolling', proxy='direct', query='#AI')
+    start = time.time()
+    for tab in board.tabs.values():
+        tab.started = start
+    dashboard.render(now=start)
+
+    for _ in range(100):
+        board.tweet(0)
+    board.tab(0).last_tweet = start + 55
+    board.response(0, 0.42)
+    board.rate_limited(1)
+    board.rate_limited(1)
+    scraper.csv_handler.count = 100
+    frame = dashboard.render(now=start + 60).splitlines()
+
+    assert frame[0] == '📺 Job dash_test  100/1000 tweets  100/min  ETA 9m00s  2 tabs, 1 stalled'
+    tab0, tab1 = frame[2], frame[3]
+    assert tab0.split() == ['0', 'navigating', '100', '100', '0.42s', '0', '5s', '10.0.0.1']
+    assert tab1.split()[:6] == ['1', 'rate', 'limited', '0', '0', '-'] and '2' in tab1.split()
+    assert tab1.endswith('direct [#AI]  ⚠️ stalled')
+
+    board.response(1, 0.1)
+    board.finish(0)
+    board.finish(1)
+    frame = dashboard.render(now=start + 120).splitlines()
+    assert frame[2].split()[1] == 'done' and frame[3].split()[1] == 'done'
+    assert '0 stalled' in frame[0]  # Closed tabs are never stalled
+    print("✅ Dashboard render test passed")
+
+def test_fixed_rate_and_warnings():
+    """Frames come at the dashboard's own pace, however many events arrive"""
+    board = TabBoard()
+    stream = io.StringIO()
+    dashboard = Dashboard(FakeScraper(), board=board, interval=0.05, stream=stream).start()
+    for _ in range(20000):
+        board.tweet(3)
+    get_logger('scraper.test_dashboard').warning("Tab 3: Rate limited")
+    time.sleep(0.3)
+    dashboard.stop()
+    frames = stream.getvalue().count('📺 Job')
+    assert 3 <= frames <= 9
+    assert '⚠️  ' in stream.getvalue() and 'Tab 3: Rate limited' in stream.getvalue()
+    assert '\x1b[' not in stream.getvalue()  # Not a terminal: plain frames
+    print("✅ Dashboard refresh test passed")
+
+def test_scraper_feeds_board():
+    with scratch_dir() as scratch:
+        try:
+            scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+            BOARD.set_state(9, 'scrolling')
+            scraper._start_job('dash_job', 100)
+            assert BOARD.tabs == {}  # Fresh board per job
+            for tweet_id in ('1', '2', '2'):
+                scraper._process_api_tweet({'rest_id': tweet_id, 'legacy': {
+                    'id_str': tweet_id, 'full_text': 'hi', 'favorite_count': 1,
+                    'retweet_count': 0, 'reply_count': 0, 'entities': {}}}, 2)
+            assert BOARD.tab(2).tweets == 2  # Duplicates are not new tweets
+            scraper._finish_job()
+        finally:
+            BOARD.reset()
+    print("✅ Scraper board test passed")
+
+if __name__ == "__main__":
+    test_render()
+    test_fixed_rate_and_warnings()
+    test_scraper_feeds_board()
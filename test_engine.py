@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the async scrape engine: pages as coroutines, DOM fallback and presets (no browser needed)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper import metrics
+from scraper.cookie_loader import Account
+from scraper.engine import ScrapeEngine, EngineConfig, EXTRACT_TWEETS_JS, PRUNE_CELLS_JS
+from testlib import scratch_dir
+
+def _article(tweet_id, text='a real tweet with enough words'):
+    return {'text': text, 'href': f'/someone/status/{tweet_id}', 'likes': '2', 'retweets': '0', 'replies': '1'}
+
+class FakePage:
+    """Serves one batch of articles per scroll"""
+    def __init__(self, views):
+        self.views = list(views)
+        self.scrolls = 0
+    
+    async def evaluate(self, script, arg=None):
+        if script == EXTRACT_TWEETS_JS:
+            articles = self.views.pop(0) if self.views else []
+            return {'articles': articles, 'noResults': False}
+        self.scrolls += 1
+
+class FakeContext:
+    async def storage_state(self, path=None):
+        with open(path, 'w') as f:
+            f.write('{"cookies": [], "origins": []}')
+
+def test_dom_fallback_scroll_loop():
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1)
+        scraper._start_job('engine_test', 5)
+        identity = scraper.identity_pool.lease()
+        config = EngineConfig('test', scroll_pause=(0, 0), max_idle_scrolls=2)
+        engine = ScrapeEngine(scraper, config)
+        page = FakePage([
+            [_article(1), _article(2), {'text': 'Home', 'href': ''}],
+            [_article(2), _article(3), _article(4, 'RT @x: a retweet is not saved')],
+            [_article(5), _article(6), _article(7)],
+        ])
+        saved = asyncio.run(engine._scroll_timeline(page, FakeContext(), identity, 5, 0, None))
+        assert saved == 5 and scraper.target_reached
+        assert scraper.csv_handler.get_tweet_count() == 5
+        assert os.path.exists(scraper.session_store.path_for(identity.name))
+        print("✅ DOM fallback stops exactly at the target")
+
+def test_waits_for_rate_limit_budget():
+    """A spent account pauses its tab until the window refills; the job is not capped at one window"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1)
+        scraper._start_job('budget_test', 5)
+        identity = scraper.identity_pool.lease()
+        identity.account = Account('alice', [], requests_per_window=1, window_seconds=0.3)
+        identity.account.record_request()
+        engine = ScrapeEngine(scraper, EngineConfig('test', scroll_pause=(0, 0), max_idle_scrolls=2))
+        page = FakePage([[_article(1), _article(2), _article(3)], [_article(4), _article(5)]])
+        start = time.time()
+        saved = asyncio.run(engine._scroll_timeline(page, FakeContext(), identity, 5, 0, None))
+        assert saved == 5 and scraper.target_reached
+        assert time.time() - start >= 0.25
+        print("✅ Out-of-budget tabs wait for the window instead of stopping")
+
+def test_pages_share_one_event_loop():
+    class CountingEngine(ScrapeEngine):
+        active = 0
+        peak = 0
+        
+        async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+            CountingEngine.active += 1
+            CountingEngine.peak = max(CountingEngine.peak, CountingEngine.active)
+            await asyncio.sleep(0.05)
+            CountingEngine.active -= 1
+    
+    with scratch_dir() as scratch:
+        engine = CountingEngine(scratch.scraper(num_tabs=6), EngineConfig.standard())
+        engine.run('https://x.com/search?q=AI', 100, 6)
+        assert CountingEngine.peak == 6  # All pages in flight at once, no threads
+        assert engine.playwright is None  # The driver only starts when a browser is needed
+        
+        class SlowEngine(ScrapeEngine):
+            async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+                await asyncio.sleep(60)
+        
+        config = EngineConfig.turbo()
+        config.timeout = 0.1
+        SlowEngine(scratch.scraper(num_tabs=2), config).run('https://x.com/search?q=AI', 100, 2)
+    print("✅ Engine runs pages concurrently and honours its timeout")
+
+def _api_tweet(tweet_id):
+    return {'rest_id': tweet_id, 'legacy': {
+        'id_str': tweet_id, 'full_text': f'tweet {tweet_id}', 'favorite_count': 3,
+        'retweet_count': 0, 'reply_count': 0, 'entities': {}}}
+
+class StuckTabEngine(ScrapeEngine):
+    """Tab 0 fills the target; every other tab hangs in a 45s 'navigation'"""
+    closed = []
+    
+    async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+        identity = await self._lease_identity()
+        try:
+            if tab_id == 0 and self.scraper.target_tweets < 100:
+                await asyncio.sleep(0.1)
+                for i in range(10):
+                    self.scraper._process_api_tweet(_api_tweet(str(i)), tab_id)
+            await asyncio.sleep(45)
+        finally:
+            StuckTabEngine.closed.append(tab_id)  # Stands in for context.close()
+            self.scraper.identity_pool.release(identity)
+
+def test_target_cancels_stuck_tabs():
+    """Reaching the target or stop() cancels in-flight waits; the run returns in well under a second"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=4)
+        scraper._start_job('cancel_test', 5)
+        StuckTabEngine.closed = []
+        start = time.time()
+        StuckTabEngine(scraper).run('https://x.com/search?q=AI', 5, 4)
+        assert time.time() - start < 1.0
+        assert scraper.csv_handler.get_tweet_count() == 5
+        assert sorted(StuckTabEngine.closed) == [0, 1, 2, 3]
+        
+        # Ctrl+C path: stop() from another thread while every tab is stuck
+        scraper._start_job('cancel_test_2', 100)
+        StuckTabEngine.closed = []
+        threading.Timer(0.2, scraper.stop).start()
+        start = time.time()
+        StuckTabEngine(scraper).run('https://x.com/search?q=AI', 100, 4)
+        assert time.time() - start < 1.0
+        assert scraper.cancel_token.reason == 'interrupted' and len(StuckTabEngine.closed) == 4
+        print("✅ Cancellation stops every tab promptly")
+
+class GrowingPage(FakePage):
+    """Every extraction adds 300 DOM nodes; the 3rd one stands in for an API page with a cursor"""
+    next_id = [100]
+    
+    def __init__(self, engine):
+        super().__init__([])
+        self.engine = engine
+        self.nodes = 0
+        self.extracts = 0
+        self.closed = False
+    
+    async def evaluate(self, script, arg=None):
+        if script != EXTRACT_TWEETS_JS:
+            return await super().evaluate(script, arg)
+        self.nodes += 300
+        self.extracts += 1
+        if self.extracts == 3:
+            self.engine.tab_cursors[0] = 'cursor-A'
+        GrowingPage.next_id[0] += 2
+        return {'articles': [_article(GrowingPage.next_id[0]), _article(GrowingPage.next_id[0] + 1)], 'noResults': False}
+    
+    async def close(self):
+        self.closed = True
+    
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+class FakeCDPSession:
+    def __init__(self, page):
+        self.page = page
+    
+    async def send(self, method):
+        if method == 'Performance.getMetrics':
+            return {'metrics': [{'name': 'Nodes', 'value': self.page.nodes},
+                                {'name': 'JSHeapUsedSize', 'value': 20 * 1024 * 1024}]}
+        return {}
+
+class CDPContext(FakeContext):
+    async def new_cdp_session(self, page):
+        return FakeCDPSession(page)
+
+def test_page_recycling():
+    """A page past the DOM node threshold is reopened at the tab's cursor; dedupe carries over"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1)
+        scraper._start_job('recycle_test', 100)
+        identity = scraper.identity_pool.lease()
+        config = EngineConfig('test', max_scrolls=12, scroll_pause=(0, 0), max_idle_scrolls=50,
+                              recycle_scrolls=None, recycle_nodes=1000, health_every=2)
+        engine = ScrapeEngine(scraper, config)
+        pages = [GrowingPage(engine)]
+        opened = []
+        
+        async def open_page(cursor):
+            opened.append(cursor)
+            pages.append(GrowingPage(engine))
+            return pages[-1]
+        
+        before = metrics.PAGE_RECYCLES.value(tab=0, reason='nodes')
+        saved = asyncio.run(engine._scroll_timeline(pages[0], CDPContext(), identity, 100, 0, None, open_page))
+        assert saved == 24 and scraper.csv_handler.get_tweet_count() == 24
+        assert opened == ['cursor-A', 'cursor-A'] and len(pages) == 3
+        assert pages[0].closed and pages[1].closed and not pages[2].closed
+        assert max(page.nodes for page in pages) <= 1500  # Bounded instead of 3600
+        assert metrics.PAGE_RECYCLES.value(tab=0, reason='nodes') == before + 2
+        
+        # No cursor yet: keep the page rather than restart the timeline from the top
+        page = pages[-1]
+        assert asyncio.run(engine._recycle_page(page, open_page, 7, 'scrolls', '100 scrolls')) is page
+        assert len(opened) == 2
+        print("✅ Long scrolls recycle their page at the saved cursor")
+
+class PruningPage(GrowingPage):
+    """DOM stays at 600 nodes as long as the engine prunes after every extraction"""
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.prune_calls = []
+    
+    async def evaluate(self, script, arg=None):
+        if script == PRUNE_CELLS_JS:
+            self.prune_calls.append(arg)
+            self.nodes = 600
+            return {'pruned': 2, 'cells': 6}
+        return await super().evaluate(script, arg)
+
+def test_dom_pruning():
+    """prune_dom hides extracted cells every scroll; heap and nodes are reported per tab"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1)
+        scraper._start_job('prune_test', 100)
+        identity = scraper.identity_pool.lease()
+        config = EngineConfig('test', max_scrolls=8, scroll_pause=(0, 0), max_idle_scrolls=50,
+                              recycle_nodes=1000, health_every=2, prune_dom=True, prune_keep_screens=2)
+        engine = ScrapeEngine(scraper, config)
+        page = PruningPage(engine)
+        
+        async def open_page(cursor):
+            raise AssertionError("a pruned page never needs recycling")
+        
+        before = metrics.DOM_CELLS_PRUNED.value(tab=3)
+        saved = asyncio.run(engine._scroll_timeline(page, CDPContext(), identity, 100, 3, None, open_page))
+        assert saved == 16 and page.prune_calls == [2] * 8
+        assert metrics.DOM_CELLS_PRUNED.value(tab=3) == before + 16
+        assert metrics.PAGE_DOM_NODES.value(tab=3) == 600
+        assert metrics.PAGE_JS_HEAP.value(tab=3) == 20 * 1024 * 1024
+        
+        # Off by default: no extra round trip per scroll
+        page = PruningPage(engine)
+        engine.config = EngineConfig('test', max_scrolls=3, scroll_pause=(0, 0))
+        asyncio.run(engine._scroll_timeline(page, FakeContext(), identity, 100, 3, None))
+        assert page.prune_calls == []
+        print("✅ DOM pruning keeps the page small and reports heap/nodes")
+
+class TabCountEngine(ScrapeEngine):
+    """Records the tab count each job asks for instead of opening pages"""
+    def run(self, search_url, num_tweets, num_tabs, fanout=False):
+        self.scraper.tab_counts.append(num_tabs)
+
+def test_tab_count_per_job():
+    """A reused scraper sizes each job from its own target, not the previous job's"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(cookie_source=[], proxy_preflight=False)
+        scraper.tab_counts = []
+        scraper._create_engine = lambda config: TabCountEngine(scraper, config)
+        scraper.scrape(keyword='AI', num_tweets=200, job_id='big_job')
+        scraper.scrape(keyword='AI', num_tweets=20, job_id='small_job')
+        assert scraper.tab_counts == [8, 4], scraper.tab_counts
+        assert scraper.num_tabs is None
+        print("✅ Each job picks its own tab count")
+
+def test_presets():
+    assert EngineConfig.standard().num_pages is None
+    assert EngineConfig.optimized().num_pages == 12
+    turbo = EngineConfig.turbo()
+    assert turbo.block_resources and turbo.timeout == 120
+
+if __name__ == "__main__":
+    test_dom_fallback_scroll_loop()
+    test_waits_for_rate_limit_budget()
+    test_pages_share_one_event_loop()
+    test_target_cancels_stuck_tabs()
+    test_page_recycling()
+    test_dom_pruning()
+    test_tab_count_per_job()
+    test_presets()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+🧪 Test batch hydration: one GraphQL call per batch, results saved through the scraper
+"""
+
+import os
+import sys
+import json
+from urllib.parse import unquote
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.fast_csv_handler import FastCSVHandler
+from scraper.hydrator import TweetHydrator
+from testlib import scratch_dir
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+    
+    def json(self):
+        return self.payload
+
+class FakeRequest:
+    """Answers TweetResultsByRestIds like the real endpoint; id 13 is deleted"""
+    def __init__(self):
+        self.calls = 0
+    
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        variables = json.loads(unquote(url.split('variables=')[1].split('&')[0]))
+        results = []
+        for tweet_id in variables['tweetIds']:
+            if tweet_id == '13':
+                results.append({})
+                continue
+            results.append({'result': {'rest_id': tweet_id, 'legacy': {
+                'id_str': tweet_id, 'full_text': f'tweet {tweet_id}', 'favorite_count': 0,
+                'retweet_count': 0, 'reply_count': 0, 'entities': {}}}})
+        return FakeResponse({'data': {'tweetResult': results}})
+
+class FakeContext:
+    def __init__(self):
+        self.request = FakeRequest()
+
+class FakeIdentity:
+    account = None
+
+def test_hydrator_batches():
+    """250 ids -> 3 calls; zero-engagement tweets kept; deleted ids reported"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper()
+        scraper.csv_handler = FastCSVHandler('hydrate_test')
+        tweet_ids = [str(i) for i in range(1, 251)]
+        scraper.target_tweets = len(tweet_ids)
+        
+        hydrator = TweetHydrator(scraper, batch_size=100, query_id='abc')
+        context = FakeContext()
+        for i in range(0, len(tweet_ids), hydrator.batch_size):
+            hydrator._fetch_batch(context, tweet_ids[i:i + 100], {}, FakeIdentity())
+        
+        assert context.request.calls == 3
+        assert scraper.csv_handler.get_tweet_count() == 249
+        assert hydrator.missing_ids == {'13'}
+        assert len(hydrator.hydrated_ids) == 249
+        print("✅ Hydrator batch test passed")
+
+if __name__ == "__main__":
+    test_hydrator_batches()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🧪 Test sticky identities: one proxy per account, leased to one tab at a time
+"""
+
+import os
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.proxy_manager import ProxyManager
+from scraper.identity import IdentityPool
+
+USER_AGENTS = ['agent-a', 'agent-b']
+
+def _proxy_manager(tmp_dir):
+    proxy_file = os.path.join(tmp_dir, 'proxies.txt')
+    with open(proxy_file, 'w') as f:
+        f.write("10.0.0.1:8000:u:p\n10.0.0.2:8000:u:p\n10.0.0.3:8000:u:p\n")
+    return ProxyManager(proxy_file)
+
+def test_identity_pool():
+    """Identities get distinct sticky proxies that survive a restart"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_file = os.path.join(tmp_dir, 'identities.json')
+        cookie_sets = [('alice', [{'name': 'auth_token'}]), ('bob', [{'name': 'auth_token'}])]
+        
+        pool = IdentityPool(_proxy_manager(tmp_dir), USER_AGENTS, cookie_sets, state_file=state_file,
+                            tabs_per_identity=1)
+        assert pool.capacity() == 2
+        first = pool.lease()
+        second = pool.lease()
+        assert first is not second
+        assert first.proxy_string != second.proxy_string
+        
+        # A third worker has to wait until an identity is released
+        assert pool.lease(timeout=0.1) is None
+        waiter = []
+        thread = threading.Thread(target=lambda: waiter.append(pool.lease(timeout=5)))
+        thread.start()
+        pool.release(first)
+        thread.join()
+        assert waiter[0] is first
+        
+        # Bindings persist across jobs
+        bindings = {i.name: (i.proxy_string, i.user_agent) for i in pool.identities}
+        restarted = IdentityPool(_proxy_manager(tmp_dir), USER_AGENTS, cookie_sets, state_file=state_file)
+        assert {i.name: (i.proxy_string, i.user_agent) for i in restarted.identities} == bindings
+        
+        # Child processes read the bindings but never rewrite the file
+        before = os.path.getmtime(state_file)
+        child = IdentityPool(_proxy_manager(tmp_dir), USER_AGENTS, cookie_sets + [('carol', [])],
+                             state_file=state_file, read_only=True)
+        assert {i.name: (i.proxy_string, i.user_agent) for i in child.identities if i.name != 'carol'} == bindings
+        assert os.path.getmtime(state_file) == before and 'carol' not in restarted._load_state()
+        assert sorted(os.listdir(tmp_dir)) == ['identities.json', 'proxies.txt']  # No leftover temp files
+        
+        # A blocked proxy moves the identity to a new one
+        blocked = second.proxy_string
+        pool.proxy_manager.mark_failed(second.get_proxy(pool.proxy_manager))
+        pool.rebind(second)
+        assert second.proxy_string != blocked
+        print("✅ Identity pool test passed")
+
+def test_shared_identities():
+    """Without strict mode, one account still serves every tab (least busy first)"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = IdentityPool(_proxy_manager(tmp_dir), USER_AGENTS, [('alice', [{'name': 'auth_token'}])],
+                            state_file=os.path.join(tmp_dir, 'identities.json'))
+        assert pool.capacity() is None
+        leased = [pool.lease(timeout=0.1) for _ in range(4)]
+        assert all(i is pool.identities[0] for i in leased)
+        assert pool.identities[0].active_leases == 4
+        print("✅ Shared identity test passed")
+
+def test_anonymous_identities():
+    """Without cookies every tab gets its own anonymous identity"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = IdentityPool(_proxy_manager(tmp_dir), USER_AGENTS,
+                            state_file=os.path.join(tmp_dir, 'identities.json'))
+        assert pool.capacity() is None
+        leased = [pool.lease() for _ in range(3)]
+        assert len({i.name for i in leased}) == 3
+        print("✅ Anonymous identity test passed")
+
+if __name__ == "__main__":
+    test_identity_pool()
+    test_shared_identities()
+    test_anonymous_identities()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the job queue: leases, visibility timeouts, retries, shared results and workers (no browser needed)
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper import job_queue
+from scraper.job_queue import (MemoryJobQueue, SQLiteJobQueue, enqueue_queries, enqueue_tweet_batches,
+                               filesystem_type)
+from scraper.queue_worker import QueueWorker, export_job
+from scraper.fast_csv_handler import FastCSVHandler
+from testlib import scratch_dir
+
+def _check_queue(queue):
+    first = queue.enqueue('search', {'keyword': 'AI'}, 'job1')
+    second = queue.enqueue('search', {'keyword': 'crypto'}, 'job1')
+    
+    task = queue.lease('w1')
+    assert task.task_id == first and task.attempts == 1
+    assert queue.lease('w2').task_id == second
+    assert queue.lease('w3') is None
+    assert not queue.heartbeat(first, 'w2')  # Only the holder can extend a lease
+    
+    # w2 goes silent: once its lease expires the task is handed out again
+    time.sleep(queue.visibility_timeout + 0.1)
+    assert queue.heartbeat(first, 'w1')
+    retried = queue.lease('w3')
+    assert retried.task_id == second and retried.attempts == 2
+    assert not queue.complete(second, 'w2')  # The old holder lost it
+    assert queue.complete(second, 'w3', {'scraped': 2})
+    
+    # Failures are retried until max_attempts, then stay failed
+    assert queue.fail(first, 'w1', 'boom')
+    assert queue.status('job1') == {'pending': 1, 'leased': 0, 'done': 1, 'failed': 0, 'results': 0}
+    for attempt in range(2):
+        task = queue.lease('w1')
+        queue.fail(task.task_id, 'w1', 'boom')
+    assert queue.get_tasks('job1', 'failed')[0]['error'] == 'boom'
+    
+    assert queue.add_results('job1', [{'tweet_id': '1'}, {'tweet_id': '2'}]) == 2
+    assert queue.add_results('job1', [{'tweet_id': '2'}, {'tweet_id': '3'}]) == 1
+    assert [r['tweet_id'] for r in queue.get_results('job1')] == ['1', '2', '3']
+    
+    # State shared by every worker (e.g. refresh schedules)
+    assert queue.get_state('refresh_tracked') is None
+    queue.set_state('refresh_tracked', {'1': {'refreshes': 1}})
+    queue.set_state('refresh_tracked', {'1': {'refreshes': 2}})
+    assert queue.get_state('refresh_tracked') == {'1': {'refreshes': 2}}
+
+def test_memory_queue():
+    _check_queue(MemoryJobQueue(visibility_timeout=0.2))
+    print("✅ Memory queue")
+
+def test_sqlite_queue():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'jobs.db')
+        _check_queue(SQLiteJobQueue(path, visibility_timeout=0.2))
+        
+        # Concurrent workers never lease the same task twice
+        queue = SQLiteJobQueue(path, visibility_timeout=60)
+        enqueue_tweet_batches(queue, 'job2', [str(i) for i in range(40)], batch_size=2)
+        leased = []
+        
+        def lease_all(worker_id):
+            while True:
+                task = queue.lease(worker_id, kinds=['tweets'])
+                if task is None:
+                    return
+                leased.append(task.task_id)
+        
+        threads = [threading.Thread(target=lease_all, args=(f'w{i}',)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(leased) == 20 and len(set(leased)) == 20
+        print("✅ SQLite queue")
+
+class FakeScraper:
+    """Writes a few rows per query instead of opening a browser"""
+    instances = 0
+    closed = 0
+    
+    def __init__(self):
+        FakeScraper.instances += 1
+    
+    def close(self):
+        FakeScraper.closed += 1
+    
+    def scrape(self, job_id='', keyword='', num_tweets=100, **kwargs):
+        handler = FastCSVHandler(job_id)
+        for i in range(3):
+            handler.add_tweet({'tweet_id': f'{keyword}-{i}', 'text': keyword})
+        handler.add_tweet({'tweet_id': 'shared', 'text': 'in every query'})
+        handler.close()
+        return handler.get_filename()
+
+def test_worker_runs_tasks():
+    with scratch_dir():
+        queue = MemoryJobQueue()
+        enqueue_queries(queue, 'job3', keywords=['AI', 'crypto'], usernames=[' '], per_query=4)
+        worker = QueueWorker(queue, scraper_factory=FakeScraper, worker_id='w1')
+        assert worker.run(exit_when_idle=True) == 2
+        assert FakeScraper.instances == 1 and FakeScraper.closed == 1  # One scraper for every task
+        
+        assert queue.status('job3') == {'pending': 0, 'leased': 0, 'done': 2, 'failed': 0, 'results': 7}
+        assert queue.get_tasks('job3')[1]['result'] == {'scraped': 4, 'new': 3}
+        assert sorted(os.listdir('scraped_data')) == []  # Task sinks are cleaned up
+        
+        filename = export_job(queue, 'job3')
+        with open(os.path.join('scraped_data', filename), encoding='utf-8-sig') as f:
+            assert len(f.readlines()) == 8
+        print("✅ Worker drains the queue into one shared result set")
+
+def test_single_host_only():
+    """SQLite in WAL mode can't be shared over NFS/SMB, so such a database is refused"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mounts = os.path.join(tmp_dir, 'mounts')
+        with open(mounts, 'w') as f:
+            f.write('/dev/sda1 / ext4 rw 0 0\nserver:/export /mnt/shared nfs4 rw 0 0\n')
+        assert filesystem_type('/mnt/shared/jobs', mounts) == 'nfs4'
+        assert filesystem_type('/mnt/sharedx', mounts) == 'ext4'
+        assert filesystem_type('/mnt/shared/jobs', os.path.join(tmp_dir, 'missing')) is None
+        
+        local = job_queue.filesystem_type
+        job_queue.filesystem_type = lambda path: 'nfs4'
+        try:
+            SQLiteJobQueue(os.path.join(tmp_dir, 'jobs.db'))
+            assert False, "queue opened on a network filesystem"
+        except ValueError as e:
+            assert 'nfs4' in str(e)
+        finally:
+            job_queue.filesystem_type = local
+    print("✅ Network filesystem test passed")
+
+if __name__ == "__main__":
+    test_memory_queue()
+    test_sqlite_queue()
+    test_worker_runs_tasks()
+    test_single_host_only()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+🧪 Test queued, levelled logging and the periodic progress line (no browser needed)
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.log import setup_logging, flush_logging, stop_logging, get_logger, ProgressLogger
+from scraper.cancellation import CancellationToken
+
+def _logged(log_file):
+    flush_logging()
+    with open(log_file, encoding='utf-8') as f:
+        return f.read()
+
+def test_levels_and_queue():
+    logger = get_logger('scraper.test_component')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, 'scrape.log')
+        try:
+            setup_logging(log_file=log_file)
+            handlers = logging.getLogger('scraper').handlers
+            assert len(handlers) == 1 and isinstance(handlers[0], logging.handlers.QueueHandler)
+            logger.debug("Tab %s: API tweet %s", 0, 'hidden')
+            logger.info("Tab 0: Starting...")
+            text = _logged(log_file)
+            assert 'scraper.test_component' in text and 'Starting' in text and 'hidden' not in text
+
+            setup_logging(verbose=True, log_file=log_file)
+            logger.debug("Tab %s: API tweet %s", 1, 'shown')
+            assert 'API tweet shown' in _logged(log_file)
+
+            setup_logging(quiet=True, log_file=log_file)
+            assert not logger.isEnabledFor(logging.INFO)  # Hot-path calls stop at the level check
+            assert os.environ['SCRAPER_LOG_LEVEL'] == 'WARNING'  # Inherited by spawned children
+            logger.info("Tab 2: chatty")
+            logger.warning("Tab 2: Rate limited")
+            text = _logged(log_file)
+            assert 'chatty' not in text and 'Rate limited' in text
+        finally:
+            stop_logging()
+            os.environ.pop('SCRAPER_LOG_LEVEL', None)
+            logging.getLogger('scraper').setLevel(logging.INFO)
+    assert not isinstance(logging.getLogger('scraper').handlers[0], logging.handlers.QueueHandler)
+    print("✅ Logging levels test passed")
+
+def test_progress_logger():
+    saved = [0]
+    token = CancellationToken()
+    lines = []
+    class Collect(logging.Handler):
+        def emit(self, record):
+            lines.append(record.getMessage())
+    logger = logging.getLogger('test_progress')
+    logger.addHandler(Collect())
+    logger.setLevel(logging.INFO)
+
+    progress = ProgressLogger(lambda: saved[0], 100, token, interval=0.05, logger=logger)
+    progress.started -= 10  # 10 seconds in
+    saved[0] = 50
+    assert progress.line() == "📊 50/100 tweets (300/min, ETA 10s)"
+    progress.start()
+    time.sleep(0.2)
+    token.cancel('target reached')
+    time.sleep(0.1)
+    count = len(lines)
+    time.sleep(0.15)
+    assert count >= 2 and len(lines) == count  # Stops once the job is cancelled
+    print("✅ Progress logger test passed")
+
+if __name__ == "__main__":
+    test_levels_and_queue()
+    test_progress_logger()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the metrics registry, the Prometheus exporters and the scraper instrumentation (no browser needed)
+"""
+
+import os
+import sys
+import tempfile
+import urllib.request
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper import metrics
+from scraper.metrics import Registry, Counter, Gauge, Histogram
+from scraper.proxy_manager import ProxyManager
+from testlib import scratch_dir
+
+def _api_tweet(tweet_id):
+    return {'rest_id': tweet_id, 'legacy': {
+        'id_str': tweet_id, 'full_text': f'tweet {tweet_id}', 'favorite_count': 3,
+        'retweet_count': 0, 'reply_count': 0, 'entities': {}}}
+
+def test_exposition():
+    registry = Registry()
+    requests = Counter('requests_total', 'Requests', ('tab', 'proxy'), registry=registry)
+    depth = Gauge('queue_depth', 'Queue depth', ('sink',), registry=registry)
+    latency = Histogram('latency_seconds', 'Latency', ('tab',), buckets=(0.1, 1.0), registry=registry)
+
+    requests.inc(tab=0, proxy='10.0.0.1')
+    requests.inc(2, tab=0, proxy='10.0.0.1')
+    requests.inc(tab=1, proxy='say "hi"\n')
+    buffer = [1, 2, 3]
+    depth.set_function(lambda: len(buffer), sink='csv')
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, tab=0)
+
+    text = registry.exposition()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{tab="0",proxy="10.0.0.1"} 3' in text
+    assert 'requests_total{tab="1",proxy="say \\"hi\\"\\n"} 1' in text
+    assert 'queue_depth{sink="csv"} 3' in text
+    assert 'latency_seconds_bucket{tab="0",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{tab="0",le="1"} 3' in text
+    assert 'latency_seconds_bucket{tab="0",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{tab="0"} 4' in text and 'latency_seconds_sum{tab="0"} 4.25' in text
+
+    try:
+        requests.inc(query='AI')
+        assert False, "unknown label accepted"
+    except ValueError:
+        pass
+    print("✅ Exposition test passed")
+
+def test_exporters():
+    registry = Registry()
+    Counter('pings_total', 'Pings', registry=registry).inc(5)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'textfile', 'scrape.prom')
+        registry.write_textfile(path)
+        with open(path) as f:
+            assert 'pings_total 5' in f.read()
+        assert os.listdir(os.path.dirname(path)) == ['scrape.prom']  # No temp file left behind
+
+    server = registry.start_http_server(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert 'pings_total 5' in response.read().decode()
+    finally:
+        server.shutdown()
+    print("✅ Exporter test passed")
+
+def test_scraper_instrumentation():
+    """Accepted/duplicate tweets are counted per tab and query; failed proxies per proxy host"""
+    metrics.REGISTRY.clear()
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        scraper._start_job('metrics_test', 100)
+        for tweet_id in ('1', '2', '2', '3'):
+            scraper._process_api_tweet(_api_tweet(tweet_id), 4)
+        assert metrics.TWEETS_ACCEPTED.value(tab=4, query='main', source='api') == 3
+        assert metrics.TWEETS_DUPLICATE.value(tab=4, query='main', source='api') == 1
+        assert metrics.JOB_TARGET.value() == 100
+        assert metrics.SINK_QUEUE_DEPTH.samples()[0][3] == len(scraper.csv_handler.tweet_buffer)
+
+        with open('proxies.txt', 'w') as f:
+            f.write('10.1.2.3:8080:user:secret\n')
+        manager = ProxyManager(proxy_file='proxies.txt')
+        manager.mark_failed(manager.get_proxy())
+        assert metrics.PROXY_FAILURES.value(proxy='10.1.2.3') == 1
+        assert 'secret' not in metrics.REGISTRY.exposition()
+        print("✅ Scraper instrumentation test passed")
+
+if __name__ == "__main__":
+    test_exposition()
+    test_exporters()
+    test_scraper_instrumentation()
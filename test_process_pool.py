@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+🧪 Test process-pool mode: child record batches, parent dedupe and exact cut-off (no browser needed)
+"""
+
+import os
+import sys
+import time
+import queue
+from datetime import date
+from urllib.parse import unquote
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.process_pool import RecordSink, ProcessPoolScraper, split_by_time
+from scraper.fast_csv_handler import FIELDNAMES
+from testlib import scratch_dir
+
+def _fake_child(child_id, cookie_files, dead_proxies, search_url, shard_specs, num_tweets, num_tabs,
+                config_name, record_queue, stop_event):
+    """Stands in for _child_main: overlapping tweet ids from every child until told to stop"""
+    sink = RecordSink(record_queue, child_id, batch_size=5)
+    for i in range(100000):
+        if stop_event.is_set():
+            break
+        tweet_id = str(i if i % 2 else 1000000 * (child_id + 1) + i)  # Odd ids are shared by all children
+        sink.add_tweet({'tweet_id': tweet_id, 'text': f'tweet {tweet_id}', 'likes': 1})
+        time.sleep(0.001)
+    sink.close()
+    record_queue.put(('done', child_id, None))
+
+def test_record_sink():
+    """Child sink dedupes locally and ships tuples in FIELDNAMES order"""
+    record_queue = queue.Queue()
+    sink = RecordSink(record_queue, 3, batch_size=2, max_delay=60)
+    assert sink.add_tweet({'tweet_id': '1', 'text': 'a'})
+    assert not sink.add_tweet({'tweet_id': '1', 'text': 'a'})
+    assert sink.add_tweet({'tweet_id': '2', 'text': 'b'})
+    kind, child_id, rows = record_queue.get_nowait()
+    assert (kind, child_id, len(rows)) == ('rows', 3, 2)
+    assert dict(zip(FIELDNAMES, rows[1]))['text'] == 'b'
+
+    sink.add_tweet({'tweet_id': '3'})
+    assert record_queue.empty()
+    flusher = sink.flusher
+    sink.close()  # Sends the trailing row and stops the flusher thread
+    assert len(record_queue.get_nowait()[2]) == 1
+    assert sink.get_tweet_count() == 3
+    assert not flusher.is_alive()
+    print("✅ Record sink test passed")
+
+def test_process_pool_exact_target():
+    """Parent saves exactly the target across children and drops cross-child duplicates"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1, proxy_preflight=False)
+        scraper._start_job('pool_test', 150)
+        pool = ProcessPoolScraper(scraper, num_processes=3, tabs_per_process=1)
+        pool.child_target = _fake_child
+        callbacks = len(scraper.cancel_token._callbacks)
+        saved = pool.run('https://x.com/search?q=AI', None, 150)
+        scraper._finish_job()
+        assert len(scraper.cancel_token._callbacks) == callbacks  # run() unregisters its stop hook
+
+        assert saved == 150, saved
+        with open(os.path.join('scraped_data', 'twitter_scrape_pool_test.csv'), 'r', encoding='utf-8-sig') as f:
+            ids = [line.split(',')[0] for line in f.read().splitlines()[1:]]
+        assert len(ids) == 150 and len(set(ids)) == 150
+        print("✅ Process pool exact target test passed")
+
+def test_split_work():
+    """One search becomes disjoint date windows; one account still feeds every child"""
+    shards = split_by_time('https://x.com/search?q=AI%20min_faves%3A1&src=typed_query&f=top', 4, 50,
+                           today=date(2026, 10, 19))
+    queries = [unquote(shard.url.split('q=')[1].split('&')[0]) for shard in shards]
+    assert queries == ['AI min_faves:1 since:2026-10-18',
+                       'AI min_faves:1 since:2026-10-16 until:2026-10-18',
+                       'AI min_faves:1 since:2026-10-12 until:2026-10-16',
+                       'AI min_faves:1 until:2026-10-12']
+    assert all(shard.url.endswith('&src=typed_query&f=top') and shard.quota == 50 for shard in shards)
+    assert split_by_time('https://x.com/nasa', 4, 50) is None  # Profiles can't be split by date
+    
+    with scratch_dir() as scratch:
+        with open('alice.txt', 'w') as f:
+            f.write(".x.com\tTRUE\t/\tTRUE\t0\tauth_token\tabc\n.x.com\tTRUE\t/\tTRUE\t0\tct0\tdef\n")
+        scraper = scratch.scraper(num_tabs=1, cookie_source='alice.txt', proxy_preflight=False)
+        slices = ProcessPoolScraper(scraper, num_processes=3)._cookie_slices(3)
+        assert [[os.path.basename(p) for p in s] for s in slices] == [['alice.txt']] * 3
+    print("✅ Work split test passed")
+
+if __name__ == "__main__":
+    test_record_sink()
+    test_process_pool_exact_target()
+    test_split_work()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+🧪 Test --profile cpu|mem job profiling (no browser needed)
+"""
+
+import os
+import sys
+import pstats
+import tempfile
+import threading
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.profiling import JobProfiler
+from testlib import scratch_dir
+
+def _api_tweet(tweet_id):
+    return {'rest_id': tweet_id, 'legacy': {
+        'id_str': tweet_id, 'full_text': f'tweet {tweet_id}', 'favorite_count': 3,
+        'retweet_count': 0, 'reply_count': 0, 'entities': {}}}
+
+def busy_worker():
+    return sum(i * i for i in range(20000))
+
+def allocate_rows():
+    return [f'row {i}' * 4 for i in range(5000)]
+
+def test_cpu_profile():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with JobProfiler('cpu', top=10) as profiler:
+            busy_worker()
+            thread = threading.Thread(target=busy_worker)
+            thread.start()
+            thread.join()
+        paths = profiler.save(os.path.join(tmp_dir, 'twitter_scrape_job.csv'))
+        assert [os.path.basename(p) for p in paths] == ['twitter_scrape_job_profile_cpu.prof',
+                                                        'twitter_scrape_job_profile_cpu.txt']
+        calls = {func[2]: stat[1] for func, stat in pstats.Stats(paths[0]).stats.items()}
+        assert calls['busy_worker'] == 2  # Job thread + worker thread
+        with open(paths[1]) as f:
+            assert 'busy_worker' in f.read()
+    try:
+        JobProfiler('gpu')
+        assert False, "unknown mode accepted"
+    except ValueError:
+        pass
+    print("✅ CPU profile test passed")
+
+def test_mem_profile():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with JobProfiler('mem', top=5) as profiler:
+            rows = allocate_rows()
+        assert not tracemalloc.is_tracing()  # Stopped again once the job ends
+        paths = profiler.save(os.path.join(tmp_dir, 'twitter_scrape_job.csv'))
+        assert len(rows) == 5000 and profiler.peak > 0
+        assert os.path.basename(paths[0]) == 'twitter_scrape_job_profile_mem.tracemalloc'
+        assert tracemalloc.Snapshot.load(paths[0]).statistics('lineno')
+        with open(paths[1]) as f:
+            report = f.read()
+        assert 'Top 5 allocation sites' in report and 'test_profiling.py' in report
+    print("✅ Memory profile test passed")
+
+def test_scraper_profile():
+    """scraper.profile writes the report next to the job's CSV when the job finishes"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        scraper.profile = 'cpu'
+        scraper._start_job('profile_test', 100)
+        for tweet_id in ('1', '2', '3'):
+            scraper._process_api_tweet(_api_tweet(tweet_id), 0)
+        assert scraper._finish_job() == 'twitter_scrape_profile_test.csv'
+        assert scraper.profiler is None
+        assert sorted(os.listdir('scraped_data')) == [
+            'twitter_scrape_profile_test.csv',
+            'twitter_scrape_profile_test_profile_cpu.prof',
+            'twitter_scrape_profile_test_profile_cpu.txt']
+        with open('scraped_data/twitter_scrape_profile_test_profile_cpu.txt') as f:
+            assert '_process_api_tweet' in f.read()
+    print("✅ Scraper profile test passed")
+
+if __name__ == "__main__":
+    test_cpu_profile()
+    test_mem_profile()
+    test_scraper_profile()
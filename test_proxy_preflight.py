@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+🧪 Test proxy pre-flight probing against a local test endpoint (no network needed)
+"""
+
+import os
+import sys
+import asyncio
+import socket
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.proxy_manager import ProxyManager, NoLiveProxyError
+
+class FakeProxyHandler(BaseHTTPRequestHandler):
+    """Answers every proxied GET with 204, like a working proxy hitting generate_204"""
+    def do_GET(self):
+        self.send_response(204)
+        self.end_headers()
+    
+    def log_message(self, *args):
+        pass
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def test_proxy_preflight():
+    """Live proxies get latency and health, dead ones are never handed out"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeProxyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    live_proxy = f"127.0.0.1:{server.server_address[1]}:user:pass"
+    dead_proxy = f"127.0.0.1:{_free_port()}"
+    
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write(f"{live_proxy}\n{dead_proxy}\n")
+        proxy_file = f.name
+    
+    try:
+        # The first probe URL is unreachable from every proxy; the second one still counts
+        manager = ProxyManager(proxy_file, preflight=True, probe_timeout=2.0, allow_direct=False,
+                               probe_url=f'https://127.0.0.1:{_free_port()}/blocked,http://127.0.0.1/generate_204')
+        
+        assert dead_proxy in manager.dead_proxies
+        assert live_proxy not in manager.dead_proxies
+        assert manager.health_scores[live_proxy] > 0
+        assert manager.health_scores[dead_proxy] == 0
+        assert live_proxy in manager.proxy_latency
+        
+        for _ in range(20):
+            assert manager.get_random_proxy()['_proxy_string'] == live_proxy
+            assert manager.get_proxy()['_proxy_string'] == live_proxy
+        
+        # Once every proxy is dead, tabs never silently fall back to this machine's IP
+        server.shutdown()
+        server.server_close()
+        manager.preflight()
+        for pick in (manager.get_proxy, manager.get_random_proxy):
+            try:
+                pick()
+                assert False, "dead proxies handed out a direct connection"
+            except NoLiveProxyError:
+                pass
+        
+        # ...unless the caller opted into direct connections
+        manager.allow_direct = True
+        assert manager.get_random_proxy() is None
+        assert manager.get_proxy() is None
+        print("✅ Proxy pre-flight test passed")
+    finally:
+        os.remove(proxy_file)
+
+def test_shared_probe_service():
+    """Scrapers share one pre-flight and one probe thread, stopped by the last release()"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeProxyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write(f"127.0.0.1:{server.server_address[1]}\n")
+        proxy_file = f.name
+    
+    try:
+        options = dict(preflight=True, probe_interval=300, probe_timeout=2.0,
+                       probe_url='http://127.0.0.1/generate_204')
+        first = ProxyManager.shared(proxy_file, **options)
+        second = ProxyManager.shared(proxy_file, **options)
+        assert first is second and first.users == 2 and first.preflighted
+        probe_thread = first._probe_thread
+        assert probe_thread.is_alive()
+        
+        first.release()
+        assert probe_thread.is_alive()  # Still used by the other scraper
+        second.release()
+        assert not probe_thread.is_alive() and first._probe_thread is None
+        fresh = ProxyManager.shared(proxy_file)
+        assert fresh is not first  # The next scraper gets a fresh service
+        fresh.release()
+        
+        # Pre-flight also works when called from inside a running event loop
+        async def preflight_in_loop():
+            return ProxyManager(proxy_file, preflight=True, probe_timeout=2.0,
+                                probe_url='http://127.0.0.1/generate_204')
+        assert not asyncio.run(preflight_in_loop()).dead_proxies
+        print("✅ Shared probe service test passed")
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.remove(proxy_file)
+
+if __name__ == "__main__":
+    test_proxy_preflight()
+    test_shared_probe_service()
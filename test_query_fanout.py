@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+🧪 Test multi-query fan-out: per-query quotas over one shared dedupe set (no browser needed)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.playwright_scraper import TwitterScraper
+from scraper.engine import ScrapeEngine
+from testlib import scratch_dir
+
+def _api_tweet(tweet_id):
+    return {'rest_id': tweet_id, 'legacy': {
+        'id_str': tweet_id, 'full_text': f'tweet {tweet_id}', 'favorite_count': 3,
+        'retweet_count': 0, 'reply_count': 0, 'entities': {}}}
+
+TIMELINES = {
+    'AI': [str(i) for i in range(100, 130)],
+    '#crypto': ['100', '101'] + [str(i) for i in range(200, 230)],  # Overlaps with AI
+    '@nasa': [str(i) for i in range(300, 303)],  # Too few tweets to fill the quota
+}
+
+class FakeTabEngine(ScrapeEngine):
+    """Each 'tab' pushes API tweets for its query instead of opening a browser"""
+    async def scrape_timeline(self, search_url, num_tweets, tab_id, shard=None):
+        for tweet_id in TIMELINES[shard.label]:
+            self.scraper._process_api_tweet(_api_tweet(tweet_id), tab_id, shard=shard)
+
+class FakeTabScraper(TwitterScraper):
+    def _create_engine(self, config):
+        return FakeTabEngine(self, config)
+
+def test_query_fanout():
+    """Each query gets its quota, duplicates across queries are saved once"""
+    with scratch_dir() as scratch:
+        scraper = scratch.track(FakeTabScraper(num_tabs=2))
+        scraper.scrape(keyword='AI', hashtag='crypto,', username='nasa,nasa',
+                       num_tweets=30, job_id='fanout_test')
+        
+        counts = {shard.label: shard.count for shard in scraper.shards}
+        assert counts == {'AI': 10, '#crypto': 10, '@nasa': 3}, counts
+        assert scraper.csv_handler.get_tweet_count() == 23
+        assert [s.exhausted for s in scraper.shards] == [False, False, True]
+        print("✅ Query fan-out test passed")
+
+if __name__ == "__main__":
+    test_query_fanout()
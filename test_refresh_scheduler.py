@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the engagement refresh scheduler: decaying cadence, velocity priority and snapshots
+"""
+
+import os
+import sys
+import csv
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.refresh_scheduler import RefreshScheduler, TWITTER_EPOCH_MS, tweet_created_at
+from scraper.job_queue import SQLiteJobQueue
+from testlib import scratch_dir
+
+def _tweet_id(created_at):
+    """Snowflake id for a tweet created at the given unix time"""
+    return str((int(created_at * 1000) - TWITTER_EPOCH_MS) << 22)
+
+def _tweet(tweet_id, likes):
+    return {'tweet_id': tweet_id, 'likes': str(likes), 'retweets': '0', 'replies': '0',
+            'quotes': '0', 'bookmarks': '0', 'views': ''}
+
+def test_refresh_scheduler():
+    with scratch_dir() as scratch:
+        now = time.time()
+        young = _tweet_id(now - 3600)
+        old = _tweet_id(now - 7 * 86400)
+        assert abs(tweet_created_at(young) - (now - 3600)) < 1
+        
+        scheduler = RefreshScheduler(scratch.scraper(num_tabs=1), directory=scratch.path, budget_per_cycle=1)
+        assert scheduler.track([f'https://x.com/a/status/{young}', old, young]) == 2
+        
+        # Budget of one per cycle: both are new and due, only one is handed out
+        first = scheduler.due(now)
+        second = scheduler.due(now)
+        assert len(first) == 1 and len(second) == 1 and set(first + second) == {young, old}
+        scheduler.record(_tweet(young, 10), now)
+        scheduler.record(_tweet(old, 10), now)
+        
+        # Old tweets are refreshed far less often than young ones
+        assert scheduler.tracked[old].next_due - now > 10 * (scheduler.tracked[young].next_due - now)
+        
+        # A tweet gaining engagement is refreshed sooner than one that is flat
+        later = now + 3600
+        scheduler.record(_tweet(young, 510), later)
+        scheduler.record(_tweet(old, 10), later)
+        assert scheduler.tracked[young].velocity == 500 and scheduler.tracked[old].velocity == 0
+        assert scheduler.interval_for(scheduler.tracked[young], later) < (later - tweet_created_at(young)) * 0.25
+        
+        # When both are due and over budget, the fast mover wins
+        assert scheduler.due(later + 30 * 86400 - 8 * 86400) == [young]
+        
+        scheduler.save_state()
+        restored = RefreshScheduler(scratch.scraper(num_tabs=1), directory=scratch.path)
+        assert restored.tracked[young].velocity == 500 and restored.tracked[old].refreshes == 2
+        
+        with open(scheduler.snapshot_file, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 4 and rows[2]['likes'] == '510' and rows[2]['velocity_per_hour'] == '500.0'
+        print("✅ Refresh scheduler spends its budget where engagement moves")
+
+def test_schedule_in_queue():
+    """Workers share one schedule kept in the queue database"""
+    with scratch_dir() as scratch:
+        now = time.time()
+        tweet_id = _tweet_id(now - 3600)
+        queue = SQLiteJobQueue(os.path.join(scratch.path, 'jobs.db'))
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        
+        first = RefreshScheduler(scraper, directory=os.path.join(scratch.path, 'worker1'), store=queue)
+        first.track([tweet_id])
+        first.record(_tweet(tweet_id, 10), now)
+        first.save_state()
+        assert first.snapshots[0]['likes'] == 10
+        
+        second = RefreshScheduler(scraper, directory=os.path.join(scratch.path, 'worker2'), store=queue)
+        assert second.tracked[tweet_id].refreshes == 1 and second.due(now) == []
+        assert not any(name.startswith('worker') for name in os.listdir(scratch.path))  # No local state or snapshots
+        print("✅ Refresh schedule shared through the queue")
+
+def test_concurrent_refreshes_merge():
+    """Two refresh tasks of one schedule saving at once both keep their updates"""
+    with scratch_dir() as scratch:
+        now = time.time()
+        young, older = _tweet_id(now - 3600), _tweet_id(now - 7200)
+        queue = SQLiteJobQueue(os.path.join(scratch.path, 'jobs.db'))
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        setup = RefreshScheduler(scraper, store=queue)
+        setup.track([young, older])
+        setup.save_state()
+        
+        first = RefreshScheduler(scraper, store=queue)
+        second = RefreshScheduler(scraper, store=queue)  # Both load before either saves
+        first.record(_tweet(young, 10), now)
+        second.record(_tweet(older, 20), now)
+        first.save_state()
+        second.save_state()
+        stored = queue.get_state('refresh_tracked')
+        assert stored[young]['refreshes'] == 1 and stored[older]['refreshes'] == 1
+        
+        # A stale copy never overwrites a newer refresh made by another task
+        first.record(_tweet(older, 30), now - 60)
+        first.save_state()
+        assert queue.get_state('refresh_tracked')[older]['engagement'] == 20
+        print("✅ Concurrent refreshes merge into one schedule")
+
+if __name__ == "__main__":
+    test_refresh_scheduler()
+    test_schedule_in_queue()
+    test_concurrent_refreshes_merge()
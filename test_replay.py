@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+🧪 Test the offline replay harness: fixture bundles, 429 injection and parsing of replayed pages
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from urllib.parse import quote
+from scraper.api_scraper import TwitterAPIScraper
+from scraper.engine import ScrapeEngine, EngineConfig
+from scraper.replay import (FixtureReplayer, FixtureRecorder, FixtureBundle, build_synthetic_bundle,
+                            request_key)
+from testlib import scratch_dir
+
+def _graphql_url(operation, **variables):
+    return f'https://x.com/i/api/graphql/abc123/{operation}?variables={quote(json.dumps(variables))}&features=%7B%7D'
+
+def _walk_timeline(replayer, scraper, query='AI'):
+    """Follow cursor-bottom entries like the timeline page does; returns pages fetched"""
+    cursor, pages = None, 0
+    while True:
+        variables = {'rawQuery': query, 'count': 20}
+        if cursor:
+            variables['cursor'] = cursor
+        status, _, body, _ = replayer.respond(_graphql_url('SearchTimeline', **variables))
+        if status == 429:
+            continue
+        assert status == 200
+        pages += 1
+        scraper._extract_tweets_from_api(json.loads(body), 0)
+        next_cursor = scraper.cursors.get(scraper._cursor_key(0))
+        if next_cursor == cursor:
+            return pages
+        cursor = next_cursor
+
+def test_request_keys():
+    assert request_key(_graphql_url('SearchTimeline', rawQuery='AI', cursor='c1')) == ('graphql', 'SearchTimeline', 'AI', 'c1')
+    assert request_key(_graphql_url('TweetDetail', focalTweetId='42')) == ('graphql', 'TweetDetail', '42', '')
+    assert request_key('https://x.com/search?q=AI&f=live', 'document') == ('document', '', '/search', '')
+    assert request_key('https://abs.twimg.com/responsive-web/client-web/main.js', 'script')[0] == 'asset'
+    assert request_key(_graphql_url('HomeTimeline')) is None
+    assert request_key('https://example.com/', 'document') is None
+    print("✅ Request key test passed")
+
+def test_synthetic_bundle_replay():
+    """Every generated tweet comes back through the real parser, with 429s injected along the way"""
+    with scratch_dir() as scratch:
+        ids = build_synthetic_bundle('bundle', num_tweets=95, page_size=20)
+        replayer = FixtureReplayer('bundle', latency=0.01, rate_limit_every=3)
+
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        scraper._start_job('replay_test', 1000)
+        assert _walk_timeline(replayer, scraper) == 5
+        assert scraper.csv_handler.get_tweet_count() == 95
+        assert scraper.csv_handler.seen_tweet_ids == set(ids)
+        assert replayer.stats['rate_limited'] == 2 and replayer.stats['served'] == 5
+
+        # Any query, any page path, TweetDetail per id; nothing leaves the machine
+        status, content_type, body, delay = replayer.respond('https://x.com/nasa', 'document')
+        assert status == 200 and content_type.startswith('text/html') and b'<article' not in body
+        assert delay == 0.01
+        status, _, body, _ = replayer.respond(_graphql_url('TweetDetail', focalTweetId=ids[7]))
+        assert scraper._find_tweet_result(json.loads(body), ids[7])['rest_id'] == ids[7]
+        assert replayer.respond('https://pbs.twimg.com/media/x.jpg', 'image')[0] == 404
+        assert replayer.respond('https://www.google-analytics.com/collect', 'fetch') is None
+
+        # The standalone API scraper parses the same pages
+        replayer = FixtureReplayer('bundle')
+        api_scraper = TwitterAPIScraper(replay=replayer)
+        api_scraper.extract_tweets_from_api(json.loads(replayer.respond(_graphql_url('UserTweets', userId='1'))[2]))
+        assert len(api_scraper.tweets_data) == 20
+        print("✅ Synthetic bundle replay test passed")
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+class FakeResponse:
+    def __init__(self, url, resource_type, body, status=200):
+        self.url = url
+        self.request = FakeRequest(resource_type)
+        self.status = status
+        self.headers = {'content-type': 'application/json' if resource_type == 'fetch' else 'text/html'}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+def test_recorder_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'recorded')
+        recorder = FixtureRecorder(path)
+        context = FakeContext()
+        recorder.attach(context)
+        responses = [
+            FakeResponse('https://x.com/search?q=AI', 'document', b'<html>search</html>'),
+            FakeResponse(_graphql_url('SearchTimeline', rawQuery='AI'), 'fetch', b'{"page": 1}'),
+            FakeResponse(_graphql_url('SearchTimeline', rawQuery='AI', cursor='c1'), 'fetch', b'{"page": 2}'),
+            FakeResponse('https://x.com/i/api/1.1/jot/client_event.json', 'fetch', b'{}'),
+        ]
+        for response in responses:
+            context.handlers[0](response)
+        recorder.save()
+        assert recorder.recorded == 3
+
+        replayer = FixtureReplayer(path)
+        assert replayer.respond(_graphql_url('SearchTimeline', rawQuery='AI', cursor='c1'))[2] == b'{"page": 2}'
+        assert replayer.respond('https://x.com/search?q=other', 'document')[2] == b'<html>search</html>'
+        assert replayer.respond(_graphql_url('SearchTimeline', rawQuery='crypto'))[0] == 404  # Not recorded
+        assert len(FixtureBundle.load(path).entries) == 3
+        print("✅ Recorder roundtrip test passed")
+
+class FakeRoute:
+    """Records how a route handler settled a request"""
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(resource_type)
+        self.request.url = url
+        self.outcome = None
+        self.body = None
+
+    async def fallback(self, url=None):
+        self.request.url = url or self.request.url  # Later handlers see the rewritten request
+        self.outcome = 'fallback'
+
+    async def continue_(self, url=None):
+        self.outcome = 'network'
+
+    async def fulfill(self, status, content_type, body):
+        self.outcome = 'fulfilled'
+        self.body = body
+
+    async def abort(self):
+        self.outcome = 'aborted'
+
+def _matches(pattern, url):
+    return pattern == '**/*' or bool(pattern.search(url))
+
+class RoutingContext:
+    """Context/page routing like Playwright: page routes first, newest handler first, fallback passes on"""
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def new_page(self):
+        return RoutingPage(self)
+
+class RoutingPage:
+    def __init__(self, context):
+        self.context = context
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def request(self, url, resource_type='fetch'):
+        route = FakeRoute(url, resource_type)
+        for pattern, handler in self.routes[::-1] + self.context.routes[::-1]:
+            if _matches(pattern, route.request.url):
+                await handler(route)
+                if route.outcome != 'fallback':
+                    return route
+        route.outcome = 'network'  # No handler answered
+        return route
+
+class FakeBrowser:
+    def __init__(self, context):
+        self.context = context
+
+    async def new_context(self, **kwargs):
+        return self.context
+
+def test_replayed_requests_never_reach_network():
+    """Every request of a replayed page, including a resumed timeline call, is answered by the replayer"""
+    with scratch_dir() as scratch:
+        build_synthetic_bundle('bundle', num_tweets=60, page_size=20)
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        scraper.replay = FixtureReplayer('bundle')
+        engine = ScrapeEngine(scraper, EngineConfig('test', block_resources=True))
+        context = RoutingContext()
+
+        async def get_browser(proxied):
+            return FakeBrowser(context)
+        engine._get_browser = get_browser
+
+        async def replayed_page():
+            page_context, _, _ = await engine._new_context(scraper.identity_pool.lease(), 0)
+            page = await page_context.new_page()
+            await engine._resume_timeline_at(page, 'synthetic-cursor-1', 0)
+            return [await page.request(url, resource_type) for url, resource_type in [
+                ('https://x.com/search?q=AI&f=live', 'document'),
+                (_graphql_url('SearchTimeline', rawQuery='AI', count=20), 'fetch'),
+                ('https://pbs.twimg.com/media/x.jpg', 'image'),
+                ('https://www.google-analytics.com/collect', 'fetch'),
+            ]]
+
+        routes = asyncio.run(replayed_page())
+        assert [route.outcome for route in routes] == ['fulfilled', 'fulfilled', 'fulfilled', 'aborted']
+        # The resumed call got the page at the saved cursor, not the top of the timeline
+        assert 'synthetic-cursor-1' in routes[1].request.url
+        expected = scraper.replay.respond(_graphql_url('SearchTimeline', rawQuery='AI', cursor='synthetic-cursor-1'))
+        assert routes[1].body == expected[2]
+        print("✅ Replayed requests never reach the network")
+
+def _skip(reason):
+    """Report a skip: a real pytest skip under pytest, a SKIPPED line when run as a script"""
+    if 'pytest' in sys.modules:
+        import pytest
+        pytest.skip(reason)
+    print(f"⏭️  SKIPPED: {reason}")
+
+def test_replay_end_to_end():
+    """Full browser run against the synthetic bundle (skipped where Chromium is not installed)"""
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+    except Exception as e:
+        return _skip(f"end-to-end replay needs a browser: {str(e).splitlines()[0]}")
+
+    with scratch_dir() as scratch:
+        build_synthetic_bundle('bundle', num_tweets=200, page_size=20)
+        scraper = scratch.scraper(num_tabs=2, cookie_source=[], proxy_preflight=False)
+        scraper.replay = FixtureReplayer('bundle')
+        scraper.scrape(keyword='AI', num_tweets=60, job_id='replay_e2e')
+        assert scraper.csv_handler.get_tweet_count() == 60
+        print("✅ End-to-end replay test passed")
+
+if __name__ == "__main__":
+    test_request_keys()
+    test_synthetic_bundle_replay()
+    test_recorder_roundtrip()
+    test_replayed_requests_never_reach_network()
+    test_replay_end_to_end()
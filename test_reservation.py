@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+🧪 Test exact-count reservations and the shared cancellation token (no browser needed)
+"""
+
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.fast_csv_handler import FastCSVHandler
+from scraper.cancellation import CancellationToken
+from testlib import scratch_dir
+
+def _api_tweet(tweet_id):
+    return {'rest_id': tweet_id, 'legacy': {
+        'id_str': tweet_id, 'full_text': f'tweet {tweet_id}', 'favorite_count': 3,
+        'retweet_count': 0, 'reply_count': 0, 'entities': {}}}
+
+def test_try_reserve():
+    """Slots are granted up to the limit, duplicates and releases give them back"""
+    with scratch_dir() as scratch:
+        sink = scratch.track(FastCSVHandler('reserve_test'))
+        sink.limit = 3
+        assert sink.try_reserve(2) == 2
+        assert sink.try_reserve(5) == 1
+        assert sink.try_reserve(1) == 0
+        assert sink.commit_tweet({'tweet_id': '1'})
+        assert not sink.commit_tweet({'tweet_id': '1'})  # Duplicate: slot is free again
+        assert sink.add_tweet({'tweet_id': '2'})
+        assert not sink.add_tweet({'tweet_id': '3'})  # The last slot is still reserved
+        sink.release(1)
+        assert sink.reserved == 0 and sink.try_reserve(5) == 1
+        sink.release(1)
+        assert sink.add_tweet({'tweet_id': '3'})
+        assert sink.is_full() and sink.try_reserve(1) == 0 and not sink.add_tweet({'tweet_id': '4'})
+        
+        flusher = sink.flusher
+        sink.close()
+        assert not flusher.is_alive()
+        print("✅ Reservation test passed")
+
+def test_cancellation_token():
+    token = CancellationToken()
+    reasons = []
+    token.on_cancel(reasons.append)
+    assert token.cancel('target reached') and not token.cancel('interrupted')
+    assert token.is_cancelled() and token.reason == 'target reached' and reasons == ['target reached']
+    token.on_cancel(reasons.append)  # Late subscribers are called right away
+    assert reasons == ['target reached', 'target reached']
+    print("✅ Cancellation token test passed")
+
+def test_concurrent_workers_stop_at_exact_target():
+    """16 threads racing on the API parser never overshoot and all see the cancellation"""
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1, proxy_preflight=False)
+        scraper._start_job('race_test', 100)
+        cancelled = []
+        scraper.cancel_token.on_cancel(cancelled.append)
+        start = threading.Barrier(16)
+
+        def worker(worker_id):
+            start.wait()
+            for i in range(50):
+                scraper._process_api_tweet(_api_tweet(str(worker_id * 1000 + i)), worker_id)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert scraper.csv_handler.get_tweet_count() == 100
+        assert scraper.total_scraped == 100
+        assert scraper.csv_handler.reserved == 0
+        assert scraper.target_reached and cancelled == ['target reached']
+        print("✅ Concurrent exact-count test passed")
+
+if __name__ == "__main__":
+    test_try_reserve()
+    test_cancellation_token()
+    test_concurrent_workers_stop_at_exact_target()
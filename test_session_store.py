@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+🧪 Test saved storage_state reuse and automatic expiry
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.session_store import SessionStore
+
+class FakeContext:
+    """Stands in for a Playwright BrowserContext"""
+    def __init__(self, auth_expires):
+        self.auth_expires = auth_expires
+    
+    def storage_state(self, path):
+        with open(path, 'w') as f:
+            json.dump({'cookies': [{'name': 'auth_token', 'expires': self.auth_expires}], 'origins': []}, f)
+
+def test_session_store():
+    """Fresh states are restored, stale or logged-out ones are discarded"""
+    with tempfile.TemporaryDirectory() as session_dir:
+        store = SessionStore(session_dir, max_age=100)
+        
+        store.save(FakeContext(time.time() + 1000), 'alice')
+        assert store.load('alice') == store.path_for('alice')
+        assert store.is_fresh('alice')
+        
+        # Auth cookie already expired
+        store.save(FakeContext(time.time() - 10), 'bob')
+        assert store.load('bob') is None
+        assert not os.path.exists(store.path_for('bob'))
+        
+        # Older than max_age
+        old = time.time() - 200
+        os.utime(store.path_for('alice'), (old, old))
+        assert store.load('alice') is None
+        print("✅ Session store test passed")
+
+if __name__ == "__main__":
+    test_session_store()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+🧪 Test per-stage tracing spans and the Chrome trace-event export (no browser needed)
+"""
+
+import os
+import sys
+import json
+import random
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper import tracing
+from scraper.tracing import Tracer
+from scraper.engine import ScrapeEngine
+from scraper.replay import _synthetic_tweet, _tweet_entry, _timeline_body
+from testlib import scratch_dir
+
+class FakeResponse:
+    def __init__(self, body):
+        self.url = 'https://x.com/i/api/graphql/abc/SearchTimeline?variables=%7B%7D'
+        self.status = 200
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+def test_disabled_is_noop():
+    tracer = Tracer()
+    first = tracer.span('navigation', lane='Tab 0')
+    assert first is tracer.span('dom_extract') is tracing.span('csv_flush')  # One shared object
+    with first:
+        pass
+    assert tracer.events == []
+    print("✅ Disabled tracer test passed")
+
+def test_chrome_trace_export():
+    tracer = Tracer(max_events=3)
+    tracer.enable()
+    with tracer.span('navigation', 'network', lane='Tab 0', attempt=1):
+        with tracer.span('json_parse', 'parse', lane='Tab 0'):
+            pass
+    try:
+        with tracer.span('csv_flush', 'io', lane='Tab 1'):
+            raise OSError('disk full')
+    except OSError:
+        pass
+    tracer.instant('target reached', lane='Tab 1')  # Over max_events: dropped, not stored
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = tracer.save(os.path.join(tmp_dir, 'traces', 'trace.json'))
+        with open(path) as f:
+            trace = json.load(f)
+    events = trace['traceEvents']
+    lanes = {e['args']['name']: e['tid'] for e in events if e['name'] == 'thread_name'}
+    spans = {e['name']: e for e in events if e['ph'] == 'X'}
+    assert set(lanes) == {'Tab 0', 'Tab 1'}
+    assert spans['navigation']['tid'] == spans['json_parse']['tid'] == lanes['Tab 0']
+    assert spans['navigation']['ts'] <= spans['json_parse']['ts']
+    assert spans['navigation']['dur'] >= spans['json_parse']['dur']
+    assert spans['navigation']['args'] == {'attempt': 1}
+    assert spans['csv_flush']['args'] == {'error': 'OSError'}
+    assert trace['otherData']['dropped_events'] == 1
+    assert [name for name, _, _ in tracer.summary()][0] == 'navigation'
+    print("✅ Chrome trace export test passed")
+
+def test_scraper_spans():
+    """API responses are traced on the tab's API lane, sink writes on the writer's lane"""
+    with scratch_dir() as scratch:
+        tracing.TRACER.enable()
+        try:
+            scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+            scraper._start_job('trace_test', 100)
+            rng = random.Random(0)
+            body = _timeline_body('SearchTimeline', [_tweet_entry(_synthetic_tweet(i, rng)) for i in range(5)])
+            asyncio.run(ScrapeEngine(scraper)._on_api_response(FakeResponse(body), 2))
+            scraper.csv_handler.force_flush()
+            assert scraper.csv_handler.get_tweet_count() == 5
+
+            events = tracing.TRACER.events
+            lanes = {e['tid']: e['args']['name'] for e in events if e['name'] == 'thread_name'}
+            spans = [(e['name'], lanes[e['tid']]) for e in events if e['ph'] == 'X']
+            for stage in ('response_body', 'json_parse', 'api_extract'):
+                assert (stage, 'Tab 2 API') in spans
+            assert sum(1 for name, _ in spans if name == 'sink_commit') == 5
+            assert any(name == 'csv_flush' for name, _ in spans)
+        finally:
+            tracing.TRACER.disable()
+            tracing.TRACER.clear()
+    print("✅ Scraper spans test passed")
+
+if __name__ == "__main__":
+    test_disabled_is_noop()
+    test_chrome_trace_export()
+    test_scraper_spans()
@@ -0,0 +1,48 @@
+"""
+Shared helpers for the offline tests (no browser needed)
+
+    with scratch_dir() as scratch:
+        scraper = scratch.scraper(num_tabs=1, cookie_source=[], proxy_preflight=False)
+        sink = scratch.track(FastCSVHandler('job'))
+
+The test runs inside a fresh temp directory, so identities.json, sessions and
+scraped_data/ never land in the repo. Scrapers and sinks made through the
+scratch dir are closed on the way out, before the directory goes away, so no
+background flusher outlives its test.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+class ScratchDir:
+    def __init__(self, path):
+        self.path = path
+        self.resources = []  # Closed in reverse order when the test leaves
+
+    def track(self, resource):
+        """Close resource (anything with close()) when the scratch dir goes away"""
+        self.resources.append(resource)
+        return resource
+
+    def scraper(self, **kwargs):
+        """TwitterScraper whose sink and proxy service are closed with the scratch dir"""
+        from scraper.playwright_scraper import TwitterScraper
+        return self.track(TwitterScraper(**kwargs))
+
+    def close(self):
+        while self.resources:
+            self.resources.pop().close()
+
+@contextmanager
+def scratch_dir():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        scratch = ScratchDir(tmp_dir)
+        try:
+            yield scratch
+        finally:
+            try:
+                scratch.close()
+            finally:
+                os.chdir(cwd)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Twitter/X Scraper - Queue Worker
+Run any number of workers on the host that holds the queue database
+(SQLite on a local disk; network filesystems are refused).
+
+    python worker.py enqueue myjob --keywords "AI,crypto" --per-query 200
+    python worker.py enqueue myjob --urls-file urls.txt
+    python worker.py run                # start one per worker process
+    python worker.py status myjob
+    python worker.py export myjob       # -> scraped_data/twitter_scrape_myjob.csv
+"""
+
+import json
+import argparse
+from scraper.job_queue import SQLiteJobQueue, enqueue_queries, enqueue_tweet_batches, enqueue_refresh
+from scraper.queue_worker import QueueWorker, export_job
+from scraper import metrics
+from scraper.log import setup_logging
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Twitter/X Scraper - Queue Worker")
+    parser.add_argument('--db', default='scraped_data/jobs.db', help='queue database (shared by all workers)')
+    parser.add_argument('--visibility-timeout', type=int, default=300,
+                        help='seconds before a silent worker\'s task is handed to another worker')
+    parser.add_argument('--quiet', action='store_true', help='only log warnings and errors')
+    parser.add_argument('--verbose', action='store_true', help='log every tweet and scroll (DEBUG)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='lease and run tasks until stopped')
+    run.add_argument('--kinds', help='only take these task kinds, e.g. search,tweets')
+    run.add_argument('--max-tasks', type=int, help='stop after this many tasks')
+    run.add_argument('--exit-when-idle', action='store_true', help='stop once the queue is empty')
+    run.add_argument('--metrics-port', type=int, help='serve Prometheus metrics at http://127.0.0.1:PORT/metrics')
+    run.add_argument('--metrics-file', help='write Prometheus metrics to this file every 15s')
+
+    enqueue = commands.add_parser('enqueue', help='add tasks for a job')
+    enqueue.add_argument('job_id')
+    enqueue.add_argument('--keywords', default='', help='comma-separated, one task each')
+    enqueue.add_argument('--hashtags', default='', help='comma-separated, one task each')
+    enqueue.add_argument('--usernames', default='', help='comma-separated, one task each')
+    enqueue.add_argument('--per-query', type=int, default=100, help='tweets per query task')
+    enqueue.add_argument('--urls-file', help='file with tweet URLs or ids, one per line')
+    enqueue.add_argument('--batch-size', type=int, default=100, help='tweets per URL task')
+    enqueue.add_argument('--refresh', metavar='NAME', help='one refresh cycle of a tracked-tweet list')
+    enqueue.add_argument('--track-file', help='with --refresh: tweet URLs or ids to start tracking, one per line')
+
+    status = commands.add_parser('status', help='show task counts (and tasks with --verbose)')
+    status.add_argument('job_id', nargs='?')
+    status.add_argument('--verbose', action='store_true')
+
+    export = commands.add_parser('export', help='write a job\'s results to CSV')
+    export.add_argument('job_id')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    setup_logging(verbose=args.verbose, quiet=args.quiet)
+    queue = SQLiteJobQueue(args.db, visibility_timeout=args.visibility_timeout)
+
+    if args.command == 'run':
+        kinds = [k.strip() for k in args.kinds.split(',')] if args.kinds else None
+        if args.metrics_port:
+            metrics.REGISTRY.start_http_server(args.metrics_port)
+        if args.metrics_file:
+            metrics.REGISTRY.start_textfile_writer(args.metrics_file)
+        try:
+            QueueWorker(queue, kinds=kinds).run(max_tasks=args.max_tasks, exit_when_idle=args.exit_when_idle)
+        finally:
+            if args.metrics_file:
+                metrics.REGISTRY.stop_textfile_writer()
+                metrics.REGISTRY.write_textfile(args.metrics_file)
+
+    elif args.command == 'enqueue':
+        task_ids = enqueue_queries(
+            queue, args.job_id,
+            keywords=args.keywords.split(','), hashtags=args.hashtags.split(','),
+            usernames=args.usernames.split(','), per_query=args.per_query
+        )
+        if args.urls_file:
+            with open(args.urls_file, 'r') as f:
+                task_ids += enqueue_tweet_batches(queue, args.job_id, f.read().split(), args.batch_size)
+        if args.refresh:
+            tweet_urls = []
+            if args.track_file:
+                with open(args.track_file, 'r') as f:
+                    tweet_urls = f.read().split()
+            task_ids.append(enqueue_refresh(queue, args.job_id, args.refresh, tweet_urls))
+        print(f"📥 Enqueued {len(task_ids)} tasks for job {args.job_id}")
+
+    elif args.command == 'status':
+        print(f"📊 {args.job_id or 'All jobs'}: {queue.status(args.job_id)}")
+        if args.verbose:
+            for task in queue.get_tasks(args.job_id):
+                print(f"  {task['task_id']} {task['kind']:8} {task['status']:8} attempts={task['attempts']} "
+                      f"worker={task['worker_id'] or '-'} {json.dumps(task['payload'])[:60]} "
+                      f"{task['error'] or task['result'] or ''}")
+
+    elif args.command == 'export':
+        export_job(queue, args.job_id)
+
+if __name__ == "__main__":
+    main()